@@ -9,3 +9,7 @@ class DrfSpectacularAuthConfig(AppConfig):
     def ready(self):
         # Import settings to ensure they're loaded
         from . import conf  # noqa
+        from .hooks import get_hook_pipeline
+
+        # Resolve the hooks now, so invalid dotted paths fail at startup
+        get_hook_pipeline()
@@ -0,0 +1,34 @@
+"""
+ASGI integration: drain background hooks on server shutdown
+"""
+
+from .hooks import ashutdown_background_executor
+
+
+class LifespanMiddleware:
+    """
+    Answer ASGI lifespan events in front of Django's ASGI application
+
+    Django does not implement the lifespan protocol, so servers such as
+    uvicorn cancel the background hook tasks when shutting down. Wrapping the
+    application lets them finish, for up to HOOK_BACKGROUND["DRAIN_TIMEOUT"]
+    seconds, before the server exits::
+
+        application = LifespanMiddleware(get_asgi_application())
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "lifespan":
+            return await self.app(scope, receive, send)
+
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await ashutdown_background_executor()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,148 @@
+"""
+Rendering and caching of the auth panel assets
+"""
+
+import hashlib
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from django.template.loader import render_to_string
+from django.urls import NoReverseMatch, reverse
+
+from .conf import auth_settings
+from .messages import get_message_bundle_json
+
+logger = logging.getLogger(__name__)
+
+AUTH_PANEL_JS_TEMPLATE = "drf_spectacular_auth/auth_panel.js"
+AUTH_PANEL_CSS_TEMPLATE = "drf_spectacular_auth/auth_panel.css"
+
+ASSET_URL_NAME = "drf_spectacular_auth:asset"
+
+
+class Asset(NamedTuple):
+    """
+    Rendered asset with a content hashed file name
+    """
+
+    filename: str
+    content: str
+    content_type: str
+
+
+_rendered_assets: Dict[Tuple[str, str, str], Asset] = {}
+
+
+def _render_asset(template: str, language: str, context: Dict) -> Asset:
+    key = (template, language, auth_settings.fingerprint)
+    asset = _rendered_assets.get(key)
+    if asset is None:
+        content = render_to_string(template, context)
+        content_hash = hashlib.sha256(content.encode()).hexdigest()[:12]
+        stem, extension = template.rsplit("/", 1)[-1].rsplit(".", 1)
+        if language:
+            stem = f"{stem}.{language}"
+        content_type = (
+            "text/css; charset=utf-8"
+            if extension == "css"
+            else "text/javascript; charset=utf-8"
+        )
+        asset = Asset(f"{stem}.{content_hash}.{extension}", content, content_type)
+        _rendered_assets[key] = asset
+    return asset
+
+
+def get_auth_panel_js(language: str) -> Asset:
+    """
+    Return the auth panel script, rendered once per language and settings
+
+    The script contains nothing request specific; the CSRF token is read from
+    the panel element's data-csrf-token attribute at runtime.
+    """
+    return _render_asset(
+        AUTH_PANEL_JS_TEMPLATE,
+        language,
+        {
+            "auth_settings": auth_settings.settings,
+            "login_url": auth_settings.LOGIN_ENDPOINT,
+            "logout_url": auth_settings.LOGOUT_ENDPOINT,
+            "refresh_url": auth_settings.REFRESH_ENDPOINT,
+            "theme": auth_settings.THEME,
+            "language": language,
+            "messages_json": get_message_bundle_json(language),
+        },
+    )
+
+
+def get_auth_panel_css() -> Asset:
+    """
+    Return the auth panel styles, rendered once per settings
+    """
+    return _render_asset(
+        AUTH_PANEL_CSS_TEMPLATE,
+        "",
+        {
+            "panel_position": auth_settings.PANEL_POSITION,
+            "theme": auth_settings.THEME,
+        },
+    )
+
+
+def get_asset(filename: str) -> Optional[Asset]:
+    """
+    Look up a rendered asset by its hashed file name
+
+    Assets of every supported language are rendered on demand, so any worker
+    can serve a file name that another worker put into a page.
+    """
+    assets = [get_auth_panel_css()]
+    assets.extend(
+        get_auth_panel_js(language) for language in auth_settings.SUPPORTED_LANGUAGES
+    )
+    for asset in assets:
+        if asset.filename == filename:
+            return asset
+    return None
+
+
+def get_auth_panel_context(language: str) -> Dict[str, str]:
+    """
+    Template context that includes the auth panel script and styles
+
+    With PANEL_ASSETS set to "static", the page links the hashed asset files
+    served by drf_spectacular_auth.urls; otherwise they are inlined.
+    """
+    script = get_auth_panel_js(language)
+    styles = get_auth_panel_css()
+
+    if auth_settings.PANEL_ASSETS == "static":
+        try:
+            return {
+                "auth_panel_js_url": reverse(ASSET_URL_NAME, args=[script.filename]),
+                "auth_panel_css_url": reverse(ASSET_URL_NAME, args=[styles.filename]),
+            }
+        except NoReverseMatch:
+            logger.warning(
+                "PANEL_ASSETS is 'static' but drf_spectacular_auth.urls is not "
+                "included; inlining the auth panel assets"
+            )
+
+    return {"auth_panel_js": script.content, "auth_panel_css": styles.content}
+
+
+def clear_rendered_assets() -> None:
+    _rendered_assets.clear()
+
+
+def _clear_on_setting_changed(*args, **kwargs):
+    if kwargs["setting"] in ("DRF_SPECTACULAR_AUTH", "TEMPLATES"):
+        clear_rendered_assets()
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(_clear_on_setting_changed)
+except ImportError:
+    # Django not available
+    pass
@@ -0,0 +1,318 @@
+"""
+Audit trail of login and logout events, written in batches off the request path
+"""
+
+import atexit
+import collections
+import json
+import logging
+import threading
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .conf import auth_settings
+
+logger = logging.getLogger(__name__)
+
+LOGIN_ATTEMPT = "login_attempt"
+LOGIN_SUCCESS = "login_success"
+LOGIN_FAILURE = "login_failure"
+LOGOUT = "logout"
+
+BUILTIN_SINKS = {
+    "logging": "drf_spectacular_auth.audit.LoggingAuditSink",
+    "jsonl": "drf_spectacular_auth.audit.JSONLinesAuditSink",
+    "model": "drf_spectacular_auth.audit.ModelAuditSink",
+}
+
+
+class AuditEvent(NamedTuple):
+    """
+    A single recorded login or logout event
+    """
+
+    event: str
+    timestamp: Any
+    email: str
+    ip_address: Optional[str]
+    user_agent: str
+    error_type: str
+    detail: str
+
+
+class LoggingAuditSink:
+    """
+    Write audit events as JSON records through a logger
+    """
+
+    def __init__(self, logger_name: str = "drf_spectacular_auth.audit.events"):
+        self.logger = logging.getLogger(logger_name)
+
+    def write(self, events: List[AuditEvent]) -> None:
+        for event in events:
+            self.logger.info(_to_json(event))
+
+
+class JSONLinesAuditSink:
+    """
+    Append audit events to a JSON Lines file, one open and write per batch
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, events: List[AuditEvent]) -> None:
+        lines = "".join(_to_json(event) + "\n" for event in events)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+class ModelAuditSink:
+    """
+    Insert audit events with bulk_create into a concrete subclass of
+    drf_spectacular_auth.models.AbstractAuditEvent
+    """
+
+    def __init__(self, model: str, batch_size: Optional[int] = None):
+        self.model_label = model
+        self.batch_size = batch_size
+
+    @property
+    def model(self):
+        from django.apps import apps
+
+        return apps.get_model(self.model_label)
+
+    def write(self, events: List[AuditEvent]) -> None:
+        model = self.model
+        model.objects.bulk_create(
+            [model(**event._asdict()) for event in events],
+            batch_size=self.batch_size,
+        )
+
+
+class AuditLog:
+    """
+    Ring buffer of audit events drained by a background writer thread
+
+    Recording only appends to the buffer. The writer hands events to the sink
+    in batches of up to batch_size, as soon as a batch is full or every
+    flush_interval seconds. When the sink falls behind, the oldest buffered
+    events are dropped and counted instead of slowing down logins.
+    """
+
+    def __init__(
+        self,
+        sink,
+        buffer_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        if buffer_size < 1 or batch_size < 1:
+            raise ImproperlyConfigured(
+                "AUDIT BUFFER_SIZE and BATCH_SIZE must be positive"
+            )
+        self.sink = sink
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: Deque[AuditEvent] = collections.deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def record(self, event: AuditEvent) -> None:
+        """
+        Buffer an event for the writer, without blocking on the sink
+        """
+        with self._lock:
+            if self._closed:
+                self.dropped += 1
+                return
+            if len(self._buffer) == self.buffer_size:
+                # The deque discards the oldest event on append
+                self.dropped += 1
+            self._buffer.append(event)
+            self.recorded += 1
+            pending = len(self._buffer)
+            if self._writer is None:
+                self._start_writer()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """
+        Write all buffered events to the sink in batches
+        """
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    count = min(len(self._buffer), self.batch_size)
+                    batch = [self._buffer.popleft() for _ in range(count)]
+                if not batch:
+                    return
+                try:
+                    self.sink.write(batch)
+                except Exception as e:
+                    with self._lock:
+                        self.failed += len(batch)
+                    logger.error(f"Failed to write {len(batch)} audit events: {e}")
+                else:
+                    with self._lock:
+                        self.written += len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters and buffer depth for monitoring
+        """
+        with self._lock:
+            return {
+                "buffered": len(self._buffer),
+                "buffer_size": self.buffer_size,
+                "recorded": self.recorded,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting events and write out the buffered ones
+        """
+        with self._lock:
+            self._closed = True
+            writer = self._writer
+        self._wakeup.set()
+        if writer is not None and wait:
+            writer.join()
+        elif writer is None:
+            self.flush()
+
+    def _start_writer(self) -> None:
+        self._writer = threading.Thread(
+            target=self._run, name="drf-spectacular-auth-audit", daemon=True
+        )
+        self._writer.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._flush_in_writer()
+        self._flush_in_writer()
+
+    def _flush_in_writer(self) -> None:
+        # The writer outlives requests; like a request, each flush drops
+        # connections that went stale and does not hold them open after
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+
+def _to_json(event: AuditEvent) -> str:
+    return json.dumps(event._asdict(), default=str, ensure_ascii=False)
+
+
+def _get_client_ip(request) -> Optional[str]:
+    return request.META.get("REMOTE_ADDR") or None
+
+
+_audit_log: Optional[AuditLog] = None
+_lock = threading.Lock()
+
+
+def get_audit_log() -> Optional[AuditLog]:
+    """
+    Return the audit log configured by AUDIT, or None if auditing is off
+    """
+    global _audit_log
+    audit_log = _audit_log
+    if audit_log is None:
+        audit = auth_settings.AUDIT
+        if not audit["ENABLED"]:
+            return None
+        with _lock:
+            if _audit_log is None:
+                sink_path = BUILTIN_SINKS.get(audit["SINK"], audit["SINK"])
+                try:
+                    sink = import_string(sink_path)(**audit["SINK_OPTIONS"])
+                except (ImportError, TypeError) as e:
+                    raise ImproperlyConfigured(
+                        f"Invalid AUDIT sink '{audit['SINK']}': {e}"
+                    ) from e
+                _audit_log = AuditLog(
+                    sink,
+                    buffer_size=audit["BUFFER_SIZE"],
+                    batch_size=audit["BATCH_SIZE"],
+                    flush_interval=audit["FLUSH_INTERVAL"],
+                )
+            audit_log = _audit_log
+    return audit_log
+
+
+def record_audit_event(
+    event: str,
+    request,
+    email: str = "",
+    error: Optional[Exception] = None,
+) -> None:
+    """
+    Record a login or logout event if auditing is enabled
+
+    Failures are recorded with the exception class name, e.g. the
+    AuthenticationError subclass, and its message.
+    """
+    audit_log = get_audit_log()
+    if audit_log is None:
+        return
+    audit_log.record(
+        AuditEvent(
+            event=event,
+            timestamp=timezone.now(),
+            email=email or "",
+            ip_address=_get_client_ip(request),
+            user_agent=request.META.get("HTTP_USER_AGENT", ""),
+            error_type=type(error).__name__ if error is not None else "",
+            detail=str(getattr(error, "message", error)) if error is not None else "",
+        )
+    )
+
+
+def shutdown_audit_log(wait: bool = True) -> None:
+    """
+    Flush and stop the audit log; a new one starts on next use
+    """
+    global _audit_log
+    with _lock:
+        audit_log, _audit_log = _audit_log, None
+    if audit_log is not None:
+        audit_log.shutdown(wait=wait)
+
+
+atexit.register(shutdown_audit_log)
+
+
+def _clear_on_setting_changed(*args, **kwargs):
+    if kwargs["setting"] == "DRF_SPECTACULAR_AUTH":
+        shutdown_audit_log()
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(_clear_on_setting_changed)
+except ImportError:
+    # Django not available
+    pass
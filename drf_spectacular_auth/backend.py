@@ -10,7 +10,7 @@ from django.contrib.auth.backends import BaseBackend
 from django.http import HttpRequest
 
 from .conf import auth_settings
-from .providers.cognito import CognitoAuthProvider
+from .verification import verify_token
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +31,7 @@ class SpectacularAuthBackend(BaseBackend):
             return None
 
         try:
-            provider = CognitoAuthProvider()
-            user_info = provider.verify_token(token)
+            user_info = verify_token(token)
 
             if user_info:
                 return self._get_or_create_user(user_info)
@@ -0,0 +1,449 @@
+"""
+Caches for token verification results
+
+TokenCache keeps entries in the process. DjangoTokenCache and
+SharedMemoryTokenCache share them between the worker processes of a host (or,
+with a shared Django cache, a whole deployment), so a token verified by one
+worker does not reach Cognito again from the others.
+"""
+
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from .conf import auth_settings
+
+try:
+    import fcntl
+except ImportError:
+    # Not POSIX; writes are only serialized within the process
+    fcntl = None
+
+BACKENDS = {
+    "locmem": "drf_spectacular_auth.cache.TokenCache",
+    "django": "drf_spectacular_auth.cache.DjangoTokenCache",
+    "shared_memory": "drf_spectacular_auth.cache.SharedMemoryTokenCache",
+}
+
+
+def token_fingerprint(token: str) -> str:
+    """
+    Cache key for a token, so raw tokens are never kept in memory as keys
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """
+    Thread-safe LRU cache of per-token values with per-entry expiry
+
+    Entries are evicted when they expire or, once ``max_size`` entries are
+    stored, in least recently used order.
+    """
+
+    def __init__(self, max_size: int = 1024, name: str = "tokens"):
+        self.max_size = max_size
+        self.name = name
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, token: str) -> Optional[Any]:
+        key = token_fingerprint(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, token: str, value: Any, expires_at: float) -> None:
+        if self.max_size <= 0 or expires_at <= time.time():
+            return
+
+        key = token_fingerprint(token)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token_fingerprint(token), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters for monitoring the cache hit rate
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class DjangoTokenCache:
+    """
+    Token cache stored in a Django cache, shared by every process using it
+
+    Entries expire through the cache timeout; eviction is left to the cache
+    backend, so ``max_size`` is not enforced here. Keys include the settings
+    fingerprint, so projects sharing a cache never share verification results.
+    clear() only detaches this process from the current entries by switching
+    to a new key version.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        name: str = "tokens",
+        alias: str = "default",
+        key_prefix: str = "drf_spectacular_auth",
+    ):
+        self.max_size = max_size
+        self.name = name
+        self.alias = alias
+        self.key_prefix = f"{key_prefix}:{name}:{auth_settings.fingerprint[:16]}"
+        self.version = 1
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+
+        return caches[self.alias]
+
+    def get(self, token: str) -> Optional[Any]:
+        entry = self.cache.get(self._key(token), version=self.version)
+        # The cache timeout is whole seconds; honor the exact expiry
+        if entry is None or entry[1] <= time.time():
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return entry[0]
+
+    def set(self, token: str, value: Any, expires_at: float) -> None:
+        timeout = expires_at - time.time()
+        if self.max_size <= 0 or timeout <= 0:
+            return
+        self.cache.set(
+            self._key(token),
+            (value, expires_at),
+            timeout=max(int(timeout), 1),
+            version=self.version,
+        )
+
+    def delete(self, token: str) -> None:
+        self.cache.delete(self._key(token), version=self.version)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.version += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters for monitoring the cache hit rate of this process
+        """
+        with self._lock:
+            return {"max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+    def _key(self, token: str) -> str:
+        return f"{self.key_prefix}:{token_fingerprint(token)}"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+class SharedMemoryTokenCache:
+    """
+    Token cache in a memory-mapped file with fixed-size slots
+
+    Every process on the host mapping the same file shares the entries. A
+    token hashes to a group of PROBES adjacent slots; a new entry replaces the
+    same token, a free or expired slot, or else the entry expiring first.
+    Each slot holds the token fingerprint, expiry, and the value as JSON, with
+    a CRC32 so readers can skip slots that are being written without taking a
+    lock. Writers lock the file with fcntl. Values that are not JSON
+    serializable or exceed the slot size are not cached.
+
+    The default file name includes the settings fingerprint, so projects on
+    the same host never share verification results. The file is only used if
+    it belongs to the current user and has no group or other permissions.
+    """
+
+    # Token fingerprint digest, expiry and payload length, then their CRC32
+    # together with the payload
+    ENTRY = struct.Struct("<32sdI")
+    CHECKSUM = struct.Struct("<I")
+    HEADER_SIZE = ENTRY.size + CHECKSUM.size
+    PROBES = 4
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        name: str = "tokens",
+        path: Optional[str] = None,
+        slot_size: int = 2048,
+    ):
+        if slot_size <= self.HEADER_SIZE:
+            raise ValueError(f"slot_size must be larger than {self.HEADER_SIZE}")
+        self.max_size = max(max_size, 1)
+        self.name = name
+        self.slot_size = slot_size
+        self.path = path or os.path.join(
+            tempfile.gettempdir(),
+            f"drf_spectacular_auth-{name}-{auth_settings.fingerprint[:16]}.cache",
+        )
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._fd: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.oversized = 0
+
+    def get(self, token: str) -> Optional[Any]:
+        digest = self._digest(token)
+        for offset in self._offsets(digest):
+            entry = self._read(offset)
+            if entry is None or entry[0] != digest:
+                continue
+            if entry[1] <= time.time():
+                self._count("expirations")
+                break
+            self._count("hits")
+            return json.loads(entry[2])
+        self._count("misses")
+        return None
+
+    def set(self, token: str, value: Any, expires_at: float) -> None:
+        now = time.time()
+        if expires_at <= now:
+            return
+        try:
+            payload = json.dumps(value, separators=(",", ":")).encode()
+        except (TypeError, ValueError):
+            return
+        if self.HEADER_SIZE + len(payload) > self.slot_size:
+            self._count("oversized")
+            return
+
+        digest = self._digest(token)
+        with self._write_lock():
+            target = target_expires_at = None
+            for offset in self._offsets(digest):
+                entry = self._read(offset)
+                if entry is None or entry[0] == digest or entry[1] <= now:
+                    target = offset
+                    break
+                if target is None or entry[1] < target_expires_at:
+                    target, target_expires_at = offset, entry[1]
+            else:
+                self.evictions += 1
+            self._write(target, digest, expires_at, payload)
+
+    def delete(self, token: str) -> None:
+        digest = self._digest(token)
+        with self._write_lock():
+            for offset in self._offsets(digest):
+                entry = self._read(offset)
+                if entry is not None and entry[0] == digest:
+                    self._clear_slot(offset)
+
+    def clear(self) -> None:
+        with self._write_lock():
+            self._get_mmap()[:] = bytes(self.max_size * self.slot_size)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters of this process and the number of live entries in the file
+        """
+        now = time.time()
+        size = 0
+        for slot in range(self.max_size):
+            entry = self._read(slot * self.slot_size)
+            if entry is not None and entry[1] > now:
+                size += 1
+        with self._lock:
+            return {
+                "size": size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "oversized": self.oversized,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                os.close(self._fd)
+                self._mmap = self._fd = None
+
+    def __del__(self):
+        # Caches are dropped when the settings change; release the file
+        if self._mmap is not None:
+            self._mmap.close()
+            os.close(self._fd)
+
+    def _digest(self, token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def _offsets(self, digest: bytes):
+        first = int.from_bytes(digest[:8], "little") % self.max_size
+        for probe in range(min(self.PROBES, self.max_size)):
+            yield ((first + probe) % self.max_size) * self.slot_size
+
+    def _read(self, offset: int):
+        """
+        Return (digest, expires_at, payload) of a slot, or None if it is empty
+        or being written
+        """
+        buffer = self._get_mmap()
+        entry = buffer[offset : offset + self.ENTRY.size]
+        digest, expires_at, length = self.ENTRY.unpack(entry)
+        if not length or length > self.slot_size - self.HEADER_SIZE:
+            return None
+        (checksum,) = self.CHECKSUM.unpack_from(buffer, offset + self.ENTRY.size)
+        start = offset + self.HEADER_SIZE
+        payload = buffer[start : start + length]
+        if zlib.crc32(payload, zlib.crc32(entry)) != checksum:
+            return None
+        return digest, expires_at, payload
+
+    def _write(self, offset: int, digest: bytes, expires_at: float, payload: bytes):
+        buffer = self._get_mmap()
+        # Invalidate the slot first so readers never see a mixed entry
+        self._clear_slot(offset)
+        start = offset + self.HEADER_SIZE
+        buffer[start : start + len(payload)] = payload
+        entry = self.ENTRY.pack(digest, expires_at, len(payload))
+        checksum = zlib.crc32(payload, zlib.crc32(entry))
+        buffer[offset : offset + self.HEADER_SIZE] = entry + self.CHECKSUM.pack(
+            checksum
+        )
+
+    def _clear_slot(self, offset: int) -> None:
+        self._get_mmap()[offset : offset + self.HEADER_SIZE] = bytes(self.HEADER_SIZE)
+
+    @contextlib.contextmanager
+    def _write_lock(self):
+        """
+        Exclusive access to the file, across threads and processes
+        """
+        self._get_mmap()
+        with self._lock:
+            if fcntl is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+    def _get_mmap(self) -> mmap.mmap:
+        buffer = self._mmap
+        if buffer is None:
+            with self._lock:
+                if self._mmap is None:
+                    self._open()
+                buffer = self._mmap
+        return buffer
+
+    def _open(self) -> None:
+        size = self.max_size * self.slot_size
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0)
+        fd = os.open(self.path, flags, 0o600)
+        try:
+            self._check_owner(fd)
+            if fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size != size:
+                    # New file, or the slot layout changed: start empty
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, size)
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(fd, fcntl.LOCK_UN)
+            self._mmap = mmap.mmap(fd, size)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    def _check_owner(self, fd: int) -> None:
+        """
+        Refuse a file other users could write, which would let them plant
+        verification results for any token
+        """
+        if not hasattr(os, "getuid"):
+            return
+        stat = os.fstat(fd)
+        if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+            raise ImproperlyConfigured(
+                f"Token cache file {self.path} must be owned by the current user "
+                "and not accessible to group or others"
+            )
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def create_token_cache(config: Dict[str, Any], name: str):
+    """
+    Build the token cache configured by a TOKEN_CACHE-style setting
+
+    BACKEND is "locmem", "django", "shared_memory" or a dotted path to a class
+    taking max_size, name and the OPTIONS as keyword arguments.
+    """
+    backend = config.get("BACKEND", "locmem")
+    cache_class = import_string(BACKENDS.get(backend, backend))
+    return cache_class(
+        max_size=config["MAX_SIZE"], name=name, **config.get("OPTIONS", {})
+    )
@@ -0,0 +1,395 @@
+"""
+Concurrency helpers for outbound identity provider calls
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import threading
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from .providers.base import ServiceUnavailableError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for it and share its result or exception.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """
+        Number of keys currently being executed
+        """
+        with self._lock:
+            return len(self._calls)
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing or slow service for a while
+
+    Outcomes of the last ``window_size`` calls are kept. Once at least
+    ``min_calls`` are recorded and the share of failed calls reaches
+    ``failure_rate``, or the share of calls slower than
+    ``slow_call_duration`` seconds reaches ``slow_call_rate``, the circuit
+    opens and calls fail fast for ``open_duration`` seconds. Then up to
+    ``half_open_calls`` probe calls are let through: if all succeed in time
+    the circuit closes, otherwise it opens again.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 50,
+        min_calls: int = 20,
+        failure_rate: float = 0.5,
+        slow_call_duration: float = 5.0,
+        slow_call_rate: float = 0.8,
+        open_duration: float = 30.0,
+        half_open_calls: int = 3,
+    ):
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        # (failed, slow) per call
+        self._outcomes: Deque[Tuple[bool, bool]] = collections.deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def allow(self) -> None:
+        """
+        Admit a call
+
+        Raises:
+            ServiceUnavailableError: If the circuit is open, or half-open with
+                all probes in flight
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_duration:
+                    self.rejected += 1
+                    raise ServiceUnavailableError(
+                        "Authentication service unavailable",
+                        "The identity provider is failing; please retry later",
+                        retry_after=self._retry_after(),
+                    )
+                self.state = HALF_OPEN
+                self._probes = self._probe_successes = 0
+
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self.rejected += 1
+                    raise ServiceUnavailableError(
+                        "Authentication service unavailable",
+                        "The identity provider is recovering; please retry later",
+                        retry_after=1,
+                    )
+                self._probes += 1
+
+    def record(self, failed: bool, duration: float) -> None:
+        """
+        Record the outcome of an admitted call
+        """
+        slow = duration >= self.slow_call_duration
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self.state = CLOSED
+                        self._outcomes.clear()
+                return
+
+            if self.state == OPEN:
+                # Admitted before the circuit opened
+                return
+
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failures = sum(1 for outcome in self._outcomes if outcome[0])
+            slow_calls = sum(1 for outcome in self._outcomes if outcome[1])
+            if (
+                failures / calls >= self.failure_rate
+                or slow_calls / calls >= self.slow_call_rate
+            ):
+                self._open()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        State and failure/slow call rates for monitoring
+        """
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": (
+                    sum(1 for outcome in self._outcomes if outcome[0]) / calls
+                    if calls
+                    else 0.0
+                ),
+                "slow_call_rate": (
+                    sum(1 for outcome in self._outcomes if outcome[1]) / calls
+                    if calls
+                    else 0.0
+                ),
+                "rejected": self.rejected,
+            }
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def _retry_after(self) -> int:
+        remaining = self.open_duration - (time.monotonic() - self._opened_at)
+        return max(int(remaining + 0.999), 1)
+
+
+class ConcurrencyLimiter:
+    """
+    Cap concurrent calls, with a bounded queue of waiting callers
+
+    At most ``max_concurrent`` calls run at once. Up to ``max_waiting``
+    further callers wait, each at most ``wait_timeout`` seconds; everyone
+    beyond that is rejected right away, so a slow service cannot tie up every
+    worker thread.
+    """
+
+    def __init__(
+        self, max_concurrent: int = 10, max_waiting: int = 50, wait_timeout: float = 2.0
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue if needed
+
+        Raises:
+            ServiceUnavailableError: If the queue is full or the wait timed out
+        """
+        if not self._semaphore.acquire(blocking=False):
+            self._enter_queue()
+            try:
+                acquired = self._semaphore.acquire(timeout=self.wait_timeout)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not acquired:
+                self._reject("Timed out waiting for the identity provider")
+        self._acquired()
+
+    async def aacquire(self) -> None:
+        """
+        Async version of acquire()
+
+        A waiting caller occupies a thread of the limiter's executor, which
+        has max_waiting threads, so the queue bound also bounds the threads.
+        """
+        if not self._semaphore.acquire(blocking=False):
+            self._enter_queue()
+            try:
+                future = self._get_executor().submit(
+                    self._semaphore.acquire, timeout=self.wait_timeout
+                )
+                try:
+                    acquired = await asyncio.wrap_future(future)
+                except asyncio.CancelledError:
+                    # The wait goes on in the thread; give back what it takes
+                    future.add_done_callback(self._release_if_acquired)
+                    raise
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not acquired:
+                self._reject("Timed out waiting for the identity provider")
+        self._acquired()
+
+    def release(self) -> None:
+        with self._lock:
+            self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Calls in flight, waiting and rejected, for monitoring
+        """
+        with self._lock:
+            return {
+                "active": self.active,
+                "max_concurrent": self.max_concurrent,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "rejected": self.rejected,
+            }
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max(self.max_waiting, 1),
+                    thread_name_prefix="drf-spectacular-auth-limiter",
+                )
+            return self._executor
+
+    def _release_if_acquired(self, future: concurrent.futures.Future) -> None:
+        if not future.cancelled() and future.result():
+            self._semaphore.release()
+
+    def _enter_queue(self) -> None:
+        with self._lock:
+            if self.waiting < self.max_waiting:
+                self.waiting += 1
+                return
+        self._reject("Too many concurrent requests; please retry later")
+
+    def _acquired(self) -> None:
+        with self._lock:
+            self.active += 1
+
+    def _reject(self, detail: str) -> None:
+        with self._lock:
+            self.rejected += 1
+        raise ServiceUnavailableError(
+            "Authentication service busy", detail, retry_after=1
+        )
+
+
+class CallGuard:
+    """
+    Run outbound calls through an optional concurrency limiter and circuit
+    breaker
+
+    ``is_failure`` decides whether an exception counts against the service;
+    errors caused by the caller, such as wrong credentials, should not.
+    """
+
+    def __init__(
+        self,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        is_failure: Callable[[BaseException], bool] = lambda error: True,
+    ):
+        self.circuit_breaker = circuit_breaker
+        self.limiter = limiter
+        self.is_failure = is_failure
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Raises:
+            ServiceUnavailableError: If the call was rejected without being made
+        """
+        if self.limiter is not None:
+            self.limiter.acquire()
+        try:
+            if self.circuit_breaker is None:
+                return func(*args, **kwargs)
+            self.circuit_breaker.allow()
+            started = time.monotonic()
+            failed = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                failed = self.is_failure(e)
+                raise
+            finally:
+                self.circuit_breaker.record(failed, time.monotonic() - started)
+        finally:
+            if self.limiter is not None:
+                self.limiter.release()
+
+    async def acall(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Async version of call() for coroutine functions
+        """
+        if self.limiter is not None:
+            await self.limiter.aacquire()
+        try:
+            if self.circuit_breaker is None:
+                return await func(*args, **kwargs)
+            self.circuit_breaker.allow()
+            started = time.monotonic()
+            failed = False
+            try:
+                return await func(*args, **kwargs)
+            except BaseException as e:
+                failed = self.is_failure(e)
+                raise
+            finally:
+                self.circuit_breaker.record(failed, time.monotonic() - started)
+        finally:
+            if self.limiter is not None:
+                self.limiter.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Circuit breaker and limiter statistics, for the enabled ones
+        """
+        stats = {}
+        if self.circuit_breaker is not None:
+            stats["circuit_breaker"] = self.circuit_breaker.stats()
+        if self.limiter is not None:
+            stats["limiter"] = self.limiter.stats()
+        return stats
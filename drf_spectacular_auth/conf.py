@@ -2,20 +2,110 @@
 Configuration system for DRF Spectacular Auth
 """
 
+import hashlib
+import json
+
 DEFAULTS = {
     # AWS Cognito Settings
     "COGNITO_REGION": "us-east-1",
     "COGNITO_CLIENT_ID": None,  # Required
     "COGNITO_CLIENT_SECRET": None,  # Optional - for private clients only
+    "COGNITO_USER_POOL_ID": None,  # Required for local token verification
+    # Token Verification
+    "TOKEN_VERIFICATION": "remote",  # remote (GetUser call) or local (JWKS signature)
+    "ALLOWED_TOKEN_USE": ["access"],  # token_use values accepted locally
+    "TOKEN_LEEWAY": 0,  # Seconds of clock skew tolerated on "exp"
+    "LOGIN_USER_INFO_FROM_ID_TOKEN": False,  # Login user info from the IdToken (JWKS)
+    "TOKEN_CACHE": {
+        "ENABLED": True,  # Cache verified tokens (middleware/backend)
+        "BACKEND": "locmem",  # locmem, django, shared_memory, or a dotted path
+        "OPTIONS": {},  # e.g. {"alias": ...} (django), {"path": ...} (shared_memory)
+        "MAX_SIZE": 1024,  # Least recently used tokens are evicted beyond this
+        "MAX_TTL": 300,  # Seconds; entries also expire at the token's "exp"
+    },
+    "REJECTED_TOKEN_CACHE": {
+        "ENABLED": True,  # Remember rejected tokens to skip repeated Cognito calls
+        "BACKEND": "locmem",
+        "OPTIONS": {},
+        "MAX_SIZE": 1024,
+        "TTL": 30,  # Seconds a rejected token fails without asking Cognito
+    },
+    "USER_ATTRIBUTES_CACHE": {
+        "ENABLED": True,  # Local verification: one GetUser per user, not per token
+        "BACKEND": "locmem",
+        "OPTIONS": {},
+        "MAX_SIZE": 1024,
+        "TTL": 300,  # Seconds a user's email and name are reused
+    },
+    "REVOCATION": {
+        "ENABLED": False,  # Reject tokens (and their sign-in) after logout
+        "COGNITO_SIGN_OUT": None,  # None, "revoke_token" or "global_sign_out"
+        "BACKEND": "locmem",  # Token cache backend holding the revoked token IDs
+        "OPTIONS": {},
+        "MAX_SIZE": 10000,
+        "ORIGIN_TTL": 3600,  # Seconds a revoked sign-in ("origin_jti") stays revoked
+    },
+    "JWKS": {
+        "URL": None,  # Defaults to the user pool's /.well-known/jwks.json
+        "CACHE_TTL": 3600,  # Seconds before keys are refreshed in the background
+        "MIN_REFETCH_INTERVAL": 60,  # Rate limit for refetches on unknown "kid"
+        "SNAPSHOT_PATH": None,  # File shared by workers to skip the initial fetch
+        "FETCH_TIMEOUT": 5,
+    },
+    # boto3 client used for Cognito calls (one per configuration, shared by threads)
+    "COGNITO_CLIENT_CONFIG": {
+        "MAX_POOL_CONNECTIONS": 10,  # Keep-alive HTTP connections per client
+        "CONNECT_TIMEOUT": 5,
+        "READ_TIMEOUT": 10,
+        "RETRY_MODE": "standard",  # legacy, standard, adaptive
+        "MAX_ATTEMPTS": 3,
+    },
+    # Fail fast while Cognito is failing or slow (503 from the login views)
+    "COGNITO_CIRCUIT_BREAKER": {
+        "ENABLED": False,
+        "WINDOW_SIZE": 50,  # Most recent calls the rates are taken over
+        "MIN_CALLS": 20,  # Calls in the window before the circuit may open
+        "FAILURE_RATE": 0.5,  # Share of throttled/5xx/timed out calls that opens it
+        "SLOW_CALL_DURATION": 5,  # Seconds after which a call counts as slow
+        "SLOW_CALL_RATE": 0.8,  # Share of slow calls that opens it
+        "OPEN_DURATION": 30,  # Seconds calls fail fast before probing again
+        "HALF_OPEN_CALLS": 3,  # Probe calls that must succeed to close it
+    },
+    # Cap concurrent Cognito calls per process, shared by sync and async providers
+    "COGNITO_CONCURRENCY": {
+        "ENABLED": False,
+        "MAX_CONCURRENT": 10,
+        "MAX_WAITING": 50,  # Callers queued beyond MAX_CONCURRENT; more are rejected
+        "WAIT_TIMEOUT": 2,  # Seconds a queued caller waits for a slot
+    },
+    # Schema served by SpectacularAuthAPIView
+    "SCHEMA_CACHE": {
+        "ENABLED": True,
+        "ALIAS": "default",  # Django cache holding the rendered schemas
+        "TIMEOUT": 86400,  # Seconds; None keeps schemas until evicted
+        "KEY_PREFIX": "drf_spectacular_auth:schema",
+        "GZIP": True,  # Store a gzip variant for clients accepting it
+        "STREAMING": False,  # Stream the full schema from in-process fragments
+        "STREAMED_VARIANTS": 16,  # Streamed schemas kept per process
+    },
+    "SCHEMA_SHARDING": False,  # Swagger UI loads a tag's paths when it is expanded
+    "FILTER_SCHEMA_BY_PERMISSIONS": False,  # Logged-in users see reachable endpoints
+    "SCHEMA_PERMISSION_FINGERPRINT": None,  # Dotted path: callable(user) -> str/None
     # API Endpoints
     "LOGIN_ENDPOINT": "/api/auth/login/",
     "LOGOUT_ENDPOINT": "/api/auth/logout/",
+    "REFRESH_ENDPOINT": "/api/auth/refresh/",
+    "DOCS_URL_NAMES": [],  # Extra URL names the middleware treats as docs views
+    "ASYNC_VIEWS": False,  # Serve login/logout with async views (ASGI, needs httpx)
     # UI Settings
     "PANEL_POSITION": "top-right",  # top-left, top-right, bottom-left, bottom-right
     "PANEL_STYLE": "floating",  # floating, embedded
+    "PANEL_ASSETS": "inline",  # inline or static (hashed, immutable cacheable files)
     "AUTO_AUTHORIZE": True,  # Auto-fill authorization headers (basic preauthorizeApiKey)
     "SHOW_COPY_BUTTON": True,  # Show token copy button
     "SHOW_USER_INFO": True,  # Show user email in panel
+    "AUTO_REFRESH_TOKEN": False,  # Return the refresh token and refresh before expiry
+    "TOKEN_REFRESH_MARGIN": 60,  # Seconds before "exp" the panel refreshes
     # Theming
     "THEME": {
         "PRIMARY_COLOR": "#61affe",
@@ -31,6 +121,7 @@ DEFAULTS = {
     # Localization
     "DEFAULT_LANGUAGE": "en",
     "SUPPORTED_LANGUAGES": ["ko", "en", "ja"],
+    "CUSTOM_TRANSLATIONS": {},  # {language: {message key: text}}, merged over built-ins
     # Token Storage (Simplified)
     "TOKEN_STORAGE": "sessionStorage",  # localStorage or sessionStorage
     "CSRF_PROTECTION": True,
@@ -47,6 +138,23 @@ DEFAULTS = {
         "PRE_LOGOUT": None,
         "POST_LOGOUT": None,
     },
+    "HOOK_BACKGROUND": {
+        "ENABLED": False,  # Run the EVENTS hooks without making the response wait
+        "EVENTS": ["POST_LOGIN", "POST_LOGOUT"],
+        "MAX_WORKERS": 2,
+        "QUEUE_SIZE": 1000,  # Pending runs (or asyncio tasks) beyond this are...
+        "FULL_POLICY": "drop",  # ...dropped, or "block" the request until there is room
+        "DRAIN_TIMEOUT": 10,  # Seconds to finish queued runs at shutdown
+    },
+    # Audit trail of login attempts, successes, failures and logouts
+    "AUDIT": {
+        "ENABLED": False,
+        "SINK": "logging",  # logging, jsonl, model, or a dotted path to a sink class
+        "SINK_OPTIONS": {},  # Keyword arguments for the sink, e.g. {"path": ...}
+        "BUFFER_SIZE": 10000,  # Buffered events; the oldest are dropped beyond this
+        "BATCH_SIZE": 500,  # Events per sink write
+        "FLUSH_INTERVAL": 1.0,  # Seconds between writes of a partial batch
+    },
 }
 
 
@@ -56,6 +164,12 @@ class SpectacularAuthSettings:
     """
 
     def __init__(self):
+        self.reload()
+
+    def reload(self):
+        """
+        (Re)load settings from Django settings
+        """
         # Check if Django settings are configured
         try:
             from django.conf import settings as django_settings
@@ -77,6 +191,11 @@ class SpectacularAuthSettings:
             if isinstance(default_value, dict) and key in self.user_settings:
                 self._settings[key] = {**default_value, **self.user_settings[key]}
 
+        # Identifies the current configuration, e.g. to key per-settings caches
+        self.fingerprint = hashlib.sha256(
+            json.dumps(self._settings, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
     def __getattr__(self, attr):
         if attr not in self._settings:
             raise AttributeError(f"Invalid setting: '{attr}'")
@@ -92,3 +211,17 @@ class SpectacularAuthSettings:
 
 # Global settings instance
 auth_settings = SpectacularAuthSettings()
+
+
+def reload_auth_settings(*args, **kwargs):
+    if kwargs["setting"] == "DRF_SPECTACULAR_AUTH":
+        auth_settings.reload()
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(reload_auth_settings)
+except ImportError:
+    # Django not available
+    pass
@@ -0,0 +1,475 @@
+"""
+Login and logout hooks, resolved once into an immutable pipeline
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import functools
+import logging
+import queue
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from .conf import auth_settings
+
+logger = logging.getLogger(__name__)
+
+ON_ERROR_POLICIES = ("log", "raise")
+FULL_POLICIES = ("drop", "block")
+
+
+class Hook(NamedTuple):
+    """
+    A resolved hook function with its execution options
+    """
+
+    path: str
+    func: Callable
+    order: int
+    timeout: Optional[float]
+    on_error: str
+    is_async: bool
+
+
+class HookPipeline:
+    """
+    Hooks per event, imported and ordered once
+
+    HOOKS maps each event to None, a dotted path, or a list of dotted paths
+    and dicts with "PATH", "ORDER" (ascending, default 0, ties keep list
+    order), "TIMEOUT" (seconds) and "ON_ERROR" ("log" to continue with the
+    next hook, "raise" to abort the login/logout). Invalid entries raise
+    ImproperlyConfigured when the pipeline is built.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self._hooks: Dict[str, Tuple[Hook, ...]] = {
+            event: self._build_hooks(event, entries)
+            for event, entries in config.items()
+        }
+
+    def hooks(self, event: str) -> Tuple[Hook, ...]:
+        return self._hooks.get(event, ())
+
+    def run(self, event: str, request, data: Dict[str, Any]) -> None:
+        """
+        Run the hooks of an event in order
+
+        Events listed in HOOK_BACKGROUND["EVENTS"] are queued to the background
+        executor instead, so the caller does not wait for them.
+        """
+        if not self.hooks(event):
+            return
+        if _runs_in_background(event):
+            get_background_executor().submit(
+                functools.partial(self._run_hooks, event, request, data)
+            )
+        else:
+            self._run_hooks(event, request, data)
+
+    async def arun(self, event: str, request, data: Dict[str, Any]) -> None:
+        """
+        Run the hooks of an event in order from async code
+
+        Background events become asyncio tasks on the running loop.
+        """
+        if not self.hooks(event):
+            return
+        if _runs_in_background(event):
+            await get_background_executor().submit_task(
+                functools.partial(self._arun_hooks, event, request, data)
+            )
+        else:
+            await self._arun_hooks(event, request, data)
+
+    def _run_hooks(self, event: str, request, data: Dict[str, Any]) -> None:
+        """
+        Run the hooks of an event in order
+        """
+        for hook in self.hooks(event):
+            try:
+                if hook.timeout is None:
+                    result = hook.func(request, data)
+                    if hook.is_async:
+                        asyncio.run(result)
+                else:
+                    # The hook keeps running in its thread after a timeout
+                    future = _get_executor().submit(
+                        _call_sync if not hook.is_async else _call_async,
+                        hook.func,
+                        request,
+                        data,
+                    )
+                    future.result(timeout=hook.timeout)
+            except Exception as e:
+                self._handle_error(event, hook, e)
+
+    async def _arun_hooks(self, event: str, request, data: Dict[str, Any]) -> None:
+        """
+        Run the hooks of an event in order from async code
+
+        Coroutine functions are awaited directly; plain functions run in a thread.
+        """
+        for hook in self.hooks(event):
+            try:
+                if hook.is_async:
+                    call = hook.func(request, data)
+                else:
+                    call = sync_to_async(hook.func)(request, data)
+                await asyncio.wait_for(call, timeout=hook.timeout)
+            except Exception as e:
+                self._handle_error(event, hook, e)
+
+    def _handle_error(self, event: str, hook: Hook, error: Exception) -> None:
+        if isinstance(error, (asyncio.TimeoutError, concurrent.futures.TimeoutError)):
+            message = f"timed out after {hook.timeout}s"
+        else:
+            message = str(error)
+        logger.error(f"Error calling {event} hook {hook.path}: {message}")
+        if hook.on_error == "raise":
+            raise error
+
+    def _build_hooks(self, event: str, entries: Any) -> Tuple[Hook, ...]:
+        if not entries:
+            return ()
+        if isinstance(entries, (str, dict)):
+            entries = [entries]
+
+        hooks = [self._build_hook(event, entry) for entry in entries]
+        # sorted() is stable, so equal orders keep the configured order
+        return tuple(sorted(hooks, key=lambda hook: hook.order))
+
+    def _build_hook(self, event: str, entry: Any) -> Hook:
+        if isinstance(entry, str):
+            entry = {"PATH": entry}
+        if not isinstance(entry, dict) or not entry.get("PATH"):
+            raise ImproperlyConfigured(
+                f"HOOKS['{event}'] entries must be dotted paths or dicts with 'PATH'"
+            )
+
+        path = entry["PATH"]
+        try:
+            func = import_string(path)
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                f"HOOKS['{event}'] could not import '{path}': {e}"
+            ) from e
+        if not callable(func):
+            raise ImproperlyConfigured(f"HOOKS['{event}'] '{path}' is not callable")
+
+        on_error = entry.get("ON_ERROR", "log")
+        if on_error not in ON_ERROR_POLICIES:
+            raise ImproperlyConfigured(
+                f"HOOKS['{event}'] '{path}' has unknown ON_ERROR '{on_error}', "
+                f"expected one of {ON_ERROR_POLICIES}"
+            )
+
+        return Hook(
+            path=path,
+            func=func,
+            order=entry.get("ORDER", 0),
+            timeout=entry.get("TIMEOUT"),
+            on_error=on_error,
+            is_async=asyncio.iscoroutinefunction(func),
+        )
+
+
+class BackgroundExecutor:
+    """
+    Bounded queue of hook runs, worked off by daemon threads
+
+    Jobs beyond ``queue_size`` are dropped (policy "drop") or make the
+    submitting request wait for a free slot (policy "block"). Under ASGI,
+    jobs run as asyncio tasks bounded by the same limit. ``shutdown`` drains
+    the queue for up to ``drain_timeout`` seconds and runs at interpreter exit;
+    ``adrain`` waits for the tasks and runs on ASGI lifespan shutdown with
+    drf_spectacular_auth.asgi.LifespanMiddleware.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        queue_size: int = 1000,
+        full_policy: str = "drop",
+        drain_timeout: float = 10,
+    ):
+        if full_policy not in FULL_POLICIES:
+            raise ImproperlyConfigured(
+                f"HOOK_BACKGROUND['FULL_POLICY'] must be one of {FULL_POLICIES}"
+            )
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.full_policy = full_policy
+        self.drain_timeout = drain_timeout
+        self._queue: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue(
+            maxsize=queue_size
+        )
+        self._workers: List[threading.Thread] = []
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, job: Callable[[], None]) -> bool:
+        """
+        Queue a job for a worker thread; returns False if it was dropped
+        """
+        if self._closed:
+            return self._drop("executor is shut down")
+        self._start_workers()
+        try:
+            self._queue.put(job, block=self.full_policy == "block")
+        except queue.Full:
+            return self._drop("queue is full")
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    async def submit_task(self, job: Callable[[], Awaitable[None]]) -> bool:
+        """
+        Start a job as an asyncio task; returns False if it was dropped
+        """
+        if self._closed:
+            return self._drop("executor is shut down")
+        while len(self._tasks) >= self.queue_size:
+            if self.full_policy != "block":
+                return self._drop("queue is full")
+            await asyncio.wait(set(self._tasks), return_when=asyncio.FIRST_COMPLETED)
+
+        # The set keeps a reference, so running tasks are not garbage collected
+        task = asyncio.ensure_future(self._run_task(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters and queue depth for monitoring
+        """
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize() + len(self._tasks),
+                "queue_size": self.queue_size,
+                "workers": len(self._workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting jobs and let the workers finish the queued ones
+        """
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        deadline = time.monotonic() + self.drain_timeout
+        for _ in workers:
+            try:
+                remaining = max(deadline - time.monotonic(), 0)
+                self._queue.put(None, timeout=remaining if wait else 0)
+            except queue.Full:
+                break
+        if wait:
+            for worker in workers:
+                worker.join(max(deadline - time.monotonic(), 0))
+
+    async def adrain(self) -> None:
+        """
+        Wait up to drain_timeout for the running asyncio tasks, e.g. on ASGI
+        lifespan shutdown
+        """
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+
+    def _drop(self, reason: str) -> bool:
+        with self._lock:
+            self.dropped += 1
+        logger.warning(f"Dropped background hook run: {reason}")
+        return False
+
+    def _start_workers(self) -> None:
+        if len(self._workers) >= self.max_workers:
+            return
+        with self._lock:
+            while len(self._workers) < self.max_workers:
+                worker = threading.Thread(
+                    target=self._work,
+                    name=f"drf-spectacular-auth-hooks-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                job()
+            except Exception as e:
+                self._record(failed=True)
+                logger.error(f"Background hook run failed: {e}")
+            else:
+                self._record(failed=False)
+            finally:
+                # Worker threads outlive requests; do not hold connections open
+                close_old_connections()
+
+    async def _run_task(self, job: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await job()
+        except Exception as e:
+            self._record(failed=True)
+            logger.error(f"Background hook run failed: {e}")
+        else:
+            self._record(failed=False)
+
+    def _record(self, failed: bool) -> None:
+        with self._lock:
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+
+def _runs_in_background(event: str) -> bool:
+    background = auth_settings.HOOK_BACKGROUND
+    return background["ENABLED"] and event in background["EVENTS"]
+
+
+def _call_sync(func: Callable, request, data: Dict[str, Any]) -> None:
+    func(request, data)
+
+
+def _call_async(func: Callable, request, data: Dict[str, Any]) -> None:
+    asyncio.run(func(request, data))
+
+
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_background_executor: Optional[BackgroundExecutor] = None
+_pipeline: Optional[HookPipeline] = None
+_lock = threading.Lock()
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """
+    Threads running sync hooks that have a timeout
+    """
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(
+                    thread_name_prefix="drf-spectacular-auth-hook"
+                )
+    return _executor
+
+
+def get_background_executor() -> BackgroundExecutor:
+    """
+    Return the executor running background hooks, configured by HOOK_BACKGROUND
+    """
+    global _background_executor
+    executor = _background_executor
+    if executor is None:
+        with _lock:
+            if _background_executor is None:
+                background = auth_settings.HOOK_BACKGROUND
+                _background_executor = BackgroundExecutor(
+                    max_workers=background["MAX_WORKERS"],
+                    queue_size=background["QUEUE_SIZE"],
+                    full_policy=background["FULL_POLICY"],
+                    drain_timeout=background["DRAIN_TIMEOUT"],
+                )
+            executor = _background_executor
+    return executor
+
+
+def shutdown_background_executor(wait: bool = True) -> None:
+    """
+    Drain and stop the background executor; a new one starts on next use
+    """
+    global _background_executor
+    with _lock:
+        executor, _background_executor = _background_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def ashutdown_background_executor() -> None:
+    """
+    Async version of shutdown_background_executor() that also waits for the
+    hook runs started as asyncio tasks; run it on ASGI lifespan shutdown
+    """
+    global _background_executor
+    with _lock:
+        executor, _background_executor = _background_executor, None
+    if executor is not None:
+        await executor.adrain()
+        await sync_to_async(executor.shutdown, thread_sensitive=False)()
+
+
+atexit.register(shutdown_background_executor)
+
+
+def get_hook_pipeline() -> HookPipeline:
+    """
+    Return the hook pipeline for the current HOOKS setting
+
+    Built when the app is ready, so invalid hooks fail at startup, and again
+    after DRF_SPECTACULAR_AUTH changes.
+    """
+    global _pipeline
+    pipeline = _pipeline
+    if pipeline is None:
+        with _lock:
+            if _pipeline is None:
+                _pipeline = HookPipeline(auth_settings.HOOKS)
+            pipeline = _pipeline
+    return pipeline
+
+
+def clear_hook_pipeline() -> None:
+    global _pipeline
+    with _lock:
+        _pipeline = None
+
+
+def _clear_on_setting_changed(*args, **kwargs):
+    if kwargs["setting"] == "DRF_SPECTACULAR_AUTH":
+        clear_hook_pipeline()
+        shutdown_background_executor(wait=False)
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(_clear_on_setting_changed)
+except ImportError:
+    # Django not available
+    pass
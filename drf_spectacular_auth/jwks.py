@@ -0,0 +1,238 @@
+"""
+JSON Web Key Set store for local token verification
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, Optional
+
+from .conf import auth_settings
+from .providers.base import AuthenticationError, ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeyStore:
+    """
+    Process-wide cache of a user pool's signing keys, indexed by key ID
+
+    Keys are fetched once and served from memory. Once they are older than
+    ``cache_ttl`` the stale keys keep being served while a background thread
+    refetches them. An unknown ``kid`` (key rotation) triggers a synchronous
+    refetch, at most once per ``min_refetch_interval`` seconds; while no keys
+    are cached, requests within that interval of a failed fetch fail fast
+    instead of each fetching again.
+
+    With ``snapshot_path`` set, every successful fetch is written to disk and
+    new processes (e.g. freshly forked gunicorn workers) start from that file
+    instead of the network.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        cache_ttl: float = 3600,
+        min_refetch_interval: float = 60,
+        snapshot_path: Optional[str] = None,
+        fetch_timeout: float = 5,
+    ):
+        self.url = url
+        self.cache_ttl = cache_ttl
+        self.min_refetch_interval = min_refetch_interval
+        self.snapshot_path = snapshot_path
+        self.fetch_timeout = fetch_timeout
+
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._last_fetch_failed = False
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+        if snapshot_path:
+            self._load_snapshot()
+
+    def get_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the JWK for a key ID, or None if the user pool has no such key
+
+        Raises:
+            AuthenticationError: If no keys are available and fetching fails
+        """
+        if kid not in self._keys:
+            self._refetch()
+        elif time.time() - self._fetched_at > self.cache_ttl:
+            self._refresh_in_background()
+
+        return self._keys.get(kid)
+
+    def get_cached_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the JWK for a key ID only if it is already cached
+
+        Never blocks on the network (stale keys are still refreshed in the
+        background), which makes it safe to call from async code.
+        """
+        key = self._keys.get(kid)
+        if key is not None and time.time() - self._fetched_at > self.cache_ttl:
+            self._refresh_in_background()
+        return key
+
+    def refresh(self) -> None:
+        """
+        Fetch the key set and replace the cached keys
+
+        Raises:
+            AuthenticationError: If the key set cannot be fetched
+        """
+        self._last_attempt = time.time()
+        try:
+            jwks = self._fetch()
+        except AuthenticationError:
+            self._last_fetch_failed = True
+            raise
+        self._last_fetch_failed = False
+        self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+        self._fetched_at = time.time()
+
+        if self.snapshot_path:
+            self._write_snapshot(jwks)
+
+    def _refetch(self) -> None:
+        """
+        Synchronously refetch keys, at most once per ``min_refetch_interval``
+
+        Raises:
+            ServiceUnavailableError: If no keys are cached and the last fetch,
+                possibly by another thread, failed within the interval
+        """
+        attempt_before = self._last_attempt
+        with self._lock:
+            since_attempt = time.time() - self._last_attempt
+            # Another thread refetched while we were waiting for the lock
+            if (
+                self._last_attempt != attempt_before
+                or since_attempt < self.min_refetch_interval
+            ):
+                if not self._keys and self._last_fetch_failed:
+                    raise ServiceUnavailableError(
+                        "Token verification failed",
+                        "Unable to fetch signing keys",
+                        retry_after=max(
+                            1, int(self.min_refetch_interval - since_attempt)
+                        ),
+                    )
+                return
+            self.refresh()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        thread = threading.Thread(
+            target=self._background_refresh, name="jwks-refresh", daemon=True
+        )
+        thread.start()
+
+    def _background_refresh(self) -> None:
+        try:
+            with self._lock:
+                self.refresh()
+        except AuthenticationError:
+            # Keep serving the stale keys; the next access retries
+            pass
+        finally:
+            self._refreshing = False
+
+    def _fetch(self) -> Dict[str, Any]:
+        try:
+            with urllib.request.urlopen(
+                self.url, timeout=self.fetch_timeout
+            ) as response:
+                return json.loads(response.read())
+        except Exception as e:
+            logger.error(f"Failed to fetch JWKS from {self.url}: {str(e)}")
+            raise ServiceUnavailableError(
+                "Token verification failed", "Unable to fetch signing keys"
+            )
+
+    def _load_snapshot(self) -> None:
+        try:
+            with open(self.snapshot_path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            if snapshot.get("url") != self.url:
+                return
+            self._keys = {key["kid"]: key for key in snapshot["jwks"]["keys"]}
+            self._fetched_at = snapshot["fetched_at"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable JWKS snapshot: {str(e)}")
+
+    def _write_snapshot(self, jwks: Dict[str, Any]) -> None:
+        """
+        Atomically replace the snapshot file so readers never see partial data
+        """
+        snapshot = {"url": self.url, "fetched_at": self._fetched_at, "jwks": jwks}
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".jwks-")
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump(snapshot, tmp_file)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Failed to write JWKS snapshot: {str(e)}")
+
+
+_stores: Dict[str, JWKSKeyStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_jwks_store(url: str) -> JWKSKeyStore:
+    """
+    Return the shared key store for a JWKS URL, configured from JWKS settings
+    """
+    store = _stores.get(url)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(url)
+            if store is None:
+                config = auth_settings.JWKS
+                store = JWKSKeyStore(
+                    url,
+                    cache_ttl=config["CACHE_TTL"],
+                    min_refetch_interval=config["MIN_REFETCH_INTERVAL"],
+                    snapshot_path=config["SNAPSHOT_PATH"],
+                    fetch_timeout=config["FETCH_TIMEOUT"],
+                )
+                _stores[url] = store
+    return store
+
+
+def clear_jwks_stores() -> None:
+    """
+    Drop all shared key stores, e.g. after the JWKS settings changed
+    """
+    with _stores_lock:
+        _stores.clear()
+
+
+def _clear_on_setting_changed(*args, **kwargs):
+    if kwargs["setting"] == "DRF_SPECTACULAR_AUTH":
+        clear_jwks_stores()
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(_clear_on_setting_changed)
+except ImportError:
+    # Django not available
+    pass
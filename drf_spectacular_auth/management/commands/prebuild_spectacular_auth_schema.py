@@ -0,0 +1,108 @@
+"""
+Prebuild the cached schemas served by SpectacularAuthAPIView
+"""
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpRequest, QueryDict
+from django.urls import NoReverseMatch, resolve, reverse
+
+from drf_spectacular_auth.conf import auth_settings
+from drf_spectacular_auth.schema import INDEX_SHARD, bump_schema_generation
+from drf_spectacular_auth.views import SpectacularAuthAPIView
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the schema variants of a SpectacularAuthAPIView route and "
+        "store them in the schema cache, e.g. at deploy time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url-name",
+            default="schema",
+            help="URL name of the SpectacularAuthAPIView route (default: schema)",
+        )
+        parser.add_argument(
+            "--api-version",
+            action="append",
+            dest="api_versions",
+            help="API version to build; may be repeated",
+        )
+        parser.add_argument(
+            "--lang",
+            action="append",
+            dest="languages",
+            help="Language to build (the view's ?lang= parameter); may be repeated",
+        )
+        parser.add_argument(
+            "--keep-generation",
+            action="store_true",
+            help=(
+                "Keep the current schema generation instead of invalidating all "
+                "cached schemas, e.g. when prebuilding a second route"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            path = reverse(options["url_name"])
+        except NoReverseMatch:
+            raise CommandError(f"No URL named '{options['url_name']}'")
+
+        match = resolve(path)
+        view_class = getattr(match.func, "view_class", None)
+        if view_class is None or not issubclass(view_class, SpectacularAuthAPIView):
+            raise CommandError(
+                f"'{options['url_name']}' is not served by SpectacularAuthAPIView"
+            )
+        if not options["keep_generation"]:
+            # Also invalidates the variants not built here: per-role schemas
+            # and their tag shards are regenerated on their next request
+            generation = bump_schema_generation()
+            self.stdout.write(f"Started schema generation {generation}")
+
+        view = view_class.as_view(**match.func.view_initkwargs, refresh_cache=True)
+        # Building the index builds every tag shard along with it
+        shards = [None, INDEX_SHARD] if auth_settings.SCHEMA_SHARDING else [None]
+
+        for version in options["api_versions"] or [None]:
+            for language in options["languages"] or [None]:
+                for renderer_class in view_class.renderer_classes:
+                    for shard in shards:
+                        self._build(
+                            view, match, path, renderer_class, version, language, shard
+                        )
+
+    def _build(self, view, match, path, renderer_class, version, language, shard):
+        media_type = renderer_class.media_type
+        variant = f"{media_type} (version={version}, lang={language}, shard={shard})"
+        request = self._get_request(path, media_type, version, language, shard)
+        response = view(request, *match.args, **match.kwargs)
+        if response.status_code != 200:
+            raise CommandError(f"Building {variant} failed with {response.status_code}")
+        self.stdout.write(f"Built {variant}")
+
+    def _get_request(self, path, media_type, version, language, shard) -> HttpRequest:
+        """
+        Anonymous request for one schema variant, as a browser would send it
+        """
+        request = HttpRequest()
+        request.method = "GET"
+        request.path = request.path_info = path
+        request.META = {
+            "HTTP_ACCEPT": media_type,
+            "SERVER_NAME": "localhost",
+            "SERVER_PORT": "80",
+        }
+        query = QueryDict(mutable=True)
+        if version:
+            query["version"] = version
+        if language:
+            query["lang"] = language
+        if shard:
+            query["shard"] = shard
+        request.GET = query
+        request.user = AnonymousUser()
+        return request
@@ -0,0 +1,122 @@
+"""
+Localized messages of the auth panel
+"""
+
+import json
+from typing import Dict
+
+from .conf import auth_settings
+
+FALLBACK_LANGUAGE = "en"
+
+MESSAGES = {
+    "ko": {
+        "panelTitle": "Cognito 로그인",
+        "email": "이메일",
+        "password": "패스워드",
+        "loginInProgress": "로그인 중...",
+        "loginSuccess": "로그인에 성공했습니다!",
+        "loginFailed": "로그인에 실패했습니다.",
+        "networkError": "네트워크 오류가 발생했습니다.",
+        "logoutSuccess": "로그아웃되었습니다.",
+        "sessionExpired": "세션이 만료되었습니다. 다시 로그인하세요.",
+        "tokenCopied": "토큰이 클립보드에 복사되었습니다!",
+        "tokenCopyFailed": "토큰 복사에 실패했습니다. 수동으로 복사하세요.",
+        "noTokenToCopy": "복사할 토큰이 없습니다.",
+        "copied": "✅ 복사됨",
+        "unauthenticated": "미인증",
+        "authenticated": "인증됨",
+        "login": "로그인",
+        "logout": "로그아웃",
+        "copyToken": "토큰 복사",
+        "manualCopyTitle": "액세스 토큰 수동 복사",
+        "manualCopyDesc": (
+            "아래 토큰을 선택하여 복사한 후, "
+            "Swagger UI의 Authorization 대화상자에 붙여넣으세요."
+        ),
+        "close": "닫기",
+    },
+    "en": {
+        "panelTitle": "Cognito Login",
+        "email": "Email",
+        "password": "Password",
+        "loginInProgress": "Logging in...",
+        "loginSuccess": "Login successful!",
+        "loginFailed": "Login failed.",
+        "networkError": "Network error occurred.",
+        "logoutSuccess": "Logout successful.",
+        "sessionExpired": "Session expired. Please log in again.",
+        "tokenCopied": "Token copied to clipboard!",
+        "tokenCopyFailed": "Failed to copy token. Please copy manually.",
+        "noTokenToCopy": "No token to copy.",
+        "copied": "✅ Copied",
+        "unauthenticated": "Unauthenticated",
+        "authenticated": "Authenticated",
+        "login": "Login",
+        "logout": "Logout",
+        "copyToken": "Copy Token",
+        "manualCopyTitle": "Manual Access Token Copy",
+        "manualCopyDesc": (
+            "Select and copy the token below, "
+            "then paste it in the Swagger UI Authorization dialog."
+        ),
+        "close": "Close",
+    },
+    "ja": {
+        "panelTitle": "Cognito ログイン",
+        "email": "メール",
+        "password": "パスワード",
+        "loginInProgress": "ログイン中...",
+        "loginSuccess": "ログインに成功しました！",
+        "loginFailed": "ログインに失敗しました。",
+        "networkError": "ネットワークエラーが発生しました。",
+        "logoutSuccess": "ログアウトしました。",
+        "sessionExpired": "セッションの有効期限が切れました。再度ログインしてください。",
+        "tokenCopied": "トークンがクリップボードにコピーされました！",
+        "tokenCopyFailed": "トークンのコピーに失敗しました。手動でコピーしてください。",
+        "noTokenToCopy": "コピーするトークンがありません。",
+        "copied": "✅ コピー済み",
+        "unauthenticated": "未認証",
+        "authenticated": "認証済み",
+        "login": "ログイン",
+        "logout": "ログアウト",
+        "copyToken": "トークンをコピー",
+        "manualCopyTitle": "アクセストークン手動コピー",
+        "manualCopyDesc": (
+            "下のトークンを選択してコピーし、"
+            "Swagger UIのAuthorization ダイアログに貼り付けてください。"
+        ),
+        "close": "閉じる",
+    },
+}
+
+# Keeps the JSON safe to embed in an inline <script>
+JSON_SCRIPT_ESCAPES = {
+    ord("<"): "\\u003C",
+    ord(">"): "\\u003E",
+    ord("&"): "\\u0026",
+}
+
+
+def get_message_bundle(language: str) -> Dict[str, str]:
+    """
+    Return the messages of one language, filled up with English fallbacks
+
+    CUSTOM_TRANSLATIONS ({language: {key: message}}) extends or overrides the
+    built-in messages, and may add languages listed in SUPPORTED_LANGUAGES.
+    """
+    custom = auth_settings.CUSTOM_TRANSLATIONS
+    bundle = {
+        **MESSAGES[FALLBACK_LANGUAGE],
+        **custom.get(FALLBACK_LANGUAGE, {}),
+    }
+    if language != FALLBACK_LANGUAGE:
+        bundle.update(MESSAGES.get(language, {}))
+        bundle.update(custom.get(language, {}))
+    return bundle
+
+
+def get_message_bundle_json(language: str) -> str:
+    return json.dumps(
+        get_message_bundle(language), ensure_ascii=False, sort_keys=True
+    ).translate(JSON_SCRIPT_ESCAPES)
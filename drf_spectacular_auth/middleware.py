@@ -3,28 +3,48 @@ Middleware for DRF Spectacular Auth
 """
 
 import logging
+from functools import partial
 from typing import Optional
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model, login
 from django.http import HttpRequest, HttpResponse
 from django.urls import resolve
 from django.utils.deprecation import MiddlewareMixin
 
 from .conf import auth_settings
-from .providers.cognito import CognitoAuthProvider
+from .routes import get_docs_route_index, is_docs_view_name
+from .verification import averify_token, verify_token
 
 logger = logging.getLogger(__name__)
 
 
+async def _get_logged_in_user(user):
+    return user
+
+
 class SpectacularAuthMiddleware(MiddlewareMixin):
     """
     Middleware to handle authentication for DRF Spectacular views
+
+    Supports both sync and async stacks: under ASGI, Django calls __acall__,
+    which verifies tokens without blocking the event loop.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
         super().__init__(get_response)
 
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Async request handling, the native counterpart of process_request()
+        """
+        response = await self.aprocess_request(request)
+        return response or await self.get_response(request)
+
     def process_request(self, request: HttpRequest) -> Optional[HttpResponse]:
         """
         Process incoming requests to check authentication
@@ -50,21 +70,51 @@ class SpectacularAuthMiddleware(MiddlewareMixin):
 
         return None
 
+    async def aprocess_request(self, request: HttpRequest) -> Optional[HttpResponse]:
+        """
+        Async version of process_request()
+        """
+        # Skip if not a spectacular view
+        if not self._is_spectacular_view(request):
+            return None
+
+        # Check if user is already authenticated (may hit the session store)
+        if hasattr(request, "auser"):
+            is_authenticated = (await request.auser()).is_authenticated
+        else:
+            is_authenticated = await sync_to_async(
+                lambda: request.user.is_authenticated
+            )()
+        if is_authenticated:
+            return None
+
+        # Check for token in headers (from auth panel)
+        auth_header = request.META.get("HTTP_AUTHORIZATION")
+        if auth_header and auth_header.startswith("Bearer "):
+            token = auth_header.split(" ")[1]
+            user = await self._aauthenticate_with_token(token)
+            if user:
+                await sync_to_async(login)(request, user)
+                # login() only replaces request.user; keep auser() consistent
+                request.auser = partial(_get_logged_in_user, user)
+                return None
+
+        return None
+
     def _is_spectacular_view(self, request: HttpRequest) -> bool:
         """
         Check if the current request is for a spectacular view
+
+        The precompiled docs route index rules out ordinary requests without
+        resolving their URL; only candidate paths are resolved.
         """
         try:
-            resolver_match = resolve(request.path_info)
-            view_name = resolver_match.view_name
+            urlconf = getattr(request, "urlconf", None)
+            if not get_docs_route_index(urlconf).may_match(request.path_info):
+                return False
 
-            # Check if it's a spectacular-related view
-            spectacular_views = ["schema", "swagger-ui", "redoc", "spectacular"]
-
-            return any(
-                spectacular in str(view_name).lower()
-                for spectacular in spectacular_views
-            )
+            resolver_match = resolve(request.path_info, urlconf)
+            return is_docs_view_name(resolver_match.view_name)
         except Exception:
             return False
 
@@ -73,28 +123,48 @@ class SpectacularAuthMiddleware(MiddlewareMixin):
         Authenticate user with JWT token
         """
         try:
-            provider = CognitoAuthProvider()
+            # Verify token and get user info (cached per token)
+            user_info = verify_token(token)
+            if user_info:
+                return self._get_user(user_info)
 
-            # Verify token and get user info
-            user_info = provider.verify_token(token)
+        except Exception as e:
+            logger.error(f"Token authentication failed: {e}")
+
+        return None
+
+    async def _aauthenticate_with_token(self, token: str):
+        """
+        Async version of _authenticate_with_token()
+        """
+        try:
+            user_info = await averify_token(token)
             if user_info:
-                # Try to get existing user or create a temporary one
-                User = get_user_model()
-
-                try:
-                    user = User.objects.get(email=user_info.get("email"))
-                    return user
-                except User.DoesNotExist:
-                    # For documentation access, we can create a temporary user
-                    # or return a simple authenticated user object
-                    if auth_settings.CREATE_TEMP_USER:
-                        return self._create_temp_user(user_info)
+                return await sync_to_async(self._get_user)(user_info)
 
         except Exception as e:
             logger.error(f"Token authentication failed: {e}")
 
         return None
 
+    def _get_user(self, user_info: dict):
+        """
+        Get the user for verified token user info
+        """
+        # Try to get existing user or create a temporary one
+        User = get_user_model()
+
+        try:
+            user = User.objects.get(email=user_info.get("email"))
+            return user
+        except User.DoesNotExist:
+            # For documentation access, we can create a temporary user
+            # or return a simple authenticated user object
+            if auth_settings.CREATE_TEMP_USER:
+                return self._create_temp_user(user_info)
+
+        return None
+
     def _create_temp_user(self, user_info: dict):
         """
         Create a temporary user for documentation access
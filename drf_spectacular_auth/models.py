@@ -0,0 +1,29 @@
+"""
+Abstract models for projects that store the audit trail in their database
+"""
+
+from django.db import models
+
+
+class AbstractAuditEvent(models.Model):
+    """
+    Login and logout audit event, written by ModelAuditSink
+
+    Subclass it in one of your apps and point AUDIT["SINK_OPTIONS"]["model"]
+    at the subclass, e.g. "accounts.LoginAuditEvent".
+    """
+
+    event = models.CharField(max_length=32, db_index=True)
+    timestamp = models.DateTimeField(db_index=True)
+    email = models.CharField(max_length=254, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    user_agent = models.TextField(blank=True)
+    error_type = models.CharField(max_length=128, blank=True)
+    detail = models.TextField(blank=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["-timestamp"]
+
+    def __str__(self):
+        return f"{self.event} {self.email} {self.timestamp}"
@@ -0,0 +1,270 @@
+"""
+Async AWS Cognito authentication provider
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+from typing import Any, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from botocore.exceptions import ClientError
+
+from ..conf import auth_settings
+from ..jwks import get_jwks_store
+from .base import AsyncAuthProvider, AuthenticationError, ServiceUnavailableError
+from .cognito import CognitoAuthProvider
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCognitoAuthProvider(CognitoAuthProvider, AsyncAuthProvider):
+    """
+    AWS Cognito User Pool provider with non-blocking Cognito calls
+
+    InitiateAuth and GetUser are unsigned Cognito operations, so they are sent
+    as plain JSON requests over httpx instead of through boto3. Cognito errors
+    are mapped to botocore ClientErrors to share the sync error handling. The
+    synchronous API inherited from CognitoAuthProvider keeps working.
+    """
+
+    def __init__(self):
+        if httpx is None:
+            raise ImportError(
+                "httpx is required for AsyncCognitoAuthProvider. "
+                "Install it with: pip install drf-spectacular-auth[async]"
+            )
+        super().__init__()
+        # httpx connection pools are bound to the event loop they are used on
+        self._http_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def endpoint_url(self) -> str:
+        return f"https://cognito-idp.{self.region}.amazonaws.com/"
+
+    async def aauthenticate(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Authenticate user with AWS Cognito without blocking the event loop
+        """
+        email = credentials.get("email")
+        password = credentials.get("password")
+
+        if not email or not password:
+            raise AuthenticationError("Email and password are required")
+
+        try:
+            response = await self._call(
+                "InitiateAuth",
+                {
+                    "ClientId": self.client_id,
+                    "AuthFlow": "USER_PASSWORD_AUTH",
+                    "AuthParameters": self._get_password_auth_parameters(
+                        email, password
+                    ),
+                },
+            )
+
+            auth_result = response["AuthenticationResult"]
+            user_info = await self._aget_id_token_user_info(auth_result)
+            if user_info is None:
+                user_info = await self.aget_user_info(auth_result["AccessToken"])
+
+            logger.info(f"Successful authentication for user: {email}")
+
+            return self._get_login_result(auth_result, user_info)
+
+        except ClientError as e:
+            raise self._get_authentication_error(e, email)
+
+        except AuthenticationError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Unexpected authentication error: {str(e)}")
+            raise AuthenticationError(
+                "Authentication failed", "An unexpected error occurred"
+            )
+
+    async def _aget_id_token_user_info(
+        self, auth_result: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Async version of _get_id_token_user_info()
+        """
+        id_token = auth_result.get("IdToken")
+        if not self.user_info_from_id_token or not id_token:
+            return None
+
+        try:
+            decoded = self._decode_local_token(id_token)
+            kid = decoded.header.get("kid")
+            signing_key = get_jwks_store(self.jwks_url).get_cached_key(kid)
+            if signing_key is None:
+                # Cold start or key rotation: the key store fetches synchronously
+                signing_key = await sync_to_async(self._get_signing_key)(kid)
+            return self._get_id_token_claims_user_info(decoded, signing_key)
+        except AuthenticationError as e:
+            logger.warning(f"IdToken not usable for user info: {e.detail}")
+            return None
+
+    async def aget_user_info(self, token: str) -> Dict[str, Any]:
+        """
+        Get user information from Cognito access token
+        """
+        try:
+            user_response = await self._call("GetUser", {"AccessToken": token})
+            return self._get_user_info_from_attributes(user_response)
+
+        except (ClientError, httpx.HTTPError) as e:
+            logger.error(f"Failed to get user info: {str(e)}")
+            raise self._get_user_info_error(e)
+
+    async def arefresh_token(
+        self, refresh_token: str, username: str = None
+    ) -> Dict[str, Any]:
+        """
+        Refresh access token using Cognito refresh token
+        """
+        try:
+            response = await self._call(
+                "InitiateAuth",
+                {
+                    "ClientId": self.client_id,
+                    "AuthFlow": "REFRESH_TOKEN_AUTH",
+                    "AuthParameters": self._get_refresh_auth_parameters(
+                        refresh_token, username
+                    ),
+                },
+            )
+
+            return self._get_refresh_result(response["AuthenticationResult"])
+
+        except ClientError as e:
+            logger.error(f"Token refresh failed: {str(e)}")
+            raise AuthenticationError(
+                "Token refresh failed", "Invalid or expired refresh token"
+            )
+
+    async def asign_out(
+        self, access_token: Optional[str], refresh_token: Optional[str] = None
+    ) -> None:
+        """
+        Sign the user out of Cognito as set by REVOCATION["COGNITO_SIGN_OUT"]
+        """
+        try:
+            operation = self._get_sign_out_operation(access_token, refresh_token)
+            if operation is not None:
+                await self._call(*operation)
+
+        except ClientError as e:
+            logger.error(f"Cognito sign out failed: {str(e)}")
+            raise AuthenticationError(
+                "Sign out failed", "The session could not be revoked"
+            )
+
+    async def averify_token(self, access_token: str) -> Dict[str, Any]:
+        """
+        Verify access token and return user information
+
+        Raises:
+            AuthenticationError: If token is invalid or expired
+        """
+        try:
+            if self.verification_mode == "local":
+                return await self._averify_token_locally(access_token)
+            return await self.aget_user_info(access_token)
+
+        except AuthenticationError:
+            raise
+        except Exception as e:
+            # Not a verdict on the token, so it must not be cached as one
+            logger.error(f"Token verification failed: {str(e)}")
+            raise ServiceUnavailableError(
+                "Token verification failed", "Unable to verify the access token"
+            )
+
+    async def _averify_token_locally(self, token: str) -> Dict[str, Any]:
+        decoded = self._decode_local_token(token)
+        kid = decoded.header.get("kid")
+
+        signing_key = get_jwks_store(self.jwks_url).get_cached_key(kid)
+        if signing_key is None:
+            # Cold start or key rotation: the key store fetches synchronously
+            signing_key = await sync_to_async(self._get_signing_key)(kid)
+
+        user_info = self._get_verified_claims_user_info(decoded, signing_key)
+        if not user_info.get("email"):
+            sub = user_info.get("sub")
+            user_info = self._get_cached_user_attributes(sub)
+            if user_info is None:
+                user_info = await self.aget_user_info(token)
+                self._remember_user_attributes(sub, user_info)
+        return user_info
+
+    async def _call(self, operation: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Call a Cognito Identity Provider API operation, through the circuit
+        breaker and concurrency limiter
+
+        Raises:
+            ClientError: If Cognito returns an error response
+            ServiceUnavailableError: If the call was rejected without being made
+        """
+        return await self.call_guard.acall(self._send, operation, payload)
+
+    async def _send(self, operation: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._get_http_client().post(
+            self.endpoint_url,
+            content=json.dumps(payload),
+            headers={
+                "Content-Type": "application/x-amz-json-1.1",
+                "X-Amz-Target": f"AWSCognitoIdentityProviderService.{operation}",
+            },
+        )
+        body = response.json() if response.content else {}
+
+        if response.status_code >= 400:
+            error_code = body.get("__type", "UnknownError").rsplit("#", 1)[-1]
+            raise ClientError(
+                {
+                    "Error": {
+                        "Code": error_code,
+                        "Message": body.get("message", body.get("Message", "")),
+                    },
+                    "ResponseMetadata": {"HTTPStatusCode": response.status_code},
+                },
+                operation,
+            )
+
+        return body
+
+    def _get_http_client(self) -> "httpx.AsyncClient":
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        if client is None:
+            client_config = auth_settings.COGNITO_CLIENT_CONFIG
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    client_config["READ_TIMEOUT"],
+                    connect=client_config["CONNECT_TIMEOUT"],
+                ),
+                limits=httpx.Limits(
+                    max_connections=client_config["MAX_POOL_CONNECTIONS"]
+                ),
+            )
+            self._http_clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        """
+        Close the HTTP client of the running event loop
+        """
+        client = self._http_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
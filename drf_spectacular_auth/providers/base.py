@@ -73,6 +73,65 @@ class AuthProvider(ABC):
         """
         raise NotImplementedError("Token refresh not supported by this provider")
 
+    def sign_out(
+        self, access_token: Optional[str], refresh_token: Optional[str] = None
+    ) -> None:
+        """
+        Invalidate the user's tokens at the identity provider on logout
+
+        Args:
+            access_token: Access token of the session, possibly expired or
+                missing
+            refresh_token: Refresh token of the session, if the client sent it
+
+        Providers without server-side sign-out do nothing.
+        """
+
+
+class AsyncAuthProvider(ABC):
+    """
+    Base class for authentication providers with a native async API
+
+    Used by the async views and middleware under ASGI, so waiting on the
+    identity provider does not occupy a thread.
+    """
+
+    @abstractmethod
+    async def aauthenticate(self, credentials: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async version of AuthProvider.authenticate()
+        """
+        pass
+
+    @abstractmethod
+    async def aget_user_info(self, token: str) -> Dict[str, Any]:
+        """
+        Async version of AuthProvider.get_user_info()
+        """
+        pass
+
+    def validate_credentials(self, credentials: Dict[str, Any]) -> bool:
+        """
+        Validate credentials format (no I/O, so shared with the sync API)
+        """
+        return True
+
+    async def arefresh_token(self, refresh_token: str) -> Dict[str, Any]:
+        """
+        Async version of AuthProvider.refresh_token()
+
+        Raises:
+            NotImplementedError: If provider doesn't support token refresh
+        """
+        raise NotImplementedError("Token refresh not supported by this provider")
+
+    async def asign_out(
+        self, access_token: Optional[str], refresh_token: Optional[str] = None
+    ) -> None:
+        """
+        Async version of AuthProvider.sign_out()
+        """
+
 
 class AuthenticationError(Exception):
     """
@@ -83,3 +142,19 @@ class AuthenticationError(Exception):
         self.message = message
         self.detail = detail
         super().__init__(message)
+
+
+class ServiceUnavailableError(AuthenticationError):
+    """
+    Exception raised when the identity provider is failing, overloaded or
+    unreachable, or is not called because of that
+
+    Unlike other authentication errors this says nothing about the
+    credentials or token, so it maps to 503 and is not cached as a rejection.
+    """
+
+    def __init__(
+        self, message: str, detail: Optional[str] = None, retry_after: int = 1
+    ):
+        super().__init__(message, detail)
+        self.retry_after = retry_after
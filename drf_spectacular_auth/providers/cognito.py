@@ -6,16 +6,137 @@ import base64
 import hashlib
 import hmac
 import logging
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 import boto3
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
+from ..cache import create_token_cache, token_fingerprint
+from ..concurrency import CallGuard, CircuitBreaker, ConcurrencyLimiter, SingleFlight
 from ..conf import auth_settings
-from .base import AuthenticationError, AuthProvider
+from ..jwks import get_jwks_store
+from ..tokens import (
+    DecodedToken,
+    decode_token,
+    validate_claims,
+    verify_rs256_signature,
+)
+from .base import AuthenticationError, AuthProvider, ServiceUnavailableError
 
 logger = logging.getLogger(__name__)
 
+# Error codes meaning Cognito is overloaded rather than the request is wrong
+THROTTLING_ERROR_CODES = {
+    "TooManyRequestsException",
+    "ThrottlingException",
+    "InternalErrorException",
+}
+
+
+def is_service_failure(error: BaseException) -> bool:
+    """
+    Whether a failed Cognito call counts against the circuit breaker
+
+    Client errors such as wrong credentials or expired tokens do not.
+    """
+    if not isinstance(error, Exception):
+        # Cancelled by the caller
+        return False
+    if isinstance(error, ClientError):
+        status_code = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        code = error.response.get("Error", {}).get("Code")
+        return code in THROTTLING_ERROR_CODES or (status_code or 0) >= 500
+    return True
+
+
+_call_guards: Dict[str, CallGuard] = {}
+_call_guards_lock = threading.Lock()
+
+
+def get_call_guard() -> CallGuard:
+    """
+    Return the circuit breaker and concurrency limiter for Cognito calls
+
+    One guard is shared per settings fingerprint by every provider instance,
+    sync and async, so COGNITO_CONCURRENCY caps the calls of the whole process
+    and all failures count against the same circuit.
+    """
+    key = auth_settings.fingerprint
+    guard = _call_guards.get(key)
+    if guard is None:
+        with _call_guards_lock:
+            guard = _call_guards.get(key)
+            if guard is None:
+                guard = _call_guards[key] = _build_call_guard()
+    return guard
+
+
+def clear_call_guards() -> None:
+    with _call_guards_lock:
+        _call_guards.clear()
+
+
+_user_attributes_caches: Dict[str, Any] = {}
+_user_attributes_caches_lock = threading.Lock()
+
+
+def get_user_attributes_cache():
+    """
+    Return the cache of GetUser results by "sub", configured by
+    USER_ATTRIBUTES_CACHE and shared by the sync and async providers
+    """
+    key = auth_settings.fingerprint
+    cache = _user_attributes_caches.get(key)
+    if cache is None:
+        with _user_attributes_caches_lock:
+            cache = _user_attributes_caches.get(key)
+            if cache is None:
+                cache = _user_attributes_caches[key] = create_token_cache(
+                    auth_settings.USER_ATTRIBUTES_CACHE, "user-attributes"
+                )
+    return cache
+
+
+def clear_user_attributes_caches() -> None:
+    with _user_attributes_caches_lock:
+        _user_attributes_caches.clear()
+
+
+def _build_call_guard() -> CallGuard:
+    """
+    Build the guard configured by COGNITO_CIRCUIT_BREAKER and COGNITO_CONCURRENCY
+    """
+    breaker = auth_settings.COGNITO_CIRCUIT_BREAKER
+    concurrency = auth_settings.COGNITO_CONCURRENCY
+    return CallGuard(
+        circuit_breaker=(
+            CircuitBreaker(
+                window_size=breaker["WINDOW_SIZE"],
+                min_calls=breaker["MIN_CALLS"],
+                failure_rate=breaker["FAILURE_RATE"],
+                slow_call_duration=breaker["SLOW_CALL_DURATION"],
+                slow_call_rate=breaker["SLOW_CALL_RATE"],
+                open_duration=breaker["OPEN_DURATION"],
+                half_open_calls=breaker["HALF_OPEN_CALLS"],
+            )
+            if breaker["ENABLED"]
+            else None
+        ),
+        limiter=(
+            ConcurrencyLimiter(
+                max_concurrent=concurrency["MAX_CONCURRENT"],
+                max_waiting=concurrency["MAX_WAITING"],
+                wait_timeout=concurrency["WAIT_TIMEOUT"],
+            )
+            if concurrency["ENABLED"]
+            else None
+        ),
+        is_failure=is_service_failure,
+    )
+
 
 class CognitoAuthProvider(AuthProvider):
     """
@@ -26,11 +147,61 @@ class CognitoAuthProvider(AuthProvider):
         self.region = auth_settings.COGNITO_REGION
         self.client_id = auth_settings.COGNITO_CLIENT_ID
         self.client_secret = auth_settings.COGNITO_CLIENT_SECRET
+        self.user_pool_id = auth_settings.COGNITO_USER_POOL_ID
+        self.verification_mode = auth_settings.TOKEN_VERIFICATION
+        self.user_info_from_id_token = auth_settings.LOGIN_USER_INFO_FROM_ID_TOKEN
 
         if not self.client_id:
             raise ValueError("COGNITO_CLIENT_ID is required for CognitoAuthProvider")
 
-        self.client = boto3.client("cognito-idp", region_name=self.region)
+        if self.verification_mode == "local" and not self.user_pool_id:
+            raise ValueError(
+                "COGNITO_USER_POOL_ID is required for local token verification"
+            )
+
+        if self.user_info_from_id_token and not self.user_pool_id:
+            raise ValueError(
+                "COGNITO_USER_POOL_ID is required for LOGIN_USER_INFO_FROM_ID_TOKEN"
+            )
+
+        self.client = boto3.client(
+            "cognito-idp", region_name=self.region, config=self._get_client_config()
+        )
+        self._verifications = SingleFlight()
+        # Shared by the sync and async APIs, as both call the same service
+        self.call_guard = get_call_guard()
+
+    def _get_client_config(self) -> Config:
+        """
+        Build the botocore configuration for the Cognito client
+
+        The client is shared by all threads through the provider registry, so
+        the connection pool is sized for concurrent requests.
+        """
+        client_config = auth_settings.COGNITO_CLIENT_CONFIG
+        return Config(
+            max_pool_connections=client_config["MAX_POOL_CONNECTIONS"],
+            connect_timeout=client_config["CONNECT_TIMEOUT"],
+            read_timeout=client_config["READ_TIMEOUT"],
+            retries={
+                "mode": client_config["RETRY_MODE"],
+                "max_attempts": client_config["MAX_ATTEMPTS"],
+            },
+        )
+
+    @property
+    def issuer(self) -> str:
+        """
+        Issuer URL of the configured user pool, as found in the "iss" claim
+        """
+        return f"https://cognito-idp.{self.region}.amazonaws.com/{self.user_pool_id}"
+
+    @property
+    def jwks_url(self) -> str:
+        """
+        URL of the user pool's JSON Web Key Set
+        """
+        return auth_settings.JWKS["URL"] or f"{self.issuer}/.well-known/jwks.json"
 
     def _get_secret_hash(self, username: str) -> str:
         """
@@ -70,74 +241,31 @@ class CognitoAuthProvider(AuthProvider):
             raise AuthenticationError("Email and password are required")
 
         try:
-            # Prepare authentication parameters
-            auth_parameters = {
-                "USERNAME": email,
-                "PASSWORD": password,
-            }
-
-            # Add SECRET_HASH if client secret is configured (Private Client)
-            if self.client_secret:
-                auth_parameters["SECRET_HASH"] = self._get_secret_hash(email)
-                logger.debug(f"Using Private Client authentication for user: {email}")
-            else:
-                logger.debug(f"Using Public Client authentication for user: {email}")
-
             # InitiateAuth with Cognito
-            response = self.client.initiate_auth(
+            response = self.call_guard.call(
+                self.client.initiate_auth,
                 ClientId=self.client_id,
                 AuthFlow="USER_PASSWORD_AUTH",
-                AuthParameters=auth_parameters,
+                AuthParameters=self._get_password_auth_parameters(email, password),
             )
 
             # Extract tokens from response
             auth_result = response["AuthenticationResult"]
-            access_token = auth_result["AccessToken"]
 
-            # Get user information
-            user_info = self.get_user_info(access_token)
+            # Get user information, from the IdToken if configured
+            user_info = self._get_id_token_user_info(auth_result)
+            if user_info is None:
+                user_info = self.get_user_info(auth_result["AccessToken"])
 
             logger.info(f"Successful authentication for user: {email}")
 
-            return {
-                "access_token": access_token,
-                "user": user_info,
-                "message": "Login successful",
-                "id_token": auth_result.get("IdToken"),
-                "refresh_token": auth_result.get("RefreshToken"),
-            }
+            return self._get_login_result(auth_result, user_info)
 
         except ClientError as e:
-            error_code = e.response["Error"]["Code"]
+            raise self._get_authentication_error(e, email)
 
-            if error_code == "NotAuthorizedException":
-                logger.warning(
-                    f"Authentication failed for user: {email} - Invalid credentials"
-                )
-                raise AuthenticationError(
-                    "Invalid email or password",
-                    "The email or password you entered is incorrect",
-                )
-            elif error_code == "UserNotConfirmedException":
-                logger.warning(
-                    f"Authentication failed for user: {email} - User not confirmed"
-                )
-                raise AuthenticationError(
-                    "Email not verified",
-                    "Please verify your email address before logging in",
-                )
-            elif error_code == "UserNotFoundException":
-                logger.warning(
-                    f"Authentication failed for user: {email} - User not found"
-                )
-                raise AuthenticationError(
-                    "User not found", "No account found with this email address"
-                )
-            else:
-                logger.error(f"Cognito authentication error: {error_code} - {str(e)}")
-                raise AuthenticationError(
-                    "Authentication failed", "An error occurred during authentication"
-                )
+        except AuthenticationError:
+            raise
 
         except Exception as e:
             logger.error(f"Unexpected authentication error: {str(e)}")
@@ -145,31 +273,161 @@ class CognitoAuthProvider(AuthProvider):
                 "Authentication failed", "An unexpected error occurred"
             )
 
+    def _get_password_auth_parameters(self, email: str, password: str) -> Dict:
+        """
+        Build USER_PASSWORD_AUTH parameters, with SECRET_HASH for private clients
+        """
+        auth_parameters = {
+            "USERNAME": email,
+            "PASSWORD": password,
+        }
+
+        # Add SECRET_HASH if client secret is configured (Private Client)
+        if self.client_secret:
+            auth_parameters["SECRET_HASH"] = self._get_secret_hash(email)
+            logger.debug(f"Using Private Client authentication for user: {email}")
+        else:
+            logger.debug(f"Using Public Client authentication for user: {email}")
+
+        return auth_parameters
+
+    def _get_id_token_user_info(
+        self, auth_result: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build the login user information from the IdToken, validated locally
+
+        Returns None, so the caller falls back to GetUser, if the option is off
+        or the IdToken is missing, invalid or lacks the user's sub or email.
+        """
+        id_token = auth_result.get("IdToken")
+        if not self.user_info_from_id_token or not id_token:
+            return None
+
+        try:
+            decoded = self._decode_local_token(id_token)
+            signing_key = self._get_signing_key(decoded.header.get("kid"))
+            return self._get_id_token_claims_user_info(decoded, signing_key)
+        except AuthenticationError as e:
+            logger.warning(f"IdToken not usable for user info: {e.detail}")
+            return None
+
+    def _get_id_token_claims_user_info(
+        self, decoded: DecodedToken, signing_key: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Check an IdToken and build user information from its claims
+
+        Raises:
+            AuthenticationError: If the token is invalid or lacks sub or email
+        """
+        user_info = self._get_verified_claims_user_info(
+            decoded, signing_key, allowed_token_use=["id"]
+        )
+        if not user_info.get("sub"):
+            raise AuthenticationError(
+                "Token verification failed", "Token does not carry a subject"
+            )
+        return user_info
+
+    def _get_login_result(
+        self, auth_result: Dict[str, Any], user_info: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Build the authenticate() result from Cognito's AuthenticationResult
+        """
+        return {
+            "access_token": auth_result["AccessToken"],
+            "user": user_info,
+            "message": "Login successful",
+            "id_token": auth_result.get("IdToken"),
+            "refresh_token": auth_result.get("RefreshToken"),
+            "expires_in": auth_result.get("ExpiresIn"),
+        }
+
+    def _get_authentication_error(
+        self, error: ClientError, email: str
+    ) -> AuthenticationError:
+        """
+        Map a Cognito InitiateAuth error to a user facing AuthenticationError
+        """
+        error_code = error.response["Error"]["Code"]
+
+        if error_code == "NotAuthorizedException":
+            logger.warning(
+                f"Authentication failed for user: {email} - Invalid credentials"
+            )
+            return AuthenticationError(
+                "Invalid email or password",
+                "The email or password you entered is incorrect",
+            )
+        elif error_code == "UserNotConfirmedException":
+            logger.warning(
+                f"Authentication failed for user: {email} - User not confirmed"
+            )
+            return AuthenticationError(
+                "Email not verified",
+                "Please verify your email address before logging in",
+            )
+        elif error_code == "UserNotFoundException":
+            logger.warning(f"Authentication failed for user: {email} - User not found")
+            return AuthenticationError(
+                "User not found", "No account found with this email address"
+            )
+        else:
+            logger.error(f"Cognito authentication error: {error_code} - {str(error)}")
+            return AuthenticationError(
+                "Authentication failed", "An error occurred during authentication"
+            )
+
     def get_user_info(self, token: str) -> Dict[str, Any]:
         """
         Get user information from Cognito access token
         """
         try:
-            user_response = self.client.get_user(AccessToken=token)
+            user_response = self.call_guard.call(
+                self.client.get_user, AccessToken=token
+            )
+            return self._get_user_info_from_attributes(user_response)
 
-            # Extract user attributes
-            user_attributes = {
-                attr["Name"]: attr["Value"] for attr in user_response["UserAttributes"]
-            }
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Failed to get user info: {str(e)}")
+            raise self._get_user_info_error(e)
 
-            return {
-                "sub": user_attributes.get("sub"),
-                "email": user_attributes.get("email"),
-                "email_verified": user_attributes.get("email_verified") == "true",
-                "given_name": user_attributes.get("given_name"),
-                "family_name": user_attributes.get("family_name"),
-            }
+    def _get_user_info_error(self, error: Exception) -> AuthenticationError:
+        """
+        Map a failed GetUser call to the error to raise
 
-        except ClientError as e:
-            logger.error(f"Failed to get user info: {str(e)}")
-            raise AuthenticationError(
-                "Failed to get user information", "Invalid or expired access token"
+        Only Cognito refusing the token is a rejection. Throttling, server and
+        network errors raise ServiceUnavailableError, which is not cached.
+        """
+        if is_service_failure(error):
+            return ServiceUnavailableError(
+                "Failed to get user information",
+                "The identity provider is unavailable; please retry later",
             )
+        return AuthenticationError(
+            "Failed to get user information", "Invalid or expired access token"
+        )
+
+    def _get_user_info_from_attributes(
+        self, user_response: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Build the user information dictionary from a GetUser response
+        """
+        # Extract user attributes
+        user_attributes = {
+            attr["Name"]: attr["Value"] for attr in user_response["UserAttributes"]
+        }
+
+        return {
+            "sub": user_attributes.get("sub"),
+            "email": user_attributes.get("email"),
+            "email_verified": user_attributes.get("email_verified") == "true",
+            "given_name": user_attributes.get("given_name"),
+            "family_name": user_attributes.get("family_name"),
+        }
 
     def validate_credentials(self, credentials: Dict[str, Any]) -> bool:
         """
@@ -196,36 +454,16 @@ class CognitoAuthProvider(AuthProvider):
             username: Username (required if client secret is used)
         """
         try:
-            # Prepare authentication parameters
-            auth_parameters = {
-                "REFRESH_TOKEN": refresh_token,
-            }
-
-            # Add SECRET_HASH if client secret is configured (Private Client)
-            if self.client_secret:
-                if not username:
-                    raise ValueError(
-                        "Username is required for refresh token with client secret"
-                    )
-                auth_parameters["SECRET_HASH"] = self._get_secret_hash(username)
-                logger.debug("Using Private Client for token refresh")
-            else:
-                logger.debug("Using Public Client for token refresh")
-
-            response = self.client.initiate_auth(
+            response = self.call_guard.call(
+                self.client.initiate_auth,
                 ClientId=self.client_id,
                 AuthFlow="REFRESH_TOKEN_AUTH",
-                AuthParameters=auth_parameters,
+                AuthParameters=self._get_refresh_auth_parameters(
+                    refresh_token, username
+                ),
             )
 
-            auth_result = response["AuthenticationResult"]
-
-            return {
-                "access_token": auth_result["AccessToken"],
-                "id_token": auth_result.get("IdToken"),
-                "token_type": auth_result.get("TokenType", "Bearer"),
-                "expires_in": auth_result.get("ExpiresIn"),
-            }
+            return self._get_refresh_result(response["AuthenticationResult"])
 
         except ClientError as e:
             logger.error(f"Token refresh failed: {str(e)}")
@@ -233,10 +471,93 @@ class CognitoAuthProvider(AuthProvider):
                 "Token refresh failed", "Invalid or expired refresh token"
             )
 
+    def _get_refresh_auth_parameters(
+        self, refresh_token: str, username: str = None
+    ) -> Dict[str, Any]:
+        """
+        Build REFRESH_TOKEN_AUTH parameters, with SECRET_HASH for private clients
+        """
+        # Prepare authentication parameters
+        auth_parameters = {
+            "REFRESH_TOKEN": refresh_token,
+        }
+
+        # Add SECRET_HASH if client secret is configured (Private Client)
+        if self.client_secret:
+            if not username:
+                raise ValueError(
+                    "Username is required for refresh token with client secret"
+                )
+            auth_parameters["SECRET_HASH"] = self._get_secret_hash(username)
+            logger.debug("Using Private Client for token refresh")
+        else:
+            logger.debug("Using Public Client for token refresh")
+
+        return auth_parameters
+
+    def _get_refresh_result(self, auth_result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "access_token": auth_result["AccessToken"],
+            "id_token": auth_result.get("IdToken"),
+            "token_type": auth_result.get("TokenType", "Bearer"),
+            "expires_in": auth_result.get("ExpiresIn"),
+        }
+
+    def sign_out(
+        self, access_token: Optional[str], refresh_token: Optional[str] = None
+    ) -> None:
+        """
+        Sign the user out of Cognito as set by REVOCATION["COGNITO_SIGN_OUT"]
+
+        "global_sign_out" invalidates all of the user's tokens (GlobalSignOut);
+        "revoke_token" revokes the refresh token and the tokens issued from it
+        (RevokeToken), so it needs the refresh token.
+        """
+        try:
+            operation = self._get_sign_out_operation(access_token, refresh_token)
+            if operation is None:
+                return
+            if operation[0] == "GlobalSignOut":
+                self.call_guard.call(self.client.global_sign_out, **operation[1])
+            else:
+                self.call_guard.call(self.client.revoke_token, **operation[1])
+
+        except ClientError as e:
+            logger.error(f"Cognito sign out failed: {str(e)}")
+            raise AuthenticationError(
+                "Sign out failed", "The session could not be revoked"
+            )
+
+    def _get_sign_out_operation(
+        self, access_token: Optional[str], refresh_token: Optional[str]
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Cognito operation and parameters for the configured sign out mode
+        """
+        mode = auth_settings.REVOCATION["COGNITO_SIGN_OUT"]
+        if mode == "global_sign_out":
+            if not access_token:
+                logger.warning("GlobalSignOut skipped: no access token sent on logout")
+                return None
+            return "GlobalSignOut", {"AccessToken": access_token}
+        if mode == "revoke_token":
+            if not refresh_token:
+                logger.warning("RevokeToken skipped: no refresh token sent on logout")
+                return None
+            parameters = {"Token": refresh_token, "ClientId": self.client_id}
+            if self.client_secret:
+                parameters["ClientSecret"] = self.client_secret
+            return "RevokeToken", parameters
+        return None
+
     def verify_token(self, access_token: str) -> Dict[str, Any]:
         """
         Verify access token and return user information
 
+        With TOKEN_VERIFICATION set to "local" the token is checked in-process
+        against the user pool's JWKS; otherwise Cognito validates it via GetUser.
+        Concurrent calls for the same token share a single verification.
+
         Args:
             access_token: The access token to verify
 
@@ -246,6 +567,14 @@ class CognitoAuthProvider(AuthProvider):
         Raises:
             AuthenticationError: If token is invalid or expired
         """
+        return self._verifications.do(
+            token_fingerprint(access_token), self._verify_token, access_token
+        )
+
+    def _verify_token(self, access_token: str) -> Dict[str, Any]:
+        if self.verification_mode == "local":
+            return self._verify_token_locally(access_token)
+
         try:
             # Get user info using the access token - this also validates it
             user_info = self.get_user_info(access_token)
@@ -255,7 +584,123 @@ class CognitoAuthProvider(AuthProvider):
             # Re-raise authentication errors
             raise
         except Exception as e:
+            # Not a verdict on the token, so it must not be cached as one
             logger.error(f"Token verification failed: {str(e)}")
+            raise ServiceUnavailableError(
+                "Token verification failed", "Unable to verify the access token"
+            )
+
+    def _verify_token_locally(self, token: str) -> Dict[str, Any]:
+        """
+        Verify token signature and claims without calling Cognito
+
+        Access tokens carry no email, so their user's attributes come from
+        GetUser, called once per user ("sub") and USER_ATTRIBUTES_CACHE["TTL"].
+        """
+        decoded = self._decode_local_token(token)
+        signing_key = self._get_signing_key(decoded.header.get("kid"))
+        user_info = self._get_verified_claims_user_info(decoded, signing_key)
+        if not user_info.get("email"):
+            sub = user_info.get("sub")
+            user_info = self._get_cached_user_attributes(sub)
+            if user_info is None:
+                user_info = self.get_user_info(token)
+                self._remember_user_attributes(sub, user_info)
+        return user_info
+
+    def _get_cached_user_attributes(
+        self, sub: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        if not sub or not auth_settings.USER_ATTRIBUTES_CACHE["ENABLED"]:
+            return None
+        user_info = get_user_attributes_cache().get(sub)
+        return dict(user_info) if user_info is not None else None
+
+    def _remember_user_attributes(
+        self, sub: Optional[str], user_info: Dict[str, Any]
+    ) -> None:
+        config = auth_settings.USER_ATTRIBUTES_CACHE
+        # Only cache attributes Cognito returned for the token's own user
+        if sub and config["ENABLED"] and user_info.get("sub") == sub:
+            get_user_attributes_cache().set(
+                sub, dict(user_info), time.time() + config["TTL"]
+            )
+
+    def _decode_local_token(self, token: str) -> DecodedToken:
+        decoded = decode_token(token)
+
+        if decoded.header.get("alg") != "RS256":
             raise AuthenticationError(
-                "Token verification failed", "Invalid or expired access token"
+                "Token verification failed", "Unsupported token algorithm"
             )
+
+        return decoded
+
+    def _get_verified_claims_user_info(
+        self,
+        decoded: DecodedToken,
+        signing_key: Optional[Dict[str, Any]],
+        allowed_token_use: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Check signature and claims, then build user information from the claims
+
+        The result only lacks an email for access tokens, which then need
+        GetUser or the cached attributes of their user.
+        """
+        if not signing_key or not verify_rs256_signature(
+            signing_key, decoded.signing_input, decoded.signature
+        ):
+            raise AuthenticationError(
+                "Token verification failed", "Invalid token signature"
+            )
+
+        validate_claims(
+            decoded.claims,
+            issuer=self.issuer,
+            client_id=self.client_id,
+            allowed_token_use=allowed_token_use or auth_settings.ALLOWED_TOKEN_USE,
+            leeway=auth_settings.TOKEN_LEEWAY,
+        )
+
+        user_info = self._get_user_info_from_claims(decoded.claims)
+        if not user_info.get("email") and decoded.claims.get("token_use") != "access":
+            raise AuthenticationError(
+                "Token verification failed", "Token does not carry an email"
+            )
+
+        return user_info
+
+    def _get_user_info_from_claims(self, claims: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the user information dictionary from verified token claims
+        """
+        email_verified = claims.get("email_verified")
+        return {
+            "sub": claims.get("sub"),
+            "email": claims.get("email"),
+            "email_verified": email_verified is True or email_verified == "true",
+            "given_name": claims.get("given_name"),
+            "family_name": claims.get("family_name"),
+        }
+
+    def _get_signing_key(self, kid: str) -> Dict[str, Any]:
+        """
+        Look up a user pool signing key by key ID in the shared JWKS store
+        """
+        return get_jwks_store(self.jwks_url).get_key(kid)
+
+
+def _clear_on_setting_changed(*args, **kwargs):
+    if kwargs["setting"] == "DRF_SPECTACULAR_AUTH":
+        clear_call_guards()
+        clear_user_attributes_caches()
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(_clear_on_setting_changed)
+except ImportError:
+    # Django not available
+    pass
@@ -0,0 +1,58 @@
+"""
+Process-wide registry of authentication providers
+"""
+
+import threading
+from typing import Dict, Optional, Tuple, Type
+
+from ..conf import auth_settings
+from .base import AuthProvider
+from .cognito import CognitoAuthProvider
+
+_providers: Dict[Tuple[Type[AuthProvider], str], AuthProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_auth_provider(
+    provider_class: Optional[Type[AuthProvider]] = None,
+) -> AuthProvider:
+    """
+    Return the shared provider instance for the current configuration
+
+    Providers (and their boto3 clients with the keep-alive connection pool) are
+    built once per provider class and settings fingerprint and then reused by
+    all threads, instead of being constructed for every request.
+    """
+    provider_class = provider_class or CognitoAuthProvider
+    key = (provider_class, auth_settings.fingerprint)
+
+    provider = _providers.get(key)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(key)
+            if provider is None:
+                provider = provider_class()
+                _providers[key] = provider
+    return provider
+
+
+def clear_auth_providers() -> None:
+    """
+    Drop all shared providers so the next lookup builds fresh ones
+    """
+    with _providers_lock:
+        _providers.clear()
+
+
+def _clear_on_setting_changed(*args, **kwargs):
+    if kwargs["setting"] == "DRF_SPECTACULAR_AUTH":
+        clear_auth_providers()
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(_clear_on_setting_changed)
+except ImportError:
+    # Django not available
+    pass
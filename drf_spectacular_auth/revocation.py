@@ -0,0 +1,113 @@
+"""
+Local record of tokens revoked by logout, checked on every verification
+"""
+
+import threading
+import time
+from typing import List
+
+from .cache import create_token_cache
+from .conf import auth_settings
+from .providers.base import AuthenticationError
+from .tokens import get_unverified_claims
+
+_revocation_store = None
+_lock = threading.Lock()
+
+
+def get_revocation_store():
+    """
+    Return the expiring set of revoked token IDs, configured by REVOCATION
+
+    Uses the token cache backends, so a shared backend makes a logout on one
+    worker effective on all of them.
+    """
+    global _revocation_store
+    if _revocation_store is None:
+        with _lock:
+            if _revocation_store is None:
+                _revocation_store = create_token_cache(
+                    auth_settings.REVOCATION, "revoked"
+                )
+    return _revocation_store
+
+
+def _get_revocation_keys(token: str) -> List[str]:
+    """
+    Keys identifying a token in the revocation store
+
+    JWTs are identified by "jti" and by "origin_jti", which Cognito shares
+    between all tokens issued from one sign-in. Tokens without either are
+    identified by the token itself.
+    """
+    try:
+        claims = get_unverified_claims(token)
+    except AuthenticationError:
+        return [f"token:{token}"]
+
+    keys = []
+    if isinstance(claims.get("jti"), str):
+        keys.append(f"jti:{claims['jti']}")
+    if isinstance(claims.get("origin_jti"), str):
+        keys.append(f"origin_jti:{claims['origin_jti']}")
+    return keys or [f"token:{token}"]
+
+
+def is_revoked(token: str) -> bool:
+    """
+    Check whether a token, or the sign-in it was issued from, was revoked
+    """
+    if not auth_settings.REVOCATION["ENABLED"]:
+        return False
+    store = get_revocation_store()
+    return any(store.get(key) for key in _get_revocation_keys(token))
+
+
+def revoke(token: str) -> None:
+    """
+    Record a verified token as revoked
+
+    Its "jti" is kept until the token expires. The "origin_jti" is kept for at
+    least REVOCATION["ORIGIN_TTL"] seconds, since tokens refreshed from the
+    same sign-in may outlive the revoked one.
+    """
+    config = auth_settings.REVOCATION
+    if not config["ENABLED"]:
+        return
+
+    now = time.time()
+    try:
+        exp = get_unverified_claims(token).get("exp")
+    except AuthenticationError:
+        exp = None
+    if isinstance(exp, (int, float)):
+        expires_at = exp + auth_settings.TOKEN_LEEWAY
+    else:
+        expires_at = now + config["ORIGIN_TTL"]
+
+    store = get_revocation_store()
+    for key in _get_revocation_keys(token):
+        if key.startswith("origin_jti:"):
+            store.set(key, True, max(expires_at, now + config["ORIGIN_TTL"]))
+        else:
+            store.set(key, True, expires_at)
+
+
+def clear_revocation_store() -> None:
+    global _revocation_store
+    with _lock:
+        _revocation_store = None
+
+
+def _clear_on_setting_changed(*args, **kwargs):
+    if kwargs["setting"] == "DRF_SPECTACULAR_AUTH":
+        clear_revocation_store()
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(_clear_on_setting_changed)
+except ImportError:
+    # Django not available
+    pass
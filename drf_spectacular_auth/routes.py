@@ -0,0 +1,186 @@
+"""
+Precompiled index of the documentation (schema, Swagger UI, ReDoc) routes
+"""
+
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.urls.resolvers import RegexPattern, RoutePattern
+from django.utils.functional import Promise
+
+from .conf import auth_settings
+
+# A view counts as a docs view if its view name contains one of these
+DOCS_VIEW_NAME_MARKERS = ("schema", "swagger-ui", "redoc", "spectacular")
+
+REGEX_METACHARACTERS = set(".^$*+?{}[]\\|()")
+# Quantifiers that make the preceding character optional
+REGEX_OPTIONAL_QUANTIFIERS = set("?*{")
+
+
+def is_docs_view_name(view_name: str) -> bool:
+    """
+    Check a resolved view name against the markers and DOCS_URL_NAMES
+    """
+    view_name = str(view_name)
+    if view_name in auth_settings.DOCS_URL_NAMES:
+        return True
+    if view_name.rsplit(":", 1)[-1] in auth_settings.DOCS_URL_NAMES:
+        return True
+    lowered = view_name.lower()
+    return any(marker in lowered for marker in DOCS_VIEW_NAME_MARKERS)
+
+
+def _literal_prefix(pattern) -> Tuple[str, bool, bool]:
+    """
+    Split a URL pattern into its literal start
+
+    Returns the literal text the pattern starts with, whether the pattern is
+    entirely literal, and whether it matches nothing but that text.
+    """
+    if isinstance(pattern, RoutePattern) and not isinstance(pattern._route, Promise):
+        route = pattern._route
+        converter_start = route.find("<")
+        if converter_start < 0:
+            return route, True, True
+        return route[:converter_start], False, False
+
+    if isinstance(pattern, RegexPattern) and not isinstance(pattern._regex, Promise):
+        regex = pattern._regex[1:] if pattern._regex.startswith("^") else pattern._regex
+        if _has_top_level_alternation(regex):
+            # "a|b" has no prefix common to both branches
+            return "", False, False
+        literal: List[str] = []
+        for position, character in enumerate(regex):
+            if character in REGEX_METACHARACTERS:
+                if character in REGEX_OPTIONAL_QUANTIFIERS and literal:
+                    literal.pop()
+                is_end = character == "$" and position == len(regex) - 1
+                return "".join(literal), is_end, is_end
+            literal.append(character)
+        # Without "$" the pattern also matches longer paths
+        return "".join(literal), True, False
+
+    # Translated or locale prefixed patterns depend on the active language
+    return "", False, False
+
+
+def _has_top_level_alternation(regex: str) -> bool:
+    depth = 0
+    in_class = False
+    escaped = False
+    for character in regex:
+        if escaped:
+            escaped = False
+        elif character == "\\":
+            escaped = True
+        elif in_class:
+            in_class = character != "]"
+        elif character == "[":
+            in_class = True
+        elif character == "(":
+            depth += 1
+        elif character == ")":
+            depth -= 1
+        elif character == "|" and depth == 0:
+            return True
+    return False
+
+
+class DocsRouteIndex:
+    """
+    Set of exact paths and path prefixes that may resolve to a docs view
+
+    Used as a cheap negative filter: a path that is neither an exact docs path
+    nor starts with a docs prefix cannot resolve to a docs view, so ordinary
+    API requests skip the full URL resolution.
+    """
+
+    def __init__(self, resolver: URLResolver):
+        self.resolver = resolver
+        self.exact_paths = set()
+        self.prefixes: Tuple[str, ...] = ()
+        # True if some docs route starts with a dynamic part
+        self.match_all = False
+
+        prefixes = set()
+        for route, complete in self._docs_routes(resolver.url_patterns, "", True, ""):
+            if complete:
+                self.exact_paths.add(route)
+            elif route:
+                prefixes.add(route)
+            else:
+                self.match_all = True
+        self.prefixes = tuple(sorted(prefixes))
+
+    def _docs_routes(
+        self, patterns: Iterable, prefix: str, complete: bool, namespace: str
+    ):
+        for pattern in patterns:
+            literal, fully_literal, exact = _literal_prefix(pattern.pattern)
+            route = prefix + literal if complete else prefix
+
+            if isinstance(pattern, URLResolver):
+                child_namespace = namespace
+                if pattern.namespace:
+                    child_namespace = f"{namespace}{pattern.namespace}:"
+                yield from self._docs_routes(
+                    pattern.url_patterns,
+                    route,
+                    complete and fully_literal,
+                    child_namespace,
+                )
+            elif isinstance(pattern, URLPattern):
+                # Unnamed routes resolve to the view's dotted path as view name
+                if is_docs_view_name(namespace + (pattern.name or pattern.lookup_str)):
+                    yield route, complete and exact
+
+    def may_match(self, path_info: str) -> bool:
+        """
+        Return False if the path certainly does not resolve to a docs view
+        """
+        if self.match_all:
+            return True
+        path = path_info[1:] if path_info.startswith("/") else path_info
+        return path in self.exact_paths or path.startswith(self.prefixes)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_docs_route_index(urlconf: Optional[str] = None) -> DocsRouteIndex:
+    """
+    Return the docs route index for a URLconf, built once per resolver
+
+    Django creates a new resolver when the URL caches are cleared, which makes
+    the index rebuild on URLconf reloads.
+    """
+    resolver = get_resolver(urlconf)
+    index = _indexes.get(urlconf)
+    if index is None or index.resolver is not resolver:
+        with _indexes_lock:
+            index = _indexes.get(urlconf)
+            if index is None or index.resolver is not resolver:
+                index = _indexes[urlconf] = DocsRouteIndex(resolver)
+    return index
+
+
+def clear_docs_route_indexes() -> None:
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def _clear_on_setting_changed(*args, **kwargs):
+    if kwargs["setting"] in ("DRF_SPECTACULAR_AUTH", "ROOT_URLCONF"):
+        clear_docs_route_indexes()
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(_clear_on_setting_changed)
+except ImportError:
+    # Django not available
+    pass
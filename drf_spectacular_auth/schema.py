@@ -0,0 +1,435 @@
+"""
+Cache of rendered OpenAPI schemas served by SpectacularAuthAPIView
+"""
+
+import gzip
+import hashlib
+import json
+import textwrap
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import drf_spectacular
+from django.core.cache import caches
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.utils.module_loading import import_string
+
+from . import __version__
+from .cache import TokenCache
+from .conf import auth_settings
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_LENGTH = 200
+# Streamed schemas join their fragments into chunks of about this size
+STREAM_CHUNK_SIZE = 64 * 1024
+
+INDEX_SHARD = "index"
+DEFAULT_TAG = "default"
+COMPONENT_REF_PREFIX = "#/components/"
+HTTP_METHODS = {"get", "put", "post", "delete", "options", "head", "patch", "trace"}
+# Seconds a process keeps using the schema generation it last read
+GENERATION_CHECK_INTERVAL = 5
+
+
+def get_permission_fingerprint(user) -> Optional[str]:
+    """
+    Fingerprint the parts of a user that decide which endpoints they reach
+
+    Covers superuser and staff flags, group names and permissions, so users
+    with the same role share one filtered schema. Projects whose permission
+    classes look at other user data can point SCHEMA_PERMISSION_FINGERPRINT at
+    their own callable; returning None there disables caching for the user.
+    """
+    if auth_settings.SCHEMA_PERMISSION_FINGERPRINT:
+        return import_string(auth_settings.SCHEMA_PERMISSION_FINGERPRINT)(user)
+
+    if getattr(user, "is_superuser", False):
+        return "superuser"
+
+    groups: List[str] = []
+    permissions: List[str] = []
+    # Temporary users are never saved and have no groups or permissions
+    if user.pk is not None:
+        if hasattr(user, "groups"):
+            groups = sorted(user.groups.values_list("name", flat=True))
+        if hasattr(user, "get_all_permissions"):
+            permissions = sorted(user.get_all_permissions())
+
+    parts = json.dumps(
+        {
+            "staff": getattr(user, "is_staff", False),
+            "groups": groups,
+            "permissions": permissions,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(parts.encode()).hexdigest()[:16]
+
+
+def get_schema_cache():
+    return caches[auth_settings.SCHEMA_CACHE["ALIAS"]]
+
+
+_generations: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+
+def _get_generation_key() -> str:
+    return f"{auth_settings.SCHEMA_CACHE['KEY_PREFIX']}:generation"
+
+
+def get_schema_generation() -> str:
+    """
+    Return the current schema generation, part of every schema cache key
+
+    The generation is stored in the schema cache, so bumping it in one
+    process invalidates the cached schemas of all processes. Each process
+    re-reads it at most every GENERATION_CHECK_INTERVAL seconds.
+    """
+    key = _get_generation_key()
+    memo_key = (auth_settings.SCHEMA_CACHE["ALIAS"], key)
+    now = time.monotonic()
+    memo = _generations.get(memo_key)
+    if memo is not None and now - memo[1] < GENERATION_CHECK_INTERVAL:
+        return memo[0]
+    # A flushed cache starts a new generation, as it lost the schemas anyway
+    generation = get_schema_cache().get_or_set(key, lambda: uuid.uuid4().hex, None)
+    _generations[memo_key] = (generation, now)
+    return generation
+
+
+def bump_schema_generation() -> str:
+    """
+    Start a new schema generation, invalidating every cached schema variant
+
+    Called by the prebuild command; call it after deploying code that changes
+    the API if the schemas are not prebuilt.
+    """
+    key = _get_generation_key()
+    generation = uuid.uuid4().hex
+    get_schema_cache().set(key, generation, None)
+    _generations[(auth_settings.SCHEMA_CACHE["ALIAS"], key)] = (
+        generation,
+        time.monotonic(),
+    )
+    return generation
+
+
+def get_schema_cache_key(namespace: str, **variant: Any) -> str:
+    """
+    Build the cache key of one rendered schema variant
+
+    The key covers the package and drf-spectacular versions and the settings
+    fingerprint, so upgrades and configuration changes never serve an old
+    schema, and the schema generation, which code changes bump at deploy time.
+    """
+    parts = json.dumps(
+        [
+            __version__,
+            drf_spectacular.__version__,
+            auth_settings.fingerprint,
+            get_schema_generation(),
+            namespace,
+            variant,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha256(parts.encode()).hexdigest()
+    return f"{auth_settings.SCHEMA_CACHE['KEY_PREFIX']}:{digest}"
+
+
+def build_schema_entry(
+    content: bytes, content_type: str, filename: str
+) -> Dict[str, Any]:
+    """
+    Pre-serialize a rendered schema with its validator and gzip variant
+    """
+    compressed = None
+    if auth_settings.SCHEMA_CACHE["GZIP"] and len(content) >= GZIP_MIN_LENGTH:
+        # mtime=0 keeps the compressed bytes identical between builds
+        compressed = gzip.compress(content, mtime=0)
+    return {
+        "content": content,
+        "gzip": compressed,
+        "etag": quote_etag(hashlib.sha256(content).hexdigest()),
+        "content_type": content_type,
+        "filename": filename,
+    }
+
+
+def get_cached_schema(key: str) -> Optional[Dict[str, Any]]:
+    return get_schema_cache().get(key)
+
+
+def set_cached_schemas(entries: Dict[str, Dict[str, Any]]) -> None:
+    get_schema_cache().set_many(entries, auth_settings.SCHEMA_CACHE["TIMEOUT"])
+
+
+def _get_references(data: Any) -> Iterator[Tuple[str, str]]:
+    """
+    Yield the (section, name) of every local component reference in data
+    """
+    if isinstance(data, dict):
+        ref = data.get("$ref")
+        if isinstance(ref, str) and ref.startswith(COMPONENT_REF_PREFIX):
+            section, _, name = ref[len(COMPONENT_REF_PREFIX) :].partition("/")
+            yield section, name
+        for value in data.values():
+            yield from _get_references(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _get_references(value)
+
+
+def _get_referenced_components(
+    components: Dict[str, Dict[str, Any]], data: Any
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Collect the components that data references, directly or indirectly
+    """
+    collected: Dict[str, Dict[str, Any]] = {}
+    pending = list(_get_references(data))
+    while pending:
+        section, name = pending.pop()
+        if name in collected.get(section, {}):
+            continue
+        component = components.get(section, {}).get(name)
+        if component is None:
+            continue
+        collected.setdefault(section, {})[name] = component
+        pending.extend(_get_references(component))
+    return collected
+
+
+def split_schema(schema: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Split a schema into an index and one shard per operation tag
+
+    The index ("index") is the schema without paths, listing every tag so
+    Swagger UI renders them collapsed. Each shard ("tag:<name>") holds the
+    operations of one tag and the components they reference, ready to be
+    merged into the index. Operations without tags land in "default".
+    """
+    paths_by_tag: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for path, path_item in schema.get("paths", {}).items():
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS:
+                continue
+            for tag in operation.get("tags") or [DEFAULT_TAG]:
+                tag_paths = paths_by_tag.setdefault(tag, {})
+                if path not in tag_paths:
+                    # Keep path level entries such as shared parameters
+                    tag_paths[path] = {
+                        key: value
+                        for key, value in path_item.items()
+                        if key not in HTTP_METHODS
+                    }
+                tag_paths[path][method] = operation
+
+    components = schema.get("components", {})
+    tag_details = {tag["name"]: tag for tag in schema.get("tags", [])}
+    index = {key: value for key, value in schema.items() if key != "paths"}
+    index["paths"] = {}
+    index["tags"] = list(tag_details.values()) + [
+        {"name": tag} for tag in paths_by_tag if tag not in tag_details
+    ]
+    index["components"] = {
+        section: entries
+        for section, entries in components.items()
+        if section == "securitySchemes"
+    }
+
+    schemas = {INDEX_SHARD: index}
+    for tag, paths in paths_by_tag.items():
+        schemas[f"tag:{tag}"] = {
+            "paths": paths,
+            "components": _get_referenced_components(components, paths),
+        }
+    return schemas
+
+
+class _FragmentRenderer:
+    """
+    Render one mapping member at a time, spliced as the renderer would
+
+    Members are rendered by the schema renderer itself as single-key
+    mappings, then re-indented to their depth, so the joined fragments match
+    rendering the whole schema at once.
+    """
+
+    def __init__(self, renderer, accepted_media_type, renderer_context):
+        self.renderer = renderer
+        self.accepted_media_type = accepted_media_type
+        self.renderer_context = renderer_context
+        self.is_json = renderer.format == "json"
+        if self.is_json:
+            self.indent = renderer.get_indent(accepted_media_type, renderer_context)
+        else:
+            # PyYAML nests block mappings by two spaces
+            self.indent = 2
+
+    def render(self, data) -> str:
+        content = self.renderer.render(
+            data, self.accepted_media_type, self.renderer_context
+        )
+        return content.decode() if isinstance(content, bytes) else content
+
+    def pad(self, depth: int) -> str:
+        return " " * ((self.indent or 0) * depth)
+
+    def member(self, key: str, value: Any, depth: int) -> str:
+        text = self.render({key: value})
+        if self.is_json:
+            if not self.indent:
+                return text[1:-1]
+            # Drop the braces; members are already one level deep
+            lines = text.split("\n")[1:-1]
+            return "\n".join(self.pad(depth) + line for line in lines)
+        return textwrap.indent(text, self.pad(depth))
+
+    def key(self, key: str, depth: int) -> str:
+        # Render the member with an empty value and cut the value off
+        text = self.member(key, {}, depth)
+        if self.is_json:
+            return text[: -len("{}")]
+        return text[: -len(" {}\n")] + "\n"
+
+    def mapping(
+        self, mapping: Dict[str, Any], depth: int, splits: Any
+    ) -> Iterator[str]:
+        """
+        Yield the fragments of a mapping, splitting members listed in splits
+
+        splits maps member keys to the splits of their own value; an integer
+        splits every member that many levels further.
+        """
+        if not mapping:
+            yield self.render({}) if self.is_json else "{}\n"
+            return
+
+        if self.is_json:
+            yield "{\n" if self.indent else "{"
+        for position, (key, value) in enumerate(mapping.items()):
+            if position and self.is_json:
+                yield ",\n" if self.indent else ","
+            member_splits = splits.get(key) if isinstance(splits, dict) else splits
+            if member_splits and isinstance(value, dict) and value:
+                yield self.key(key, depth)
+                if isinstance(member_splits, int):
+                    member_splits -= 1
+                yield from self.mapping(value, depth + 1, member_splits)
+            else:
+                yield self.member(key, value, depth)
+        if self.is_json:
+            yield "\n" + self.pad(depth) + "}" if self.indent else "}"
+
+
+def render_schema_chunks(
+    renderer, schema: Dict[str, Any], accepted_media_type, renderer_context
+) -> Tuple[bytes, ...]:
+    """
+    Render a schema into chunks of pre-serialized path and component fragments
+
+    Only JSON and YAML renderers are split; other formats become one chunk.
+    """
+    if renderer.format not in ("json", "yaml"):
+        content = renderer.render(schema, accepted_media_type, renderer_context)
+        return (content,)
+
+    fragments = _FragmentRenderer(renderer, accepted_media_type, renderer_context)
+    chunks: List[bytes] = []
+    pending: List[bytes] = []
+    pending_size = 0
+    # Paths are split per path and components per section and name
+    for fragment in fragments.mapping(schema, 0, {"paths": 1, "components": 2}):
+        encoded = fragment.encode(renderer.charset or "utf-8")
+        pending.append(encoded)
+        pending_size += len(encoded)
+        if pending_size >= STREAM_CHUNK_SIZE:
+            chunks.append(b"".join(pending))
+            pending, pending_size = [], 0
+    if pending:
+        chunks.append(b"".join(pending))
+    return tuple(chunks)
+
+
+def build_streamed_schema_entry(
+    chunks: Tuple[bytes, ...], content_type: str, filename: str
+) -> Dict[str, Any]:
+    """
+    Describe a schema streamed from pre-serialized chunks
+    """
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return {
+        "chunks": chunks,
+        "gzip": None,
+        "etag": quote_etag(digest.hexdigest()),
+        "content_type": content_type,
+        "filename": filename,
+    }
+
+
+_streamed_schemas = TokenCache(max_size=0)
+_streamed_schemas_lock = threading.Lock()
+
+
+def get_streamed_schemas() -> TokenCache:
+    """
+    Return the in-process store of streamed schemas
+
+    Chunks stay in process memory, so every response streams the same bytes
+    objects instead of loading a copy of the schema from the Django cache.
+    """
+    global _streamed_schemas
+    max_size = auth_settings.SCHEMA_CACHE["STREAMED_VARIANTS"]
+    if _streamed_schemas.max_size != max_size:
+        with _streamed_schemas_lock:
+            if _streamed_schemas.max_size != max_size:
+                _streamed_schemas = TokenCache(max_size=max_size)
+    return _streamed_schemas
+
+
+def get_streamed_schema(key: str) -> Optional[Dict[str, Any]]:
+    return get_streamed_schemas().get(key)
+
+
+def set_streamed_schema(key: str, entry: Dict[str, Any]) -> None:
+    timeout = auth_settings.SCHEMA_CACHE["TIMEOUT"]
+    expires_at = float("inf") if timeout is None else time.time() + timeout
+    get_streamed_schemas().set(key, entry, expires_at)
+
+
+def get_schema_response(request, entry: Dict[str, Any]) -> HttpResponse:
+    """
+    Serve a cached schema entry, honouring If-None-Match and Accept-Encoding
+    """
+    accepts_gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+    use_gzip = entry["gzip"] is not None and accepts_gzip
+    # Each encoding is a different representation and needs its own validator
+    etag = entry["etag"][:-1] + '-gzip"' if use_gzip else entry["etag"]
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        if "chunks" in entry:
+            # Streamed entries are compressed by GZipMiddleware, if installed
+            response = StreamingHttpResponse(
+                iter(entry["chunks"]), content_type=entry["content_type"]
+            )
+        else:
+            response = HttpResponse(
+                entry["gzip"] if use_gzip else entry["content"],
+                content_type=entry["content_type"],
+            )
+        if use_gzip:
+            response["Content-Encoding"] = "gzip"
+        response["Content-Disposition"] = f'inline; filename="{entry["filename"]}"'
+
+    response["ETag"] = etag
+    patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+    return response
@@ -4,6 +4,8 @@ Serializers for DRF Spectacular Auth
 
 from rest_framework import serializers
 
+from .conf import auth_settings
+
 
 class LoginSerializer(serializers.Serializer):
     """
@@ -16,6 +18,24 @@ class LoginSerializer(serializers.Serializer):
     )
 
 
+class RefreshSerializer(serializers.Serializer):
+    """
+    Serializer for token refresh requests
+    """
+
+    refresh_token = serializers.CharField(
+        help_text="Refresh token returned by login", write_only=True
+    )
+    username = serializers.CharField(
+        help_text=(
+            "Cognito username, needed for app clients with a secret; defaults "
+            "to the username claim of the bearer access token"
+        ),
+        write_only=True,
+        required=False,
+    )
+
+
 class UserSerializer(serializers.Serializer):
     """
     Serializer for user information
@@ -37,6 +57,37 @@ class LoginResponseSerializer(serializers.Serializer):
     )
     user = UserSerializer(help_text="User information", read_only=True)
     message = serializers.CharField(help_text="Login status message", read_only=True)
+    refresh_token = serializers.CharField(
+        help_text=(
+            "Refresh token for obtaining new access tokens "
+            "(only with AUTO_REFRESH_TOKEN)"
+        ),
+        read_only=True,
+    )
+    expires_in = serializers.IntegerField(
+        help_text="Seconds until the access token expires", read_only=True
+    )
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Long-lived refresh tokens only reach browser JS if the panel uses them
+        if not auth_settings.AUTO_REFRESH_TOKEN:
+            data.pop("refresh_token", None)
+        return data
+
+
+class RefreshResponseSerializer(serializers.Serializer):
+    """
+    Serializer for token refresh responses
+    """
+
+    access_token = serializers.CharField(
+        help_text="New JWT Access Token for authentication", read_only=True
+    )
+    token_type = serializers.CharField(help_text="Token type", read_only=True)
+    expires_in = serializers.IntegerField(
+        help_text="Seconds until the access token expires", read_only=True
+    )
 
 
 class ErrorResponseSerializer(serializers.Serializer):
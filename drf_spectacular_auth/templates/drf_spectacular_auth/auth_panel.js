@@ -2,81 +2,32 @@
 (function() {
     'use strict';
 
+    // Per-request values are read from the panel element, so this script can
+    // be rendered once and cached
+    const panelElement = document.getElementById('drf-auth-panel');
+
     // Configuration from Django template
     const CONFIG = {
         loginUrl: '{{ login_url }}',
         logoutUrl: '{{ logout_url }}',
-        csrfToken: '{{ csrf_token }}',
+        refreshUrl: '{{ refresh_url }}',
+        csrfToken: panelElement ? panelElement.dataset.csrfToken : '',
         language: '{{ language }}',
         autoAuthorize: {{ auth_settings.AUTO_AUTHORIZE|yesno:"true,false" }},
         showCopyButton: {{ auth_settings.SHOW_COPY_BUTTON|yesno:"true,false" }},
         tokenStorage: '{{ auth_settings.TOKEN_STORAGE }}', // sessionStorage or localStorage
+        autoRefresh: {{ auth_settings.AUTO_REFRESH_TOKEN|yesno:"true,false" }},
+        refreshMargin: {{ auth_settings.TOKEN_REFRESH_MARGIN }}, // seconds before "exp"
+        filterSchema: {{ auth_settings.FILTER_SCHEMA_BY_PERMISSIONS|yesno:"true,false" }},
+        schemaSharding: {{ auth_settings.SCHEMA_SHARDING|yesno:"true,false" }},
         theme: {{ theme|safe }}
     };
 
-    // Localized messages
-    const MESSAGES = {
-        ko: {
-            loginInProgress: '로그인 중...',
-            loginSuccess: '로그인에 성공했습니다!',
-            loginFailed: '로그인에 실패했습니다.',
-            networkError: '네트워크 오류가 발생했습니다.',
-            logoutSuccess: '로그아웃되었습니다.',
-            tokenCopied: '토큰이 클립보드에 복사되었습니다!',
-            tokenCopyFailed: '토큰 복사에 실패했습니다. 수동으로 복사하세요.',
-            noTokenToCopy: '복사할 토큰이 없습니다.',
-            copied: '✅ 복사됨',
-            unauthenticated: '미인증',
-            authenticated: '인증됨',
-            login: '로그인',
-            logout: '로그아웃',
-            copyToken: '토큰 복사',
-            manualCopyTitle: '액세스 토큰 수동 복사',
-            manualCopyDesc: '아래 토큰을 선택하여 복사한 후, Swagger UI의 Authorization 대화상자에 붙여넣으세요.',
-            close: '닫기'
-        },
-        en: {
-            loginInProgress: 'Logging in...',
-            loginSuccess: 'Login successful!',
-            loginFailed: 'Login failed.',
-            networkError: 'Network error occurred.',
-            logoutSuccess: 'Logout successful.',
-            tokenCopied: 'Token copied to clipboard!',
-            tokenCopyFailed: 'Failed to copy token. Please copy manually.',
-            noTokenToCopy: 'No token to copy.',
-            copied: '✅ Copied',
-            unauthenticated: 'Unauthenticated',
-            authenticated: 'Authenticated',
-            login: 'Login',
-            logout: 'Logout',
-            copyToken: 'Copy Token',
-            manualCopyTitle: 'Manual Access Token Copy',
-            manualCopyDesc: 'Select and copy the token below, then paste it in the Swagger UI Authorization dialog.',
-            close: 'Close'
-        },
-        ja: {
-            loginInProgress: 'ログイン中...',
-            loginSuccess: 'ログインに成功しました！',
-            loginFailed: 'ログインに失敗しました。',
-            networkError: 'ネットワークエラーが発生しました。',
-            logoutSuccess: 'ログアウトしました。',
-            tokenCopied: 'トークンがクリップボードにコピーされました！',
-            tokenCopyFailed: 'トークンのコピーに失敗しました。手動でコピーしてください。',
-            noTokenToCopy: 'コピーするトークンがありません。',
-            copied: '✅ コピー済み',
-            unauthenticated: '未認証',
-            authenticated: '認証済み',
-            login: 'ログイン',
-            logout: 'ログアウト',
-            copyToken: 'トークンをコピー',
-            manualCopyTitle: 'アクセストークン手動コピー',
-            manualCopyDesc: '下のトークンを選択してコピーし、Swagger UIのAuthorization ダイアログに貼り付けてください。',
-            close: '閉じる'
-        }
-    };
+    // Localized messages for CONFIG.language, with English fallbacks
+    const MESSAGES = {{ messages_json|safe }};
 
     function getMessage(key) {
-        return MESSAGES[CONFIG.language]?.[key] || MESSAGES.en[key] || key;
+        return MESSAGES[key] || key;
     }
 
     // Storage utility - simple sessionStorage/localStorage
@@ -94,6 +45,18 @@
         return storage.getItem('drf_auth_access_token');
     }
 
+    function storeRefreshToken(refreshToken) {
+        const storage = getStorage();
+        if (CONFIG.autoRefresh && refreshToken) {
+            storage.setItem('drf_auth_refresh_token', refreshToken);
+        }
+    }
+
+    function getStoredRefreshToken() {
+        const storage = getStorage();
+        return storage.getItem('drf_auth_refresh_token');
+    }
+
     function storeUserInfo(userInfo) {
         const storage = getStorage();
         storage.setItem('drf_auth_user_info', JSON.stringify(userInfo));
@@ -108,7 +71,84 @@
     function clearStoredAuth() {
         const storage = getStorage();
         storage.removeItem('drf_auth_access_token');
+        storage.removeItem('drf_auth_refresh_token');
         storage.removeItem('drf_auth_user_info');
+        clearTimeout(refreshTimer);
+    }
+
+    // Token refresh - renew the access token shortly before it expires
+    let refreshTimer = null;
+
+    function getTokenExpiry(token) {
+        try {
+            const payload = token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/');
+            const padded = payload + '='.repeat((4 - payload.length % 4) % 4);
+            const claims = JSON.parse(atob(padded));
+            return typeof claims.exp === 'number' ? claims.exp : null;
+        } catch (e) {
+            // Opaque token
+            return null;
+        }
+    }
+
+    function scheduleTokenRefresh(token) {
+        clearTimeout(refreshTimer);
+        if (!CONFIG.autoRefresh || !getStoredRefreshToken()) {
+            return;
+        }
+        const exp = getTokenExpiry(token);
+        if (!exp) {
+            return;
+        }
+        const delay = Math.max((exp - CONFIG.refreshMargin) * 1000 - Date.now(), 0);
+        refreshTimer = setTimeout(refreshAccessToken, delay);
+    }
+
+    function refreshAccessToken() {
+        const refreshToken = getStoredRefreshToken();
+        const token = getStoredToken();
+        if (!refreshToken || !token) {
+            return;
+        }
+
+        fetch(CONFIG.refreshUrl, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': CONFIG.csrfToken,
+                'Content-Type': 'application/json',
+                // The server reads the username for SECRET_HASH from it
+                'Authorization': 'Bearer ' + token,
+            },
+            body: JSON.stringify({ refresh_token: refreshToken }),
+        })
+        .then(response => response.json().then(data => ({ ok: response.ok, data: data })))
+        .then(({ ok, data }) => {
+            if (ok && data.access_token) {
+                storeToken(data.access_token);
+                if (CONFIG.autoAuthorize) {
+                    setSwaggerAuthorization(data.access_token);
+                }
+                scheduleTokenRefresh(data.access_token);
+            } else {
+                handleSessionExpired();
+            }
+        })
+        .catch(() => {
+            // Try again while the current token is still valid
+            const exp = getTokenExpiry(token);
+            if (exp && exp * 1000 > Date.now()) {
+                clearTimeout(refreshTimer);
+                refreshTimer = setTimeout(refreshAccessToken, 30000);
+            }
+        });
+    }
+
+    function handleSessionExpired() {
+        clearStoredAuth();
+        clearSwaggerAuthorization();
+        updateAuthStatus(false);
+        showMessage(getMessage('sessionExpired'), true);
+        reloadSchema(null);
     }
 
     // Simple Swagger authorization - basic preauthorizeApiKey
@@ -151,6 +191,78 @@
         }
     }
 
+    // Tags whose schema shard has been merged into the loaded schema
+    const loadedTags = new Set();
+
+    function getSchemaHeaders(token) {
+        const headers = { 'Accept': 'application/vnd.oai.openapi+json' };
+        if (token) {
+            headers['Authorization'] = 'Bearer ' + token;
+        }
+        return headers;
+    }
+
+    // Merge the paths and components of one tag into the loaded index
+    function loadTag(tag) {
+        if (loadedTags.has(tag) || !window.ui || !window.ui.specSelectors) {
+            return;
+        }
+        const indexUrl = window.ui.specSelectors.url();
+        if (!indexUrl) {
+            return;
+        }
+        loadedTags.add(tag);
+
+        const shardUrl = new URL(indexUrl, window.location.href);
+        shardUrl.searchParams.delete('shard');
+        shardUrl.searchParams.set('tag', tag);
+        fetch(shardUrl, { headers: getSchemaHeaders(getStoredToken()), credentials: 'same-origin' })
+            .then(response => response.ok ? response.json() : Promise.reject())
+            .then(shard => {
+                const spec = window.ui.specSelectors.specJson().toJS();
+                spec.paths = Object.assign({}, spec.paths, shard.paths);
+                spec.components = spec.components || {};
+                Object.keys(shard.components || {}).forEach(section => {
+                    spec.components[section] = Object.assign(
+                        {}, spec.components[section], shard.components[section]
+                    );
+                });
+                window.ui.specActions.updateSpec(JSON.stringify(spec));
+            })
+            .catch(() => {
+                loadedTags.delete(tag);
+            });
+    }
+
+    function handleTagClick(event) {
+        const tagElement = event.target.closest('.opblock-tag');
+        if (tagElement && tagElement.dataset.tag) {
+            loadTag(tagElement.dataset.tag);
+        }
+    }
+
+    // Reload the schema so it lists the endpoints the user can reach
+    function reloadSchema(token) {
+        if (!CONFIG.filterSchema || !window.ui || !window.ui.specSelectors) {
+            return;
+        }
+        const schemaUrl = window.ui.specSelectors.url();
+        if (!schemaUrl) {
+            return;
+        }
+
+        fetch(schemaUrl, { headers: getSchemaHeaders(token), credentials: 'same-origin' })
+            .then(response => response.ok ? response.text() : null)
+            .then(spec => {
+                if (spec) {
+                    // A new index drops the shards merged so far
+                    loadedTags.clear();
+                    window.ui.specActions.updateSpec(spec);
+                }
+            })
+            .catch(() => {});
+    }
+
     // UI Update functions
     function updateAuthStatus(isAuthenticated, userEmail = '') {
         const authIndicator = document.querySelector('#drf-auth-indicator');
@@ -223,7 +335,9 @@
             if (data.access_token) {
                 // Store token and user info
                 storeToken(data.access_token);
+                storeRefreshToken(data.refresh_token);
                 storeUserInfo(data.user);
+                scheduleTokenRefresh(data.access_token);
                 
                 // Update UI
                 updateAuthStatus(true, data.user.email);
@@ -235,6 +349,8 @@
                         setSwaggerAuthorization(data.access_token);
                     }, 1000);
                 }
+
+                reloadSchema(data.access_token);
                 
                 // Clear form
                 document.querySelector('#drf-email').value = '';
@@ -255,12 +371,23 @@
 
     // Logout handler
     function handleLogout() {
+        const headers = {
+            'X-CSRFToken': CONFIG.csrfToken,
+            'Content-Type': 'application/json',
+        };
+        // Lets the server revoke the token, if revocation is configured
+        const token = getStoredToken();
+        if (token) {
+            headers['Authorization'] = 'Bearer ' + token;
+        }
+
+        // Lets the server revoke the refresh token, if configured
+        const refreshToken = getStoredRefreshToken();
+
         fetch(CONFIG.logoutUrl, {
             method: 'POST',
-            headers: {
-                'X-CSRFToken': CONFIG.csrfToken,
-                'Content-Type': 'application/json',
-            },
+            headers: headers,
+            body: JSON.stringify(refreshToken ? { refresh_token: refreshToken } : {}),
         })
         .then(response => response.json())
         .then(data => {
@@ -273,6 +400,7 @@
             // Update UI
             updateAuthStatus(false);
             showMessage(getMessage('logoutSuccess'));
+            reloadSchema(null);
         })
         .catch(() => {
             // Clear local state even if server request fails
@@ -358,12 +486,17 @@
             copyTokenBtn.addEventListener('click', handleCopyToken);
         }
 
+        if (CONFIG.schemaSharding) {
+            document.addEventListener('click', handleTagClick);
+        }
+
         // Check for existing authentication
         const token = getStoredToken();
         const userInfo = getStoredUserInfo();
 
         if (token && userInfo) {
             updateAuthStatus(true, userInfo.email);
+            scheduleTokenRefresh(token);
             
             // Try auto-authorization if enabled
             if (CONFIG.autoAuthorize) {
@@ -371,6 +504,11 @@
                     setSwaggerAuthorization(token);
                 }, 500);
             }
+
+            // Swagger UI loaded the schema without the token
+            setTimeout(() => {
+                reloadSchema(token);
+            }, 500);
         } else {
             updateAuthStatus(false);
         }
@@ -0,0 +1,139 @@
+"""
+JSON Web Token helpers for local Cognito token verification
+
+Cognito signs its tokens with RS256 only, so verification is implemented with the
+standard library instead of pulling in a JWT/crypto dependency: an RSA public key
+operation followed by an EMSA-PKCS1-v1_5 encoding check (RFC 8017, section 8.2.2).
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from .providers.base import AuthenticationError
+
+# DER encoded DigestInfo prefix for SHA-256 (RFC 8017, section 9.2, note 1)
+SHA256_DIGEST_INFO_PREFIX = bytes.fromhex("3031300d060960864801650304020105000420")
+
+
+class DecodedToken(NamedTuple):
+    """
+    A JWT split into its parts, before any signature or claim validation
+    """
+
+    header: Dict[str, Any]
+    claims: Dict[str, Any]
+    signing_input: bytes
+    signature: bytes
+
+
+def base64url_decode(value: str) -> bytes:
+    """
+    Decode unpadded base64url data as used by JWS and JWK
+    """
+    padding = "=" * (-len(value) % 4)
+    return base64.urlsafe_b64decode(value + padding)
+
+
+def decode_token(token: str) -> DecodedToken:
+    """
+    Split a compact JWS token into header, claims and signature
+
+    Raises:
+        AuthenticationError: If the token is not a well-formed JWT
+    """
+    try:
+        header_segment, claims_segment, signature_segment = token.split(".")
+        header = json.loads(base64url_decode(header_segment))
+        claims = json.loads(base64url_decode(claims_segment))
+        signature = base64url_decode(signature_segment)
+    except (ValueError, TypeError, binascii.Error):
+        raise AuthenticationError("Token verification failed", "Malformed token")
+
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise AuthenticationError("Token verification failed", "Malformed token")
+
+    signing_input = f"{header_segment}.{claims_segment}".encode("ascii")
+    return DecodedToken(header, claims, signing_input, signature)
+
+
+def get_unverified_claims(token: str) -> Dict[str, Any]:
+    """
+    Return the claims of a token without verifying it
+
+    Only use the result for bookkeeping (cache lifetimes, lookups) on tokens that
+    are verified separately.
+    """
+    return decode_token(token).claims
+
+
+def verify_rs256_signature(
+    jwk: Dict[str, Any], signing_input: bytes, signature: bytes
+) -> bool:
+    """
+    Check an RS256 signature against an RSA public key in JWK form
+    """
+    if jwk.get("kty") != "RSA":
+        return False
+
+    try:
+        modulus = int.from_bytes(base64url_decode(jwk["n"]), "big")
+        exponent = int.from_bytes(base64url_decode(jwk["e"]), "big")
+    except (KeyError, TypeError, binascii.Error):
+        return False
+
+    key_length = (modulus.bit_length() + 7) // 8
+    if len(signature) != key_length:
+        return False
+
+    signature_int = int.from_bytes(signature, "big")
+    if signature_int >= modulus:
+        return False
+
+    encoded = pow(signature_int, exponent, modulus).to_bytes(key_length, "big")
+
+    digest_info = SHA256_DIGEST_INFO_PREFIX + hashlib.sha256(signing_input).digest()
+    padding_length = key_length - len(digest_info) - 3
+    if padding_length < 8:
+        return False
+    expected = b"\x00\x01" + b"\xff" * padding_length + b"\x00" + digest_info
+
+    return hmac.compare_digest(encoded, expected)
+
+
+def validate_claims(
+    claims: Dict[str, Any],
+    issuer: str,
+    client_id: str,
+    allowed_token_use: Iterable[str],
+    leeway: int = 0,
+    now: Optional[float] = None,
+) -> None:
+    """
+    Validate the registered and Cognito specific claims of a verified token
+
+    Access tokens carry the app client in ``client_id``, ID tokens in ``aud``.
+
+    Raises:
+        AuthenticationError: If any claim does not match
+    """
+    now = time.time() if now is None else now
+
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp + leeway <= now:
+        raise AuthenticationError("Token verification failed", "Token has expired")
+
+    if claims.get("iss") != issuer:
+        raise AuthenticationError("Token verification failed", "Invalid token issuer")
+
+    token_use = claims.get("token_use")
+    if token_use not in allowed_token_use:
+        raise AuthenticationError("Token verification failed", "Invalid token use")
+
+    audience = claims.get("client_id") if token_use == "access" else claims.get("aud")
+    if audience != client_id:
+        raise AuthenticationError("Token verification failed", "Invalid token audience")
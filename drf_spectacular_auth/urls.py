@@ -4,11 +4,27 @@ URLs for DRF Spectacular Auth
 
 from django.urls import path
 
-from .views import login_view, logout_view
+from .conf import auth_settings
+from .views import (
+    asset_view,
+    async_login_view,
+    async_logout_view,
+    async_refresh_view,
+    login_view,
+    logout_view,
+    refresh_view,
+)
 
 app_name = "drf_spectacular_auth"
 
+if auth_settings.ASYNC_VIEWS:
+    login, logout, refresh = async_login_view, async_logout_view, async_refresh_view
+else:
+    login, logout, refresh = login_view, logout_view, refresh_view
+
 urlpatterns = [
-    path("login/", login_view, name="login"),
-    path("logout/", logout_view, name="logout"),
+    path("login/", login, name="login"),
+    path("logout/", logout, name="logout"),
+    path("refresh/", refresh, name="refresh"),
+    path("assets/<str:filename>", asset_view, name="asset"),
 ]
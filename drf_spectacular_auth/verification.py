@@ -0,0 +1,204 @@
+"""
+Token verification shared by the middleware and the authentication backend
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from asgiref.sync import sync_to_async
+
+from .cache import create_token_cache
+from .conf import auth_settings
+from .providers.async_cognito import AsyncCognitoAuthProvider
+from .providers.base import AuthenticationError, ServiceUnavailableError
+from .providers.registry import get_auth_provider
+from .revocation import is_revoked, revoke
+from .tokens import get_unverified_claims
+
+_verified_token_cache = None
+_rejected_token_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_verified_token_cache():
+    """
+    Return the cache of verified tokens, configured by TOKEN_CACHE["BACKEND"]
+    """
+    global _verified_token_cache
+    if _verified_token_cache is None:
+        with _cache_lock:
+            if _verified_token_cache is None:
+                _verified_token_cache = create_token_cache(
+                    auth_settings.TOKEN_CACHE, "verified"
+                )
+    return _verified_token_cache
+
+
+def get_rejected_token_cache():
+    """
+    Return the cache of recently rejected tokens, configured by
+    REJECTED_TOKEN_CACHE["BACKEND"]
+    """
+    global _rejected_token_cache
+    if _rejected_token_cache is None:
+        with _cache_lock:
+            if _rejected_token_cache is None:
+                _rejected_token_cache = create_token_cache(
+                    auth_settings.REJECTED_TOKEN_CACHE, "rejected"
+                )
+    return _rejected_token_cache
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a bearer token and return the user information
+
+    Results are cached until the token's "exp" claim (capped at
+    TOKEN_CACHE["MAX_TTL"] seconds), so repeated requests with the same token
+    do not reach Cognito again. Rejected tokens are remembered for
+    REJECTED_TOKEN_CACHE["TTL"] seconds and fail without a Cognito call, so
+    clients resending a stale token do not amplify into GetUser traffic.
+    Tokens revoked by logout fail before any cache lookup.
+
+    Raises:
+        AuthenticationError: If the token is invalid, expired or revoked
+    """
+    user_info = _get_cached_user_info(token)
+    if user_info is None:
+        try:
+            user_info = get_auth_provider().verify_token(token)
+        except AuthenticationError as e:
+            _remember_rejection(token, e)
+            raise
+        _remember_user_info(token, user_info)
+    return dict(user_info)
+
+
+async def averify_token(token: str) -> Dict[str, Any]:
+    """
+    Async version of verify_token(), sharing its caches
+
+    Cache misses are verified with AsyncCognitoAuthProvider; without httpx
+    installed the sync provider is run in a thread instead.
+
+    Raises:
+        AuthenticationError: If the token is invalid, expired or revoked
+    """
+    try:
+        provider = get_auth_provider(AsyncCognitoAuthProvider)
+    except ImportError:
+        return await sync_to_async(verify_token)(token)
+
+    user_info = _get_cached_user_info(token)
+    if user_info is None:
+        try:
+            user_info = await provider.averify_token(token)
+        except AuthenticationError as e:
+            _remember_rejection(token, e)
+            raise
+        _remember_user_info(token, user_info)
+    return dict(user_info)
+
+
+def _get_cached_user_info(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Return cached user information, or None if the token must be verified
+
+    Raises:
+        AuthenticationError: If the token was revoked or rejected recently
+    """
+    if is_revoked(token):
+        raise AuthenticationError("Token revoked", "The token has been revoked")
+
+    if auth_settings.REJECTED_TOKEN_CACHE["ENABLED"]:
+        rejection = get_rejected_token_cache().get(token)
+        if rejection is not None:
+            raise AuthenticationError(*rejection)
+
+    if auth_settings.TOKEN_CACHE["ENABLED"]:
+        return get_verified_token_cache().get(token)
+    return None
+
+
+def revoke_token(token: str) -> Dict[str, Any]:
+    """
+    Revoke a token on logout and return its user information
+
+    The token is verified first, so only genuine tokens are recorded in the
+    revocation store, and dropped from the verified token cache.
+
+    Raises:
+        AuthenticationError: If the token is invalid, expired or revoked
+    """
+    user_info = verify_token(token)
+    _forget_token(token)
+    return user_info
+
+
+async def arevoke_token(token: str) -> Dict[str, Any]:
+    """
+    Async version of revoke_token()
+    """
+    user_info = await averify_token(token)
+    _forget_token(token)
+    return user_info
+
+
+def _forget_token(token: str) -> None:
+    revoke(token)
+    if auth_settings.TOKEN_CACHE["ENABLED"]:
+        get_verified_token_cache().delete(token)
+
+
+def _remember_user_info(token: str, user_info: Dict[str, Any]) -> None:
+    if auth_settings.TOKEN_CACHE["ENABLED"]:
+        get_verified_token_cache().set(token, user_info, _get_cache_expiry(token))
+
+
+def _remember_rejection(token: str, error: AuthenticationError) -> None:
+    config = auth_settings.REJECTED_TOKEN_CACHE
+    # An unavailable identity provider says nothing about the token
+    if config["ENABLED"] and not isinstance(error, ServiceUnavailableError):
+        get_rejected_token_cache().set(
+            token, (error.message, error.detail), time.time() + config["TTL"]
+        )
+
+
+def _get_cache_expiry(token: str) -> float:
+    """
+    Expiry timestamp for a cached verification result
+    """
+    expires_at = time.time() + auth_settings.TOKEN_CACHE["MAX_TTL"]
+    try:
+        exp = get_unverified_claims(token).get("exp")
+    except AuthenticationError:
+        # Opaque token; fall back to the maximum lifetime
+        return expires_at
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    return expires_at
+
+
+def clear_token_caches() -> None:
+    """
+    Drop the token caches, e.g. after the cache settings changed
+    """
+    global _verified_token_cache, _rejected_token_cache
+    with _cache_lock:
+        _verified_token_cache = None
+        _rejected_token_cache = None
+
+
+def _clear_on_setting_changed(*args, **kwargs):
+    if kwargs["setting"] == "DRF_SPECTACULAR_AUTH":
+        clear_token_caches()
+
+
+try:
+    from django.core.signals import setting_changed
+
+    setting_changed.connect(_clear_on_setting_changed)
+except ImportError:
+    # Django not available
+    pass
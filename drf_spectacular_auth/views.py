@@ -2,31 +2,252 @@
 Views for DRF Spectacular Auth
 """
 
+import hashlib
+import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
+import drf_spectacular
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import logout
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse
 from django.middleware.csrf import get_token
-from django.template.loader import render_to_string
-from django.utils.module_loading import import_string
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_safe
+from drf_spectacular.plumbing import set_query_parameters
 from drf_spectacular.utils import extend_schema
-from drf_spectacular.views import SpectacularSwaggerView
+from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from . import __version__
+from .assets import (
+    get_asset,
+    get_auth_panel_context,
+    get_auth_panel_css,
+    get_auth_panel_js,
+)
+from .audit import (
+    LOGIN_ATTEMPT,
+    LOGIN_FAILURE,
+    LOGIN_SUCCESS,
+    LOGOUT,
+    record_audit_event,
+)
 from .conf import auth_settings
-from .providers.base import AuthenticationError
-from .providers.cognito import CognitoAuthProvider
+from .hooks import get_hook_pipeline
+from .messages import get_message_bundle
+from .providers.async_cognito import AsyncCognitoAuthProvider
+from .providers.base import AuthenticationError, ServiceUnavailableError
+from .providers.registry import get_auth_provider
+from .schema import (
+    INDEX_SHARD,
+    build_schema_entry,
+    build_streamed_schema_entry,
+    get_cached_schema,
+    get_permission_fingerprint,
+    get_schema_cache_key,
+    get_schema_response,
+    get_streamed_schema,
+    render_schema_chunks,
+    set_cached_schemas,
+    set_streamed_schema,
+    split_schema,
+)
 from .serializers import (
     ErrorResponseSerializer,
     LoginResponseSerializer,
     LoginSerializer,
+    RefreshResponseSerializer,
+    RefreshSerializer,
 )
+from .tokens import get_unverified_claims
+from .verification import arevoke_token, revoke_token
 
 logger = logging.getLogger(__name__)
 
 
+class SpectacularAuthAPIView(SpectacularAPIView):
+    """
+    SpectacularAPIView serving pre-serialized schemas from a cache
+
+    Each (version, language, auth state, media type) variant is generated
+    once, stored as bytes with a gzip variant and an ETag in the Django cache
+    configured by SCHEMA_CACHE, and can be prebuilt at deploy time with the
+    prebuild_spectacular_auth_schema management command.
+
+    With SCHEMA_CACHE["STREAMING"], the full schema is instead streamed from
+    path and component fragments kept in process memory.
+
+    For SCHEMA_SHARDING, "?shard=index" serves the schema without paths and
+    "?tag=<name>" the paths of one tag with the components they reference.
+    """
+
+    # Regenerate instead of reading the cache (used when prebuilding)
+    refresh_cache: bool = False
+
+    def _get_schema_response(self, request):
+        shard = self._get_shard(request)
+        auth_state = self._get_auth_state(request)
+        cacheable = auth_settings.SCHEMA_CACHE["ENABLED"] and auth_state is not None
+        if not cacheable and shard is None:
+            return super()._get_schema_response(request)
+
+        version = (
+            self.api_version or request.version or self._get_version_parameter(request)
+        )
+
+        def get_key(shard):
+            return get_schema_cache_key(
+                self._get_cache_namespace(),
+                version=version,
+                language=translation.get_language(),
+                auth_state=auth_state,
+                media_type=request.accepted_media_type,
+                shard=shard,
+            )
+
+        if cacheable and shard is None and auth_settings.SCHEMA_CACHE["STREAMING"]:
+            return self._get_streamed_schema_response(request, version, get_key(None))
+
+        entry = None
+        if cacheable and not self.refresh_cache:
+            entry = get_cached_schema(get_key(shard))
+            if entry is None and shard not in (None, INDEX_SHARD):
+                # The cached index lists the tags; others need no regeneration
+                index = get_cached_schema(get_key(INDEX_SHARD))
+                if index is not None and shard not in index["shards"]:
+                    raise Http404("Unknown schema tag")
+        if entry is None:
+            # Generating is the expensive part, so all shards are built at once
+            entries = self._build_schema_entries(request, version, shard is not None)
+            if cacheable:
+                set_cached_schemas(
+                    {get_key(name): entry for name, entry in entries.items()}
+                )
+            entry = entries.get(shard)
+            if entry is None:
+                raise Http404("Unknown schema tag")
+        return get_schema_response(request, entry)
+
+    def _get_streamed_schema_response(self, request, version, key):
+        """
+        Stream the schema from fragments serialized once per process
+        """
+        entry = None if self.refresh_cache else get_streamed_schema(key)
+        if entry is None:
+            renderer = request.accepted_renderer
+            chunks = render_schema_chunks(
+                renderer,
+                self._generate_schema(request, version),
+                request.accepted_media_type,
+                self.get_renderer_context(),
+            )
+            entry = build_streamed_schema_entry(
+                chunks,
+                self._get_content_type(renderer),
+                self._get_filename(request, version),
+            )
+            set_streamed_schema(key, entry)
+        return get_schema_response(request, entry)
+
+    def _build_schema_entries(
+        self, request, version, sharded: bool
+    ) -> Dict[Optional[str], Dict[str, Any]]:
+        """
+        Render the schema, or its index and tag shards, to cache entries
+        """
+        schema = self._generate_schema(request, version)
+        schemas = split_schema(schema) if sharded else {None: schema}
+
+        renderer = request.accepted_renderer
+        content_type = self._get_content_type(renderer)
+        filename = self._get_filename(request, version)
+
+        entries = {}
+        for shard, data in schemas.items():
+            content = renderer.render(
+                data, request.accepted_media_type, self.get_renderer_context()
+            )
+            if isinstance(content, str):
+                content = content.encode(renderer.charset or "utf-8")
+            entries[shard] = build_schema_entry(content, content_type, filename)
+        if sharded:
+            entries[INDEX_SHARD]["shards"] = sorted(
+                name for name in entries if name != INDEX_SHARD
+            )
+        return entries
+
+    def _generate_schema(self, request, version) -> Dict[str, Any]:
+        generator = self.generator_class(
+            urlconf=self.urlconf, api_version=version, patterns=self.patterns
+        )
+        return generator.get_schema(request=request, public=self._is_public(request))
+
+    def _get_content_type(self, renderer) -> str:
+        if renderer.charset:
+            return f"{renderer.media_type}; charset={renderer.charset}"
+        return renderer.media_type
+
+    def _get_shard(self, request) -> Optional[str]:
+        """
+        Name the requested part of the schema: ?shard=index or ?tag=<name>
+        """
+        if "tag" in request.GET:
+            return f"tag:{request.GET['tag']}"
+        if request.GET.get("shard") == INDEX_SHARD:
+            return INDEX_SHARD
+        return None
+
+    def _is_public(self, request) -> bool:
+        """
+        Whether the full schema is served instead of the user's endpoints
+        """
+        if auth_settings.FILTER_SCHEMA_BY_PERMISSIONS:
+            return not request.user.is_authenticated
+        return self.serve_public
+
+    def _get_auth_state(self, request) -> Optional[str]:
+        """
+        Describe what of the user the schema depends on
+
+        Users whose permission fingerprints match share one cached variant.
+        These variants are not prebuilt, but expire with the schema generation
+        like all others. Returns None if the schema is specific to the user and
+        not cached.
+        """
+        if self._is_public(request):
+            return "public"
+        if not request.user.is_authenticated:
+            return "anonymous"
+        fingerprint = get_permission_fingerprint(request.user)
+        if fingerprint is None:
+            return None
+        return f"permissions:{fingerprint}"
+
+    def _get_cache_namespace(self) -> str:
+        """
+        Identify the view configuration, e.g. as_view() arguments
+        """
+        view_class = type(self)
+        return repr(
+            (
+                f"{view_class.__module__}.{view_class.__qualname__}",
+                self.generator_class,
+                self.urlconf,
+                self.patterns,
+                self.api_version,
+                self.custom_settings,
+            )
+        )
+
+
 class SpectacularAuthSwaggerView(SpectacularSwaggerView):
     """
     Enhanced SpectacularSwaggerView with direct auth context injection
@@ -55,29 +276,56 @@ class SpectacularAuthSwaggerView(SpectacularSwaggerView):
         """
         Override get() method to inject auth context directly into Response data
         """
-        # Get the original response data from parent
-        response = super().get(request, *args, **kwargs)
+        # Answer revalidations of an unchanged page without rendering it
+        etag = self._get_etag()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            # Get the original response data from parent
+            response = super().get(request, *args, **kwargs)
+
+            # Add our authentication context to the data
+            auth_context = self._get_auth_context()
+            response.data.update(auth_context)
+
+        response["ETag"] = etag
+        # Revalidate on every load; the page embeds the user's CSRF token
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
-        # Add our authentication context to the data
-        auth_context = self._get_auth_context()
-        response.data.update(auth_context)
+    def _get_etag(self) -> str:
+        """
+        Strong validator for everything the rendered page depends on
 
-        return response
+        The page embeds a freshly masked CSRF token on each render, but any
+        masking of the same secret stays valid, so the secret identifies it.
+        """
+        language = self._get_language()
+        get_token(self.request)
+        parts = [
+            drf_spectacular.__version__,
+            __version__,
+            auth_settings.fingerprint,
+            language,
+            get_auth_panel_js(language).filename,
+            get_auth_panel_css().filename,
+            json.dumps(
+                getattr(settings, "SPECTACULAR_SETTINGS", {}),
+                sort_keys=True,
+                default=str,
+            ),
+            self.template_name,
+            self.url or self.url_name,
+            str(self.title),
+            self.request.META.get("CSRF_COOKIE", ""),
+            self.request.get_full_path(),
+        ]
+        digest = hashlib.sha256("\0".join(parts).encode()).hexdigest()
+        return quote_etag(digest)
 
     def _get_auth_context(self):
         """
         Generate authentication context for the template
         """
-        # Create context for JavaScript template rendering
-        js_context = {
-            "auth_settings": auth_settings.settings,
-            "login_url": auth_settings.LOGIN_ENDPOINT,
-            "logout_url": auth_settings.LOGOUT_ENDPOINT,
-            "csrf_token": get_token(self.request),
-            "theme": auth_settings.THEME,
-            "language": self._get_language(),
-        }
-
         return {
             "auth_settings": auth_settings.settings,
             "login_url": auth_settings.LOGIN_ENDPOINT,
@@ -86,11 +334,20 @@ class SpectacularAuthSwaggerView(SpectacularSwaggerView):
             "panel_style": auth_settings.PANEL_STYLE,
             "theme": auth_settings.THEME,
             "language": self._get_language(),
-            "auth_panel_js": render_to_string(
-                "drf_spectacular_auth/auth_panel.js", js_context, request=self.request
-            ),
+            "auth_messages": get_message_bundle(self._get_language()),
+            # Cached per language/settings; the CSRF token is injected separately
+            **get_auth_panel_context(self._get_language()),
         }
 
+    def _get_schema_url(self, request):
+        """
+        Point Swagger UI at the schema index when the schema is sharded by tag
+        """
+        schema_url = super()._get_schema_url(request)
+        if auth_settings.SCHEMA_SHARDING:
+            schema_url = set_query_parameters(schema_url, shard=INDEX_SHARD)
+        return schema_url
+
     def _get_language(self) -> str:
         """Get current language from request or settings"""
         language = getattr(self.request, "LANGUAGE_CODE", None)
@@ -99,6 +356,23 @@ class SpectacularAuthSwaggerView(SpectacularSwaggerView):
         return language
 
 
+@require_safe
+def asset_view(request, filename):
+    """
+    Serve a rendered auth panel asset under its content hashed file name
+
+    The name changes whenever the content does, so browsers may cache the
+    response for good.
+    """
+    asset = get_asset(filename)
+    if asset is None:
+        raise Http404("Unknown asset")
+
+    response = HttpResponse(asset.content, content_type=asset.content_type)
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
 @extend_schema(exclude=True)
 @api_view(["POST"])
 @permission_classes([AllowAny])
@@ -133,14 +407,18 @@ def login_view(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Call pre-login hook if configured
-        _call_hook("PRE_LOGIN", request, credentials)
+        record_audit_event(LOGIN_ATTEMPT, request, credentials.get("email"))
+
+        # Run pre-login hooks, if configured
+        get_hook_pipeline().run("PRE_LOGIN", request, credentials)
 
         # Authenticate user
         auth_result = provider.authenticate(credentials)
 
-        # Call post-login hook if configured
-        _call_hook("POST_LOGIN", request, auth_result)
+        record_audit_event(LOGIN_SUCCESS, request, credentials.get("email"))
+
+        # Run post-login hooks, if configured
+        get_hook_pipeline().run("POST_LOGIN", request, auth_result)
 
         logger.info(f"Successful login for user: {credentials.get('email')}")
 
@@ -149,8 +427,19 @@ def login_view(request):
             LoginResponseSerializer(auth_result).data, status=status.HTTP_200_OK
         )
 
+    except ServiceUnavailableError as e:
+        logger.warning(f"Authentication service unavailable: {e.detail}")
+        record_audit_event(LOGIN_FAILURE, request, credentials.get("email"), e)
+        response = Response(
+            ErrorResponseSerializer({"error": e.message, "detail": e.detail}).data,
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        response["Retry-After"] = str(e.retry_after)
+        return response
+
     except AuthenticationError as e:
         logger.warning(f"Authentication failed: {e.message}")
+        record_audit_event(LOGIN_FAILURE, request, credentials.get("email"), e)
         return Response(
             ErrorResponseSerializer({"error": e.message, "detail": e.detail}).data,
             status=status.HTTP_401_UNAUTHORIZED,
@@ -158,6 +447,7 @@ def login_view(request):
 
     except Exception as e:
         logger.error(f"Unexpected error during authentication: {str(e)}")
+        record_audit_event(LOGIN_FAILURE, request, credentials.get("email"), e)
         return Response(
             ErrorResponseSerializer(
                 {
@@ -177,14 +467,18 @@ def logout_view(request):
     API endpoint for user logout
     """
     try:
-        # Call pre-logout hook if configured
-        _call_hook("PRE_LOGOUT", request, {})
+        # Run pre-logout hooks, if configured
+        get_hook_pipeline().run("PRE_LOGOUT", request, {})
+
+        # Revoke the session's token, if configured
+        _sign_out(request, request.data)
+
+        # Run post-logout hooks, if configured
+        get_hook_pipeline().run("POST_LOGOUT", request, {})
 
-        # Session cleanup no longer needed for sessionStorage approach
-        pass
+        _end_session(request)
 
-        # Call post-logout hook if configured
-        _call_hook("POST_LOGOUT", request, {})
+        record_audit_event(LOGOUT, request)
 
         # Create response
         return Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
@@ -199,25 +493,385 @@ def logout_view(request):
         )
 
 
+@extend_schema(exclude=True)
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def refresh_view(request):
+    """
+    API endpoint exchanging a refresh token for a new access token
+    """
+    serializer = RefreshSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(
+            ErrorResponseSerializer(
+                {"error": "Invalid request data", "detail": str(serializer.errors)}
+            ).data,
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        provider = _get_auth_provider()
+        refresh_result = provider.refresh_token(
+            serializer.validated_data["refresh_token"],
+            username=_get_refresh_username(request, serializer.validated_data),
+        )
+        return Response(
+            RefreshResponseSerializer(refresh_result).data, status=status.HTTP_200_OK
+        )
+
+    except ServiceUnavailableError as e:
+        logger.warning(f"Authentication service unavailable: {e.detail}")
+        response = Response(
+            ErrorResponseSerializer({"error": e.message, "detail": e.detail}).data,
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        response["Retry-After"] = str(e.retry_after)
+        return response
+
+    except AuthenticationError as e:
+        logger.warning(f"Token refresh failed: {e.message}")
+        return Response(
+            ErrorResponseSerializer({"error": e.message, "detail": e.detail}).data,
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    except ValueError as e:
+        return Response(
+            ErrorResponseSerializer(
+                {"error": "Username required", "detail": str(e)}
+            ).data,
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error during token refresh: {str(e)}")
+        return Response(
+            ErrorResponseSerializer(
+                {
+                    "error": "Authentication service error",
+                    "detail": "An unexpected error occurred during token refresh",
+                }
+            ).data,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@csrf_exempt
+async def async_login_view(request):
+    """
+    Async API endpoint for user authentication (ASGI deployments)
+
+    Same contract as login_view, but Cognito is called without blocking a
+    thread. Like the DRF views, it is exempt from CSRF checks.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    serializer = LoginSerializer(data=_get_request_data(request))
+    if not serializer.is_valid():
+        return JsonResponse(
+            ErrorResponseSerializer(
+                {"error": "Invalid request data", "detail": str(serializer.errors)}
+            ).data,
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    credentials = serializer.validated_data
+
+    try:
+        # Get authentication provider
+        provider = _get_async_auth_provider()
+
+        # Validate credentials
+        if not provider.validate_credentials(credentials):
+            return JsonResponse(
+                ErrorResponseSerializer(
+                    {
+                        "error": "Invalid credentials format",
+                        "detail": "Please check your email and password format",
+                    }
+                ).data,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        record_audit_event(LOGIN_ATTEMPT, request, credentials.get("email"))
+
+        # Run pre-login hooks, if configured
+        await get_hook_pipeline().arun("PRE_LOGIN", request, credentials)
+
+        # Authenticate user
+        auth_result = await provider.aauthenticate(credentials)
+
+        record_audit_event(LOGIN_SUCCESS, request, credentials.get("email"))
+
+        # Run post-login hooks, if configured
+        await get_hook_pipeline().arun("POST_LOGIN", request, auth_result)
+
+        logger.info(f"Successful login for user: {credentials.get('email')}")
+
+        return JsonResponse(
+            LoginResponseSerializer(auth_result).data, status=status.HTTP_200_OK
+        )
+
+    except ServiceUnavailableError as e:
+        logger.warning(f"Authentication service unavailable: {e.detail}")
+        record_audit_event(LOGIN_FAILURE, request, credentials.get("email"), e)
+        response = JsonResponse(
+            ErrorResponseSerializer({"error": e.message, "detail": e.detail}).data,
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        response["Retry-After"] = str(e.retry_after)
+        return response
+
+    except AuthenticationError as e:
+        logger.warning(f"Authentication failed: {e.message}")
+        record_audit_event(LOGIN_FAILURE, request, credentials.get("email"), e)
+        return JsonResponse(
+            ErrorResponseSerializer({"error": e.message, "detail": e.detail}).data,
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error during authentication: {str(e)}")
+        record_audit_event(LOGIN_FAILURE, request, credentials.get("email"), e)
+        return JsonResponse(
+            ErrorResponseSerializer(
+                {
+                    "error": "Authentication service error",
+                    "detail": "An unexpected error occurred during authentication",
+                }
+            ).data,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@csrf_exempt
+async def async_logout_view(request):
+    """
+    Async API endpoint for user logout (ASGI deployments)
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    try:
+        # Run pre-logout hooks, if configured
+        await get_hook_pipeline().arun("PRE_LOGOUT", request, {})
+
+        # Revoke the session's token, if configured
+        await _asign_out(request, _get_request_data(request))
+
+        # Run post-logout hooks, if configured
+        await get_hook_pipeline().arun("POST_LOGOUT", request, {})
+
+        await sync_to_async(_end_session)(request)
+
+        record_audit_event(LOGOUT, request)
+
+        return JsonResponse({"message": "Logout successful"}, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Error during logout: {str(e)}")
+        return JsonResponse(
+            ErrorResponseSerializer(
+                {"error": "Logout failed", "detail": "An error occurred during logout"}
+            ).data,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@csrf_exempt
+async def async_refresh_view(request):
+    """
+    Async API endpoint exchanging a refresh token (ASGI deployments)
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    serializer = RefreshSerializer(data=_get_request_data(request))
+    if not serializer.is_valid():
+        return JsonResponse(
+            ErrorResponseSerializer(
+                {"error": "Invalid request data", "detail": str(serializer.errors)}
+            ).data,
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        provider = _get_async_auth_provider()
+        refresh_result = await provider.arefresh_token(
+            serializer.validated_data["refresh_token"],
+            username=_get_refresh_username(request, serializer.validated_data),
+        )
+        return JsonResponse(
+            RefreshResponseSerializer(refresh_result).data, status=status.HTTP_200_OK
+        )
+
+    except ServiceUnavailableError as e:
+        logger.warning(f"Authentication service unavailable: {e.detail}")
+        response = JsonResponse(
+            ErrorResponseSerializer({"error": e.message, "detail": e.detail}).data,
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        response["Retry-After"] = str(e.retry_after)
+        return response
+
+    except AuthenticationError as e:
+        logger.warning(f"Token refresh failed: {e.message}")
+        return JsonResponse(
+            ErrorResponseSerializer({"error": e.message, "detail": e.detail}).data,
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
+    except ValueError as e:
+        return JsonResponse(
+            ErrorResponseSerializer(
+                {"error": "Username required", "detail": str(e)}
+            ).data,
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error during token refresh: {str(e)}")
+        return JsonResponse(
+            ErrorResponseSerializer(
+                {
+                    "error": "Authentication service error",
+                    "detail": "An unexpected error occurred during token refresh",
+                }
+            ).data,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+def _get_access_token(request, data) -> Optional[str]:
+    """
+    Access token sent as bearer header or in the request body
+    """
+    auth_header = request.META.get("HTTP_AUTHORIZATION", "")
+    if auth_header.startswith("Bearer "):
+        return auth_header.split(" ")[1] or None
+    return data.get("access_token") or None
+
+
+def _get_refresh_username(request, data) -> Optional[str]:
+    """
+    Username for the SECRET_HASH of a refresh
+
+    Taken from the request, or else from the username claim of the (possibly
+    expired) access token. The claim is read without verification: Cognito
+    rejects a SECRET_HASH that does not belong to the refresh token.
+    """
+    if data.get("username"):
+        return data["username"]
+    access_token = _get_access_token(request, data)
+    if not access_token:
+        return None
+    try:
+        claims = get_unverified_claims(access_token)
+    except AuthenticationError:
+        return None
+    return claims.get("username") or claims.get("cognito:username")
+
+
+def _end_session(request) -> None:
+    """
+    End the Django session SpectacularAuthMiddleware logged the user into
+
+    Otherwise the session keeps the user logged in to the docs, and the
+    middleware never checks the revoked token again.
+    """
+    if hasattr(request, "session"):
+        logout(request)
+
+
+def _get_logout_tokens(request, data) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Access token (bearer header or body) and refresh token sent on logout
+    """
+    return _get_access_token(request, data), data.get("refresh_token") or None
+
+
+def _revocation_configured() -> bool:
+    revocation = auth_settings.REVOCATION
+    return bool(revocation["ENABLED"] or revocation["COGNITO_SIGN_OUT"])
+
+
+def _sign_out(request, data) -> None:
+    """
+    Revoke the logged out token locally and at the identity provider
+
+    Only verified access tokens are recorded as revoked; invalid ones are
+    already unusable. The identity provider is still asked to revoke a sent
+    refresh token, which outlives an expired access token. A failing
+    identity provider call is logged and does not fail the logout.
+    """
+    if not _revocation_configured():
+        return
+    access_token, refresh_token = _get_logout_tokens(request, data)
+
+    verified = False
+    if access_token:
+        try:
+            revoke_token(access_token)
+            verified = True
+        except AuthenticationError as e:
+            logger.info(f"Logout token not revoked: {e.message}")
+    if not verified and not refresh_token:
+        return
+
+    try:
+        _get_auth_provider().sign_out(access_token, refresh_token)
+    except AuthenticationError as e:
+        logger.warning(f"Identity provider sign out failed: {e.detail}")
+
+
+async def _asign_out(request, data) -> None:
+    """
+    Async version of _sign_out()
+    """
+    if not _revocation_configured():
+        return
+    access_token, refresh_token = _get_logout_tokens(request, data)
+
+    verified = False
+    if access_token:
+        try:
+            await arevoke_token(access_token)
+            verified = True
+        except AuthenticationError as e:
+            logger.info(f"Logout token not revoked: {e.message}")
+    if not verified and not refresh_token:
+        return
+
+    try:
+        await _get_async_auth_provider().asign_out(access_token, refresh_token)
+    except AuthenticationError as e:
+        logger.warning(f"Identity provider sign out failed: {e.detail}")
+
+
+def _get_request_data(request) -> Dict[str, Any]:
+    """
+    Parse form or JSON request bodies for the plain Django async views
+    """
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+    return request.POST
+
+
 def _get_auth_provider():
     """
     Get the configured authentication provider
     """
     # For now, we only support Cognito
     # This can be extended to support multiple providers
-    return CognitoAuthProvider()
+    return get_auth_provider()
 
 
-def _call_hook(hook_name: str, request, data: Dict[str, Any]) -> None:
+def _get_async_auth_provider():
     """
-    Call a configured hook function
+    Get the configured authentication provider with async support
     """
-    hook_path = auth_settings.HOOKS.get(hook_name)
-    if not hook_path:
-        return
-
-    try:
-        hook_func = import_string(hook_path)
-        hook_func(request, data)
-    except Exception as e:
-        logger.error(f"Error calling {hook_name} hook: {str(e)}")
+    return get_auth_provider(AsyncCognitoAuthProvider)
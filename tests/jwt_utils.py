@@ -0,0 +1,98 @@
+"""
+JWT helpers for tests - a throwaway RSA key pair and a token signer
+"""
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from drf_spectacular_auth.tokens import SHA256_DIGEST_INFO_PREFIX
+
+# 2048-bit RSA test key, generated for this test suite only
+TEST_KEY_MODULUS = int(
+    "9e5b80e535640f8a236f885508d141e8451353dfbfd52a418025303da4a36f8d"
+    "bb46166c812242f10ae136013f77c987e1e3de96b86b5edfde2afc84d3463b80"
+    "5e827abcc6bd1847f457c7bacd4ada2bd6a83cb97c6ca04466f0e54065a20800"
+    "ea40f47ef5fbd7f7477b7a2334c7eac7c82e1622f6794bb3062494c9dbbea93e"
+    "5257dfed8054533dd94ac8428ba4fdeeed39988c1093b35eaffd38bafd09dc6b"
+    "68f81ecd0d038251a02fc6cacb41a26d289dab686f8958dc02904f25e3840f52"
+    "11ba56173d537c39b0cc8355ebba5ea407b15556815a083138d49c23318b79a3"
+    "4edd31c26fb213eaf67b52ed7389359d5a2c2cf5fd45af7e42b3996b2a96b6ad",
+    16,
+)
+TEST_KEY_PRIVATE_EXPONENT = int(
+    "123cb081f51da26a82bd3802af02c667d4f8ae5aa0d1904dbdcfca97f6cb79af"
+    "e566e3733885f516a46d9e5613749ca980fac8aa2beff59bab8ee0c8fd39e3e5"
+    "5b3d049c93f8b800a563ac95574a2d090a6e129c3bf7989778117b1d68f6f99b"
+    "fd5e60a9f4733e0274e18405e4f0b719adf49cc907009e16ae78ed07b83e6368"
+    "231a86a0a4d7d53d7a1e75c77529947f828827c4cb2edca3a02111ded31dca8b"
+    "eb716139f57a92829c56368fecc04e8084babd1b175ad4d8aae674c49fbdf92a"
+    "f125e0917d09d2622f3eb491f404175158309ef14941918893153530d0e13472"
+    "f13471486fc4cda830edb66c66b4f347f596df6e7aff18de89c6143ce0120973",
+    16,
+)
+TEST_KEY_ID = "test-key-id"
+
+USER_POOL_ID = "us-east-1_TestPool"
+ISSUER = f"https://cognito-idp.us-east-1.amazonaws.com/{USER_POOL_ID}"
+CLIENT_ID = "test-client-id"
+
+
+def b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def public_jwk(kid: str = TEST_KEY_ID) -> dict:
+    return {
+        "kty": "RSA",
+        "alg": "RS256",
+        "use": "sig",
+        "kid": kid,
+        "n": b64url(TEST_KEY_MODULUS.to_bytes(256, "big")),
+        "e": b64url((65537).to_bytes(3, "big")),
+    }
+
+
+def make_claims(**overrides) -> dict:
+    claims = {
+        "sub": "test-sub",
+        "iss": ISSUER,
+        "token_use": "id",
+        "aud": CLIENT_ID,
+        "email": "test@example.com",
+        "email_verified": True,
+        "given_name": "Test",
+        "family_name": "User",
+        "exp": int(time.time()) + 3600,
+        "iat": int(time.time()),
+    }
+    claims.update(overrides)
+    return claims
+
+
+def make_token(claims: dict = None, kid: str = TEST_KEY_ID, alg: str = "RS256") -> str:
+    header = b64url(json.dumps({"alg": alg, "kid": kid}).encode())
+    payload = b64url(json.dumps(claims or make_claims()).encode())
+    signing_input = f"{header}.{payload}".encode("ascii")
+
+    digest_info = SHA256_DIGEST_INFO_PREFIX + hashlib.sha256(signing_input).digest()
+    encoded = b"\x00\x01" + b"\xff" * (256 - len(digest_info) - 3) + b"\x00"
+    encoded += digest_info
+    signature = pow(
+        int.from_bytes(encoded, "big"), TEST_KEY_PRIVATE_EXPONENT, TEST_KEY_MODULUS
+    )
+    return f"{header}.{payload}.{b64url(signature.to_bytes(256, 'big'))}"
+
+
+def write_jwks_file(test_case, keys: list) -> str:
+    """
+    Write a JWKS document to a temporary file and return its file:// URL
+    """
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w") as jwks_file:
+        json.dump({"keys": keys}, jwks_file)
+    test_case.addCleanup(os.remove, path)
+    return f"file://{path}"
@@ -0,0 +1,94 @@
+"""
+Tests for auth panel asset rendering
+"""
+
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from drf_spectacular_auth.assets import (
+    clear_rendered_assets,
+    get_auth_panel_css,
+    get_auth_panel_js,
+)
+
+
+class AuthPanelJsTest(TestCase):
+
+    def setUp(self):
+        clear_rendered_assets()
+
+    def test_rendered_once_per_language(self):
+        with patch(
+            "drf_spectacular_auth.assets.render_to_string", return_value="script"
+        ) as mock_render:
+            get_auth_panel_js("en").content
+            get_auth_panel_js("en").content
+            get_auth_panel_js("ko").content
+
+        self.assertEqual(mock_render.call_count, 2)
+
+    def test_script_has_no_request_data(self):
+        script = get_auth_panel_js("en").content
+
+        self.assertIn("panelElement.dataset.csrfToken", script)
+        self.assertIn("language: 'en'", script)
+
+    def test_settings_change_invalidates(self):
+        get_auth_panel_js("en").content
+
+        with override_settings(
+            DRF_SPECTACULAR_AUTH={"LOGIN_ENDPOINT": "/custom/login/"}
+        ):
+            self.assertIn("/custom/login/", get_auth_panel_js("en").content)
+
+        self.assertNotIn("/custom/login/", get_auth_panel_js("en").content)
+
+    def test_csrf_token_on_panel_element(self):
+        response = self.client.get("/docs/")
+
+        self.assertContains(response, 'data-csrf-token="')
+        self.assertNotContains(response, "csrfToken: '")
+
+
+@override_settings(DRF_SPECTACULAR_AUTH={"PANEL_ASSETS": "static"})
+class StaticPanelAssetsTest(TestCase):
+
+    def test_page_links_hashed_assets(self):
+        response = self.client.get("/docs/")
+
+        script = get_auth_panel_js("en")
+        self.assertContains(response, f'src="/auth/assets/{script.filename}"')
+        self.assertContains(response, 'rel="stylesheet" href="/auth/assets/')
+        self.assertNotContains(response, "const MESSAGES")
+        self.assertRegex(script.filename, r"^auth_panel\.en\.[0-9a-f]{12}\.js$")
+
+    def test_asset_served_immutable(self):
+        styles = get_auth_panel_css()
+
+        response = self.client.get(f"/auth/assets/{styles.filename}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/css; charset=utf-8")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response.content.decode(), styles.content)
+
+    def test_asset_of_other_language_served(self):
+        clear_rendered_assets()
+
+        response = self.client.get(f"/auth/assets/{get_auth_panel_js('ja').filename}")
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_asset(self):
+        response = self.client.get("/auth/assets/auth_panel.en.000000000000.js")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_content_change_changes_name(self):
+        filename = get_auth_panel_css().filename
+
+        with override_settings(
+            DRF_SPECTACULAR_AUTH={"THEME": {"PRIMARY_COLOR": "#000000"}}
+        ):
+            self.assertNotEqual(get_auth_panel_css().filename, filename)
@@ -0,0 +1,213 @@
+"""
+Tests for the login/logout audit trail
+"""
+
+import json
+import os
+import tempfile
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework import status
+
+from drf_spectacular_auth.audit import (
+    LOGIN_ATTEMPT,
+    LOGIN_FAILURE,
+    LOGIN_SUCCESS,
+    LOGOUT,
+    AuditEvent,
+    AuditLog,
+    JSONLinesAuditSink,
+    ModelAuditSink,
+    get_audit_log,
+    shutdown_audit_log,
+)
+from drf_spectacular_auth.providers.base import AuthenticationError
+
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+
+    def write(self, events):
+        self.batches.append(list(events))
+
+
+class FailingSink:
+    def write(self, events):
+        raise OSError("disk full")
+
+
+def make_event(email="user@example.com"):
+    return AuditEvent(LOGIN_ATTEMPT, "2024-01-01T00:00:00", email, None, "", "", "")
+
+
+class AuditLogTest(SimpleTestCase):
+
+    def test_events_written_in_batches(self):
+        sink = ListSink()
+        audit_log = AuditLog(sink, batch_size=2, flush_interval=60)
+
+        for index in range(5):
+            audit_log.record(make_event(f"user{index}@example.com"))
+        audit_log.shutdown()
+
+        self.assertLessEqual(max(len(batch) for batch in sink.batches), 2)
+        self.assertEqual(sum(len(batch) for batch in sink.batches), 5)
+        self.assertEqual(audit_log.stats()["written"], 5)
+
+    def test_full_batch_wakes_writer(self):
+        written = threading.Event()
+        sink = MagicMock()
+        sink.write.side_effect = lambda events: written.set()
+        audit_log = AuditLog(sink, batch_size=2, flush_interval=60)
+
+        audit_log.record(make_event())
+        audit_log.record(make_event())
+
+        self.assertTrue(written.wait(5))
+        audit_log.shutdown()
+
+    @patch("drf_spectacular_auth.audit.close_old_connections")
+    def test_connections_closed_around_each_flush(self, mock_close):
+        sink = MagicMock()
+        audit_log = AuditLog(sink, batch_size=1, flush_interval=60)
+        flushed = threading.Event()
+        mock_close.side_effect = lambda: flushed.set() if sink.write.called else None
+
+        audit_log.record(make_event())
+
+        # Closed before the flush and again after it, while the writer runs on
+        self.assertTrue(flushed.wait(5))
+        self.assertGreaterEqual(mock_close.call_count, 2)
+        audit_log.shutdown()
+
+    def test_oldest_events_dropped_when_full(self):
+        sink = ListSink()
+        audit_log = AuditLog(sink, buffer_size=2, flush_interval=60)
+        # Keep the writer from draining the buffer while recording
+        with audit_log._flush_lock:
+            for index in range(3):
+                audit_log.record(make_event(f"user{index}@example.com"))
+            self.assertEqual(audit_log.stats()["dropped"], 1)
+        audit_log.shutdown()
+
+        emails = [event.email for batch in sink.batches for event in batch]
+        self.assertEqual(emails, ["user1@example.com", "user2@example.com"])
+
+    def test_failed_write_counted(self):
+        audit_log = AuditLog(FailingSink(), flush_interval=60)
+
+        audit_log.record(make_event())
+        audit_log.shutdown()
+
+        self.assertEqual(audit_log.stats()["failed"], 1)
+        self.assertEqual(audit_log.stats()["written"], 0)
+
+
+class AuditSinkTest(SimpleTestCase):
+
+    def test_jsonl_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "audit.jsonl")
+            JSONLinesAuditSink(path).write([make_event(), make_event("b@example.com")])
+
+            with open(path, encoding="utf-8") as file:
+                records = [json.loads(line) for line in file]
+
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[1]["email"], "b@example.com")
+        self.assertEqual(records[0]["event"], LOGIN_ATTEMPT)
+
+    def test_model_sink_bulk_creates(self):
+        model = MagicMock()
+        sink = ModelAuditSink("accounts.LoginAuditEvent", batch_size=100)
+
+        with patch("django.apps.apps.get_model", return_value=model):
+            sink.write([make_event(), make_event()])
+
+        model.objects.bulk_create.assert_called_once()
+        self.assertEqual(len(model.objects.bulk_create.call_args.args[0]), 2)
+        model.assert_called_with(**make_event()._asdict())
+
+
+class AuditSettingsTest(SimpleTestCase):
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(get_audit_log())
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={"AUDIT": {"ENABLED": True, "SINK": "tests.Missing"}}
+    )
+    def test_invalid_sink(self):
+        from django.core.exceptions import ImproperlyConfigured
+
+        with self.assertRaises(ImproperlyConfigured):
+            get_audit_log()
+
+
+@override_settings(
+    DRF_SPECTACULAR_AUTH={
+        "AUDIT": {"ENABLED": True, "SINK": "tests.test_audit.ListSink"}
+    }
+)
+class AuditViewsTest(TestCase):
+
+    def tearDown(self):
+        shutdown_audit_log()
+
+    def recorded(self):
+        audit_log = get_audit_log()
+        sink = audit_log.sink
+        audit_log.flush()
+        return [event for batch in sink.batches for event in batch]
+
+    @patch("drf_spectacular_auth.views._get_auth_provider")
+    def test_login_success(self, mock_get_provider):
+        mock_provider = MagicMock()
+        mock_provider.authenticate.return_value = {
+            "access_token": "test-token",
+            "user": {"email": "test@example.com"},
+        }
+        mock_get_provider.return_value = mock_provider
+
+        self.client.post(
+            "/auth/login/",
+            {"email": "test@example.com", "password": "password123"},
+            HTTP_USER_AGENT="tests",
+        )
+
+        events = self.recorded()
+        self.assertEqual(
+            [event.event for event in events], [LOGIN_ATTEMPT, LOGIN_SUCCESS]
+        )
+        self.assertEqual(events[1].email, "test@example.com")
+        self.assertEqual(events[1].ip_address, "127.0.0.1")
+        self.assertEqual(events[1].user_agent, "tests")
+
+    @patch("drf_spectacular_auth.views._get_auth_provider")
+    def test_login_failure_records_error_type(self, mock_get_provider):
+        class InvalidCredentials(AuthenticationError):
+            pass
+
+        mock_provider = MagicMock()
+        mock_provider.authenticate.side_effect = InvalidCredentials(
+            "Invalid credentials", "Email or password is incorrect"
+        )
+        mock_get_provider.return_value = mock_provider
+
+        response = self.client.post(
+            "/auth/login/", {"email": "test@example.com", "password": "wrong"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        failure = self.recorded()[-1]
+        self.assertEqual(failure.event, LOGIN_FAILURE)
+        self.assertEqual(failure.error_type, "InvalidCredentials")
+        self.assertEqual(failure.detail, "Invalid credentials")
+
+    def test_logout(self):
+        self.client.post("/auth/logout/")
+
+        self.assertEqual([event.event for event in self.recorded()], [LOGOUT])
@@ -0,0 +1,235 @@
+"""
+Tests for the shared token cache backends
+"""
+
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from drf_spectacular_auth.cache import (
+    DjangoTokenCache,
+    SharedMemoryTokenCache,
+    TokenCache,
+    create_token_cache,
+)
+from drf_spectacular_auth.verification import (
+    clear_token_caches,
+    get_verified_token_cache,
+    verify_token,
+)
+
+from .jwt_utils import make_token
+
+USER_INFO = {"sub": "test-sub", "email": "test@example.com"}
+
+
+class DjangoTokenCacheTestMixin:
+
+    def test_shared_between_instances(self):
+        expires_at = time.time() + 60
+        DjangoTokenCache(name="verified").set("token", USER_INFO, expires_at)
+
+        cache = DjangoTokenCache(name="verified")
+        self.assertEqual(cache.get("token"), USER_INFO)
+        self.assertIsNone(cache.get("other-token"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_expired_entry(self):
+        cache = DjangoTokenCache()
+        cache.set("token", USER_INFO, time.time() + 60)
+
+        with patch(
+            "drf_spectacular_auth.cache.time.time", return_value=time.time() + 120
+        ):
+            self.assertIsNone(cache.get("token"))
+
+    def test_delete_and_clear(self):
+        cache = DjangoTokenCache()
+        cache.set("token-1", 1, time.time() + 60)
+        cache.set("token-2", 2, time.time() + 60)
+
+        cache.delete("token-1")
+        self.assertIsNone(cache.get("token-1"))
+        cache.clear()
+        self.assertIsNone(cache.get("token-2"))
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class LocMemDjangoTokenCacheTest(DjangoTokenCacheTestMixin, SimpleTestCase):
+
+    def setUp(self):
+        caches["default"].clear()
+
+
+class FileBasedDjangoTokenCacheTest(DjangoTokenCacheTestMixin, SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory.name,
+                }
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class SharedMemoryTokenCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "tokens.cache")
+
+    def make_cache(self, **kwargs):
+        cache = SharedMemoryTokenCache(path=self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_shared_between_mappings(self):
+        # Two mappings of one file behave like two worker processes
+        self.make_cache(max_size=8).set("token", USER_INFO, time.time() + 60)
+
+        cache = self.make_cache(max_size=8)
+        self.assertEqual(cache.get("token"), USER_INFO)
+        self.assertIsNone(cache.get("other-token"))
+        self.assertEqual(cache.stats()["size"], 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_rejects_file_accessible_to_others(self):
+        # E.g. planted in the shared temp directory by another local user
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+        os.fchmod(fd, 0o666)
+        os.close(fd)
+
+        with self.assertRaises(ImproperlyConfigured):
+            self.make_cache(max_size=8).get("token")
+
+    def test_expired_entry(self):
+        cache = self.make_cache()
+        cache.set("token", USER_INFO, time.time() + 60)
+
+        with patch(
+            "drf_spectacular_auth.cache.time.time", return_value=time.time() + 120
+        ):
+            self.assertIsNone(cache.get("token"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_overwrite_same_token(self):
+        cache = self.make_cache()
+        cache.set("token", 1, time.time() + 60)
+        cache.set("token", 2, time.time() + 60)
+
+        self.assertEqual(cache.get("token"), 2)
+        self.assertEqual(cache.stats()["size"], 1)
+
+    def test_full_slot_group_evicts_earliest_expiry(self):
+        cache = self.make_cache(max_size=SharedMemoryTokenCache.PROBES)
+        now = time.time()
+        for index in range(SharedMemoryTokenCache.PROBES):
+            cache.set(f"token-{index}", index, now + 60 + index)
+
+        cache.set("new-token", "new", now + 600)
+
+        self.assertEqual(cache.get("new-token"), "new")
+        self.assertIsNone(cache.get("token-0"))
+        self.assertEqual(cache.get("token-1"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_oversized_value_not_cached(self):
+        cache = self.make_cache(slot_size=128)
+        cache.set("token", {"data": "x" * 200}, time.time() + 60)
+
+        self.assertIsNone(cache.get("token"))
+        self.assertEqual(cache.stats()["oversized"], 1)
+
+    def test_torn_slot_ignored(self):
+        cache = self.make_cache(max_size=1)
+        cache.set("token", USER_INFO, time.time() + 60)
+
+        # Corrupt the payload as if a writer were halfway through
+        cache._mmap[SharedMemoryTokenCache.HEADER_SIZE] ^= 0xFF
+
+        self.assertIsNone(cache.get("token"))
+
+    def test_delete_and_clear(self):
+        cache = self.make_cache()
+        cache.set("token-1", 1, time.time() + 60)
+        cache.set("token-2", 2, time.time() + 60)
+
+        cache.delete("token-1")
+        self.assertIsNone(cache.get("token-1"))
+        cache.clear()
+        self.assertIsNone(cache.get("token-2"))
+
+    def test_layout_change_starts_empty(self):
+        self.make_cache(max_size=8).set("token", 1, time.time() + 60)
+
+        self.assertIsNone(self.make_cache(max_size=16).get("token"))
+
+
+class CreateTokenCacheTest(SimpleTestCase):
+
+    def test_backends(self):
+        config = {"MAX_SIZE": 16, "OPTIONS": {}}
+
+        self.assertIsInstance(
+            create_token_cache({**config, "BACKEND": "locmem"}, "verified"),
+            TokenCache,
+        )
+        cache = create_token_cache(
+            {**config, "BACKEND": "django", "OPTIONS": {"key_prefix": "test"}},
+            "verified",
+        )
+        self.assertIsInstance(cache, DjangoTokenCache)
+        self.assertTrue(cache.key_prefix.startswith("test:verified:"))
+        self.assertIsInstance(
+            create_token_cache(
+                {**config, "BACKEND": "drf_spectacular_auth.cache.TokenCache"},
+                "rejected",
+            ),
+            TokenCache,
+        )
+
+
+class SharedVerificationTest(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            DRF_SPECTACULAR_AUTH={
+                "TOKEN_CACHE": {
+                    "BACKEND": "shared_memory",
+                    "OPTIONS": {"path": os.path.join(directory.name, "verified")},
+                }
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(clear_token_caches)
+
+    @patch("drf_spectacular_auth.verification.get_auth_provider")
+    def test_other_worker_uses_cached_result(self, mock_get_provider):
+        mock_get_provider.return_value.verify_token.return_value = USER_INFO
+        token = make_token()
+
+        verify_token(token)
+        # A fresh mapping stands in for another worker process
+        clear_token_caches()
+        self.assertIsInstance(get_verified_token_cache(), SharedMemoryTokenCache)
+        self.assertEqual(verify_token(token), USER_INFO)
+
+        mock_get_provider.return_value.verify_token.assert_called_once_with(token)
@@ -0,0 +1,286 @@
+"""
+Tests for concurrency helpers
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+from django.test import TestCase
+
+from drf_spectacular_auth.concurrency import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CallGuard,
+    CircuitBreaker,
+    ConcurrencyLimiter,
+    SingleFlight,
+)
+from drf_spectacular_auth.providers.base import ServiceUnavailableError
+from drf_spectacular_auth.providers.cognito import is_service_failure
+
+
+class SingleFlightTest(TestCase):
+
+    def _run_concurrently(self, func, count=5):
+        results, errors = [], []
+
+        def worker():
+            try:
+                results.append(func())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def slow_call():
+            calls.append(1)
+            time.sleep(0.2)
+            return "result"
+
+        results, errors = self._run_concurrently(
+            lambda: single_flight.do("key", slow_call)
+        )
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 5)
+        self.assertEqual(errors, [])
+        self.assertEqual(single_flight.in_flight(), 0)
+
+    def test_exception_is_shared(self):
+        single_flight = SingleFlight()
+        calls = []
+
+        def failing_call():
+            calls.append(1)
+            time.sleep(0.2)
+            raise ValueError("boom")
+
+        results, errors = self._run_concurrently(
+            lambda: single_flight.do("key", failing_call)
+        )
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(errors), 5)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+
+    def test_sequential_calls_run_again(self):
+        single_flight = SingleFlight()
+
+        self.assertEqual(single_flight.do("key", lambda: 1), 1)
+        self.assertEqual(single_flight.do("key", lambda: 2), 2)
+
+
+class CircuitBreakerTest(TestCase):
+
+    def _breaker(self, **kwargs):
+        options = {
+            "window_size": 10,
+            "min_calls": 4,
+            "failure_rate": 0.5,
+            "slow_call_duration": 1.0,
+            "slow_call_rate": 0.5,
+            "open_duration": 30.0,
+            "half_open_calls": 2,
+        }
+        options.update(kwargs)
+        return CircuitBreaker(**options)
+
+    def _open(self, breaker):
+        for _ in range(breaker.min_calls):
+            breaker.allow()
+            breaker.record(failed=True, duration=0.1)
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = self._breaker()
+        for _ in range(3):
+            breaker.allow()
+            breaker.record(failed=True, duration=0.1)
+
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_opens_on_failure_rate(self):
+        breaker = self._breaker()
+        self._open(breaker)
+
+        with self.assertRaises(ServiceUnavailableError) as context:
+            breaker.allow()
+        self.assertEqual(context.exception.retry_after, 30)
+        self.assertEqual(breaker.stats()["rejected"], 1)
+
+    def test_opens_on_slow_call_rate(self):
+        breaker = self._breaker()
+        for duration in (0.1, 2.0, 0.1, 2.0):
+            breaker.allow()
+            breaker.record(failed=False, duration=duration)
+
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_half_open_probes_close_circuit(self):
+        breaker = self._breaker()
+        self._open(breaker)
+
+        with patch(
+            "drf_spectacular_auth.concurrency.time.monotonic",
+            return_value=time.monotonic() + 31,
+        ):
+            breaker.allow()
+            breaker.allow()
+            self.assertEqual(breaker.state, HALF_OPEN)
+            with self.assertRaises(ServiceUnavailableError):
+                breaker.allow()
+            breaker.record(failed=False, duration=0.1)
+            breaker.record(failed=False, duration=0.1)
+
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.stats()["calls"], 0)
+
+    def test_failed_probe_reopens_circuit(self):
+        breaker = self._breaker()
+        self._open(breaker)
+
+        with patch(
+            "drf_spectacular_auth.concurrency.time.monotonic",
+            return_value=time.monotonic() + 31,
+        ):
+            breaker.allow()
+            breaker.record(failed=True, duration=0.1)
+            self.assertEqual(breaker.state, OPEN)
+            with self.assertRaises(ServiceUnavailableError):
+                breaker.allow()
+
+
+class ConcurrencyLimiterTest(TestCase):
+
+    def test_rejects_when_queue_full(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=0)
+        limiter.acquire()
+
+        with self.assertRaises(ServiceUnavailableError) as context:
+            limiter.acquire()
+        self.assertEqual(context.exception.message, "Authentication service busy")
+
+        limiter.release()
+        limiter.acquire()
+        self.assertEqual(limiter.stats()["active"], 1)
+        self.assertEqual(limiter.stats()["rejected"], 1)
+
+    def test_waiting_caller_times_out(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=1, wait_timeout=0.05)
+        limiter.acquire()
+
+        with self.assertRaises(ServiceUnavailableError):
+            limiter.acquire()
+        self.assertEqual(limiter.stats()["waiting"], 0)
+
+    def test_waiting_caller_gets_released_slot(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=1, wait_timeout=2)
+        limiter.acquire()
+        threading.Timer(0.05, limiter.release).start()
+
+        limiter.acquire()
+        self.assertEqual(limiter.stats()["active"], 1)
+
+    async def test_async_acquire(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=1, wait_timeout=2)
+        await limiter.aacquire()
+        threading.Timer(0.05, limiter.release).start()
+
+        await limiter.aacquire()
+        self.assertEqual(limiter.stats()["active"], 1)
+
+    async def test_async_acquire_times_out(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=1, wait_timeout=0.05)
+        await limiter.aacquire()
+
+        with self.assertRaises(ServiceUnavailableError):
+            await limiter.aacquire()
+        self.assertEqual(limiter.stats()["waiting"], 0)
+
+
+class CallGuardTest(TestCase):
+
+    def _client_error(self, code, status_code=400):
+        return ClientError(
+            {
+                "Error": {"Code": code, "Message": code},
+                "ResponseMetadata": {"HTTPStatusCode": status_code},
+            },
+            "InitiateAuth",
+        )
+
+    def test_is_service_failure(self):
+        self.assertTrue(
+            is_service_failure(self._client_error("TooManyRequestsException"))
+        )
+        self.assertTrue(is_service_failure(self._client_error("InternalError", 500)))
+        self.assertTrue(is_service_failure(ConnectionError()))
+        self.assertFalse(
+            is_service_failure(self._client_error("NotAuthorizedException"))
+        )
+
+    def test_client_errors_do_not_open_circuit(self):
+        breaker = CircuitBreaker(min_calls=2, failure_rate=0.5)
+        guard = CallGuard(circuit_breaker=breaker, is_failure=is_service_failure)
+        error = self._client_error("NotAuthorizedException")
+
+        def call():
+            raise error
+
+        for _ in range(3):
+            with self.assertRaises(ClientError):
+                guard.call(call)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_service_failures_open_circuit(self):
+        breaker = CircuitBreaker(min_calls=2, failure_rate=0.5)
+        guard = CallGuard(circuit_breaker=breaker, is_failure=is_service_failure)
+        calls = []
+
+        def call():
+            calls.append(1)
+            raise self._client_error("TooManyRequestsException")
+
+        for _ in range(2):
+            with self.assertRaises(ClientError):
+                guard.call(call)
+        with self.assertRaises(ServiceUnavailableError):
+            guard.call(call)
+        self.assertEqual(len(calls), 2)
+
+    def test_limiter_slot_released_after_call(self):
+        limiter = ConcurrencyLimiter(max_concurrent=1, max_waiting=0)
+        guard = CallGuard(limiter=limiter)
+
+        self.assertEqual(guard.call(lambda: "result"), "result")
+        with self.assertRaises(ValueError):
+            guard.call(lambda: int("x"))
+        self.assertEqual(guard.stats()["limiter"]["active"], 0)
+
+    async def test_async_call(self):
+        breaker = CircuitBreaker(min_calls=1, failure_rate=1.0)
+        guard = CallGuard(
+            circuit_breaker=breaker, limiter=ConcurrencyLimiter(max_concurrent=1)
+        )
+
+        async def failing_call():
+            raise ConnectionError()
+
+        with self.assertRaises(ConnectionError):
+            await guard.acall(failing_call)
+        with self.assertRaises(ServiceUnavailableError):
+            await guard.acall(failing_call)
+        self.assertEqual(guard.stats()["circuit_breaker"]["state"], OPEN)
+        self.assertEqual(guard.stats()["limiter"]["active"], 0)
@@ -0,0 +1,286 @@
+"""
+Tests for the login/logout hook pipeline
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from drf_spectacular_auth.asgi import LifespanMiddleware
+from drf_spectacular_auth.hooks import (
+    BackgroundExecutor,
+    HookPipeline,
+    get_background_executor,
+    get_hook_pipeline,
+    shutdown_background_executor,
+)
+
+calls = []
+
+
+def record_first(request, data):
+    calls.append("first")
+
+
+def record_second(request, data):
+    calls.append("second")
+
+
+async def record_async(request, data):
+    calls.append("async")
+
+
+def fail(request, data):
+    raise ValueError("hook failed")
+
+
+def sleep(request, data):
+    time.sleep(0.5)
+
+
+async def async_sleep(request, data):
+    await asyncio.sleep(0.5)
+
+
+class HookPipelineTest(SimpleTestCase):
+
+    def setUp(self):
+        calls.clear()
+        self.request = MagicMock()
+
+    def test_single_dotted_path(self):
+        pipeline = HookPipeline({"PRE_LOGIN": "tests.test_hooks.record_first"})
+
+        pipeline.run("PRE_LOGIN", self.request, {})
+
+        self.assertEqual(calls, ["first"])
+
+    def test_hooks_ordered(self):
+        pipeline = HookPipeline(
+            {
+                "POST_LOGIN": [
+                    {"PATH": "tests.test_hooks.record_first", "ORDER": 10},
+                    "tests.test_hooks.record_second",
+                    "tests.test_hooks.record_async",
+                ]
+            }
+        )
+
+        pipeline.run("POST_LOGIN", self.request, {})
+
+        self.assertEqual(calls, ["second", "async", "first"])
+
+    def test_error_logged_and_next_hook_runs(self):
+        pipeline = HookPipeline(
+            {"PRE_LOGIN": ["tests.test_hooks.fail", "tests.test_hooks.record_first"]}
+        )
+
+        with self.assertLogs("drf_spectacular_auth.hooks", "ERROR"):
+            pipeline.run("PRE_LOGIN", self.request, {})
+
+        self.assertEqual(calls, ["first"])
+
+    def test_error_raised(self):
+        pipeline = HookPipeline(
+            {
+                "PRE_LOGIN": [
+                    {"PATH": "tests.test_hooks.fail", "ON_ERROR": "raise"},
+                    "tests.test_hooks.record_first",
+                ]
+            }
+        )
+
+        with self.assertLogs("drf_spectacular_auth.hooks", "ERROR"):
+            with self.assertRaises(ValueError):
+                pipeline.run("PRE_LOGIN", self.request, {})
+
+        self.assertEqual(calls, [])
+
+    def test_timeout(self):
+        pipeline = HookPipeline(
+            {"POST_LOGIN": {"PATH": "tests.test_hooks.sleep", "TIMEOUT": 0.05}}
+        )
+
+        with self.assertLogs("drf_spectacular_auth.hooks", "ERROR") as logs:
+            pipeline.run("POST_LOGIN", self.request, {})
+
+        self.assertIn("timed out", logs.output[0])
+        self.assertEqual(calls, [])
+
+    def test_async_run(self):
+        pipeline = HookPipeline(
+            {
+                "POST_LOGOUT": [
+                    "tests.test_hooks.record_async",
+                    "tests.test_hooks.record_first",
+                    {"PATH": "tests.test_hooks.async_sleep", "TIMEOUT": 0.05},
+                ]
+            }
+        )
+
+        with self.assertLogs("drf_spectacular_auth.hooks", "ERROR") as logs:
+            asyncio.run(pipeline.arun("POST_LOGOUT", self.request, {}))
+
+        self.assertEqual(calls, ["async", "first"])
+        self.assertIn("timed out", logs.output[0])
+
+    def test_invalid_configuration(self):
+        invalid_configs = [
+            {"PRE_LOGIN": "tests.test_hooks.missing"},
+            {"PRE_LOGIN": "tests.test_hooks.calls"},
+            {"PRE_LOGIN": {"ORDER": 1}},
+            {"PRE_LOGIN": {"PATH": "tests.test_hooks.fail", "ON_ERROR": "retry"}},
+        ]
+        for config in invalid_configs:
+            with self.subTest(config=config):
+                with self.assertRaises(ImproperlyConfigured):
+                    HookPipeline(config)
+
+    def test_pipeline_rebuilt_on_setting_changed(self):
+        pipeline = get_hook_pipeline()
+        self.assertIs(get_hook_pipeline(), pipeline)
+
+        with override_settings(
+            DRF_SPECTACULAR_AUTH={"HOOKS": {"PRE_LOGIN": "tests.test_hooks.fail"}}
+        ):
+            self.assertEqual(
+                [hook.path for hook in get_hook_pipeline().hooks("PRE_LOGIN")],
+                ["tests.test_hooks.fail"],
+            )
+
+        self.assertEqual(get_hook_pipeline().hooks("PRE_LOGIN"), ())
+
+
+class BackgroundExecutorTest(SimpleTestCase):
+
+    def test_jobs_run_in_worker_threads(self):
+        executor = BackgroundExecutor(max_workers=1, queue_size=10)
+        done = threading.Event()
+
+        self.assertTrue(executor.submit(done.set))
+
+        self.assertTrue(done.wait(1))
+        executor.shutdown()
+        self.assertEqual(executor.stats()["completed"], 1)
+
+    def test_full_queue_drops(self):
+        executor = BackgroundExecutor(max_workers=1, queue_size=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(1)
+
+        executor.submit(block)
+        started.wait(1)
+        executor.submit(block)
+        with self.assertLogs("drf_spectacular_auth.hooks", "WARNING"):
+            self.assertFalse(executor.submit(block))
+
+        stats = executor.stats()
+        self.assertEqual(stats["dropped"], 1)
+        self.assertEqual(stats["queue_depth"], 1)
+        release.set()
+        executor.shutdown()
+
+    def test_shutdown_drains_queue(self):
+        executor = BackgroundExecutor(max_workers=1, queue_size=10)
+        for _ in range(5):
+            executor.submit(lambda: time.sleep(0.01))
+
+        executor.shutdown()
+
+        self.assertEqual(executor.stats()["completed"], 5)
+        with self.assertLogs("drf_spectacular_auth.hooks", "WARNING"):
+            self.assertFalse(executor.submit(lambda: None))
+
+    def test_failed_job_counted(self):
+        executor = BackgroundExecutor(max_workers=1)
+
+        with self.assertLogs("drf_spectacular_auth.hooks", "ERROR"):
+            executor.submit(lambda: fail(None, None))
+            executor.shutdown()
+
+        self.assertEqual(executor.stats()["failed"], 1)
+
+    def test_tasks_bounded(self):
+        async def run():
+            executor = BackgroundExecutor(queue_size=1)
+            release = asyncio.Event()
+
+            await executor.submit_task(release.wait)
+            with self.assertLogs("drf_spectacular_auth.hooks", "WARNING"):
+                dropped = not await executor.submit_task(release.wait)
+            release.set()
+            await executor.adrain()
+            return dropped, executor.stats()
+
+        dropped, stats = asyncio.run(run())
+
+        self.assertTrue(dropped)
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_invalid_policy(self):
+        with self.assertRaises(ImproperlyConfigured):
+            BackgroundExecutor(full_policy="retry")
+
+
+@override_settings(
+    DRF_SPECTACULAR_AUTH={
+        "HOOKS": {"POST_LOGIN": "tests.test_hooks.sleep"},
+        "HOOK_BACKGROUND": {"ENABLED": True},
+    }
+)
+class BackgroundHooksTest(SimpleTestCase):
+
+    def tearDown(self):
+        shutdown_background_executor()
+
+    def test_post_login_does_not_wait(self):
+        started = time.monotonic()
+        get_hook_pipeline().run("POST_LOGIN", MagicMock(), {})
+
+        self.assertLess(time.monotonic() - started, 0.25)
+        self.assertEqual(get_background_executor().stats()["submitted"], 1)
+
+    def test_async_post_login_does_not_wait(self):
+        async def run():
+            started = time.monotonic()
+            await get_hook_pipeline().arun("POST_LOGIN", MagicMock(), {})
+            elapsed = time.monotonic() - started
+            await get_background_executor().adrain()
+            return elapsed
+
+        self.assertLess(asyncio.run(run()), 0.25)
+        self.assertEqual(get_background_executor().stats()["completed"], 1)
+
+    def test_lifespan_shutdown_drains_tasks(self):
+        app = MagicMock()
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        async def run():
+            await get_hook_pipeline().arun("POST_LOGIN", MagicMock(), {})
+            executor = get_background_executor()
+            await LifespanMiddleware(app)({"type": "lifespan"}, receive, send)
+            return executor.stats()
+
+        stats = asyncio.run(run())
+
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(
+            sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+        )
+        app.assert_not_called()
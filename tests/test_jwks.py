@@ -0,0 +1,122 @@
+"""
+Tests for the JWKS key store
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from drf_spectacular_auth.jwks import JWKSKeyStore
+from drf_spectacular_auth.providers.base import (
+    AuthenticationError,
+    ServiceUnavailableError,
+)
+
+from .jwt_utils import public_jwk, write_jwks_file
+
+
+class JWKSKeyStoreTest(TestCase):
+
+    def setUp(self):
+        self.url = write_jwks_file(self, [public_jwk("key-1")])
+
+    def test_get_key_fetches_once(self):
+        store = JWKSKeyStore(self.url)
+
+        with patch.object(store, "_fetch", wraps=store._fetch) as mock_fetch:
+            self.assertEqual(store.get_key("key-1")["kid"], "key-1")
+            self.assertEqual(store.get_key("key-1")["kid"], "key-1")
+
+        self.assertEqual(mock_fetch.call_count, 1)
+
+    def test_unknown_kid_refetch_is_rate_limited(self):
+        store = JWKSKeyStore(self.url, min_refetch_interval=60)
+        store.get_key("key-1")
+
+        with patch.object(store, "_fetch", wraps=store._fetch) as mock_fetch:
+            self.assertIsNone(store.get_key("rotated-key"))
+            self.assertIsNone(store.get_key("rotated-key"))
+
+        mock_fetch.assert_not_called()
+
+    def test_unknown_kid_triggers_refetch(self):
+        store = JWKSKeyStore(self.url, min_refetch_interval=0)
+        store.get_key("key-1")
+
+        with open(self.url[len("file://") :], "w") as jwks_file:
+            json.dump({"keys": [public_jwk("key-1"), public_jwk("key-2")]}, jwks_file)
+
+        self.assertEqual(store.get_key("key-2")["kid"], "key-2")
+
+    def test_stale_keys_refresh_in_background(self):
+        store = JWKSKeyStore(self.url, cache_ttl=0)
+        store.get_key("key-1")
+
+        with patch.object(store, "_refresh_in_background") as mock_refresh:
+            self.assertIsNotNone(store.get_key("key-1"))
+
+        mock_refresh.assert_called_once()
+
+    def test_fetch_failure_without_keys(self):
+        store = JWKSKeyStore("file:///nonexistent/jwks.json")
+
+        with self.assertRaises(AuthenticationError):
+            store.get_key("key-1")
+
+    def test_failed_fetch_without_keys_is_not_repeated(self):
+        store = JWKSKeyStore(self.url, min_refetch_interval=60)
+
+        def slow_failing_fetch():
+            time.sleep(0.2)
+            raise ServiceUnavailableError("Token verification failed")
+
+        errors = []
+
+        def get_key():
+            try:
+                store.get_key("key-1")
+            except ServiceUnavailableError as e:
+                errors.append(e)
+
+        with patch.object(
+            store, "_fetch", side_effect=slow_failing_fetch
+        ) as mock_fetch:
+            threads = [threading.Thread(target=get_key) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            with self.assertRaises(ServiceUnavailableError):
+                store.get_key("key-1")
+
+        mock_fetch.assert_called_once()
+        self.assertEqual(len(errors), 5)
+
+    def test_failed_fetch_without_keys_retried_after_interval(self):
+        store = JWKSKeyStore(self.url, min_refetch_interval=0)
+
+        with patch.object(store, "_fetch", side_effect=ServiceUnavailableError("")):
+            with self.assertRaises(ServiceUnavailableError):
+                store.get_key("key-1")
+
+        self.assertEqual(store.get_key("key-1")["kid"], "key-1")
+
+    def test_snapshot_shared_between_stores(self):
+        snapshot_dir = tempfile.mkdtemp()
+        snapshot_path = os.path.join(snapshot_dir, "jwks.json")
+        self.addCleanup(os.rmdir, snapshot_dir)
+        self.addCleanup(os.remove, snapshot_path)
+
+        JWKSKeyStore(self.url, snapshot_path=snapshot_path).get_key("key-1")
+
+        store = JWKSKeyStore(self.url, snapshot_path=snapshot_path)
+        with patch.object(store, "_fetch") as mock_fetch:
+            self.assertEqual(store.get_key("key-1")["kid"], "key-1")
+
+        mock_fetch.assert_not_called()
@@ -0,0 +1,66 @@
+"""
+Tests for the auth panel message bundles
+"""
+
+import json
+
+from django.test import TestCase, override_settings
+
+from drf_spectacular_auth.assets import get_auth_panel_js
+from drf_spectacular_auth.messages import (
+    MESSAGES,
+    get_message_bundle,
+    get_message_bundle_json,
+)
+
+
+class MessageBundleTest(TestCase):
+
+    def test_bundle_has_single_language(self):
+        bundle = get_message_bundle("ko")
+
+        self.assertEqual(bundle["login"], MESSAGES["ko"]["login"])
+        self.assertEqual(set(bundle), set(MESSAGES["en"]))
+
+    def test_unknown_language_falls_back_to_english(self):
+        self.assertEqual(get_message_bundle("fr"), MESSAGES["en"])
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={
+            "SUPPORTED_LANGUAGES": ["en", "fr"],
+            "CUSTOM_TRANSLATIONS": {
+                "fr": {"login": "Connexion"},
+                "en": {"close": "Dismiss"},
+            },
+        }
+    )
+    def test_custom_translations(self):
+        bundle = get_message_bundle("fr")
+
+        self.assertEqual(bundle["login"], "Connexion")
+        self.assertEqual(bundle["close"], "Dismiss")
+        self.assertEqual(bundle["logout"], MESSAGES["en"]["logout"])
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={
+            "CUSTOM_TRANSLATIONS": {"en": {"login": "</script><b>"}},
+        }
+    )
+    def test_json_is_script_safe(self):
+        bundle_json = get_message_bundle_json("en")
+
+        self.assertNotIn("</script>", bundle_json)
+        self.assertEqual(json.loads(bundle_json)["login"], "</script><b>")
+
+    def test_script_carries_only_its_language(self):
+        script = get_auth_panel_js("ja").content
+
+        self.assertIn(MESSAGES["ja"]["login"], script)
+        self.assertNotIn(MESSAGES["ko"]["login"], script)
+
+    def test_page_labels_localized(self):
+        with override_settings(DRF_SPECTACULAR_AUTH={"DEFAULT_LANGUAGE": "ja"}):
+            response = self.client.get("/docs/")
+
+        self.assertContains(response, MESSAGES["ja"]["panelTitle"])
+        self.assertContains(response, f'placeholder="{MESSAGES["ja"]["email"]}"')
@@ -0,0 +1,53 @@
+"""
+Tests for SpectacularAuthMiddleware
+"""
+
+from unittest.mock import AsyncMock, patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+USER_INFO = {"sub": "test-sub", "email": "test@example.com"}
+
+
+@override_settings(
+    MIDDLEWARE=settings.MIDDLEWARE
+    + ["drf_spectacular_auth.middleware.SpectacularAuthMiddleware"]
+)
+class SpectacularAuthMiddlewareTest(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test", email="test@example.com"
+        )
+
+    @patch("drf_spectacular_auth.middleware.verify_token", return_value=USER_INFO)
+    def test_sync_bearer_token_login(self, mock_verify_token):
+        response = self.client.get("/docs/", HTTP_AUTHORIZATION="Bearer test-token")
+
+        self.assertEqual(response.status_code, 200)
+        mock_verify_token.assert_called_once_with("test-token")
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    @patch("drf_spectacular_auth.middleware.verify_token")
+    def test_non_docs_request_skipped(self, mock_verify_token):
+        self.client.get("/api/items/", HTTP_AUTHORIZATION="Bearer test-token")
+
+        mock_verify_token.assert_not_called()
+
+    @patch("drf_spectacular_auth.middleware.verify_token")
+    @patch(
+        "drf_spectacular_auth.middleware.averify_token",
+        new_callable=AsyncMock,
+        return_value=USER_INFO,
+    )
+    async def test_async_bearer_token_login(self, mock_averify_token, mock_verify):
+        response = await self.async_client.get(
+            "/docs/", headers={"Authorization": "Bearer test-token"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        mock_averify_token.assert_awaited_once_with("test-token")
+        mock_verify.assert_not_called()
+        self.assertEqual(await response.asgi_request.auser(), self.user)
@@ -2,12 +2,31 @@
 Tests for authentication providers
 """
 
+import json
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
-from django.test import TestCase
+import httpx
+from django.test import TestCase, override_settings
 
+from drf_spectacular_auth.conf import DEFAULTS
+from drf_spectacular_auth.jwks import clear_jwks_stores
+from drf_spectacular_auth.providers.async_cognito import AsyncCognitoAuthProvider
 from drf_spectacular_auth.providers.base import AuthenticationError
-from drf_spectacular_auth.providers.cognito import CognitoAuthProvider
+from drf_spectacular_auth.providers.cognito import (
+    CognitoAuthProvider,
+    clear_user_attributes_caches,
+)
+
+from .jwt_utils import (
+    CLIENT_ID,
+    USER_POOL_ID,
+    make_claims,
+    make_token,
+    public_jwk,
+    write_jwks_file,
+)
 
 
 class CognitoAuthProviderTest(TestCase):
@@ -17,6 +36,10 @@ class CognitoAuthProviderTest(TestCase):
         mock_settings.COGNITO_REGION = "us-east-1"
         mock_settings.COGNITO_CLIENT_ID = "test-client-id"
         mock_settings.COGNITO_CLIENT_SECRET = None
+        mock_settings.COGNITO_CLIENT_CONFIG = DEFAULTS["COGNITO_CLIENT_CONFIG"]
+        mock_settings.COGNITO_CIRCUIT_BREAKER = DEFAULTS["COGNITO_CIRCUIT_BREAKER"]
+        mock_settings.COGNITO_CONCURRENCY = DEFAULTS["COGNITO_CONCURRENCY"]
+        mock_settings.USER_ATTRIBUTES_CACHE = DEFAULTS["USER_ATTRIBUTES_CACHE"]
 
         with patch("drf_spectacular_auth.providers.cognito.boto3.client"):
             self.provider = CognitoAuthProvider()
@@ -45,6 +68,10 @@ class CognitoAuthProviderTest(TestCase):
         mock_settings.COGNITO_REGION = "us-east-1"
         mock_settings.COGNITO_CLIENT_ID = "test-client-id"
         mock_settings.COGNITO_CLIENT_SECRET = None
+        mock_settings.COGNITO_CLIENT_CONFIG = DEFAULTS["COGNITO_CLIENT_CONFIG"]
+        mock_settings.COGNITO_CIRCUIT_BREAKER = DEFAULTS["COGNITO_CIRCUIT_BREAKER"]
+        mock_settings.COGNITO_CONCURRENCY = DEFAULTS["COGNITO_CONCURRENCY"]
+        mock_settings.USER_ATTRIBUTES_CACHE = DEFAULTS["USER_ATTRIBUTES_CACHE"]
 
         mock_client = MagicMock()
         mock_boto_client.return_value = mock_client
@@ -82,6 +109,10 @@ class CognitoAuthProviderTest(TestCase):
         mock_settings.COGNITO_REGION = "us-east-1"
         mock_settings.COGNITO_CLIENT_ID = "test-client-id"
         mock_settings.COGNITO_CLIENT_SECRET = None
+        mock_settings.COGNITO_CLIENT_CONFIG = DEFAULTS["COGNITO_CLIENT_CONFIG"]
+        mock_settings.COGNITO_CIRCUIT_BREAKER = DEFAULTS["COGNITO_CIRCUIT_BREAKER"]
+        mock_settings.COGNITO_CONCURRENCY = DEFAULTS["COGNITO_CONCURRENCY"]
+        mock_settings.USER_ATTRIBUTES_CACHE = DEFAULTS["USER_ATTRIBUTES_CACHE"]
 
         mock_client = MagicMock()
         mock_boto_client.return_value = mock_client
@@ -110,6 +141,10 @@ class CognitoAuthProviderTest(TestCase):
         mock_settings.COGNITO_REGION = "us-east-1"
         mock_settings.COGNITO_CLIENT_ID = "test-client-id"
         mock_settings.COGNITO_CLIENT_SECRET = "test-client-secret"
+        mock_settings.COGNITO_CLIENT_CONFIG = DEFAULTS["COGNITO_CLIENT_CONFIG"]
+        mock_settings.COGNITO_CIRCUIT_BREAKER = DEFAULTS["COGNITO_CIRCUIT_BREAKER"]
+        mock_settings.COGNITO_CONCURRENCY = DEFAULTS["COGNITO_CONCURRENCY"]
+        mock_settings.USER_ATTRIBUTES_CACHE = DEFAULTS["USER_ATTRIBUTES_CACHE"]
 
         mock_client = MagicMock()
         mock_boto_client.return_value = mock_client
@@ -142,3 +177,286 @@ class CognitoAuthProviderTest(TestCase):
 
         self.assertEqual(result["access_token"], "test-access-token")
         self.assertEqual(result["user"]["email"], "test@example.com")
+
+
+class CognitoLocalVerificationTest(TestCase):
+
+    def setUp(self):
+        settings_patcher = patch("drf_spectacular_auth.providers.cognito.auth_settings")
+        mock_settings = settings_patcher.start()
+        self.addCleanup(settings_patcher.stop)
+
+        mock_settings.COGNITO_REGION = "us-east-1"
+        mock_settings.COGNITO_CLIENT_ID = CLIENT_ID
+        mock_settings.COGNITO_CLIENT_SECRET = None
+        mock_settings.COGNITO_CLIENT_CONFIG = DEFAULTS["COGNITO_CLIENT_CONFIG"]
+        mock_settings.COGNITO_CIRCUIT_BREAKER = DEFAULTS["COGNITO_CIRCUIT_BREAKER"]
+        mock_settings.COGNITO_CONCURRENCY = DEFAULTS["COGNITO_CONCURRENCY"]
+        mock_settings.USER_ATTRIBUTES_CACHE = DEFAULTS["USER_ATTRIBUTES_CACHE"]
+        mock_settings.COGNITO_USER_POOL_ID = USER_POOL_ID
+        mock_settings.TOKEN_VERIFICATION = "local"
+        mock_settings.ALLOWED_TOKEN_USE = ["access", "id"]
+        mock_settings.TOKEN_LEEWAY = 0
+        mock_settings.JWKS = {"URL": write_jwks_file(self, [public_jwk()])}
+        self.addCleanup(clear_jwks_stores)
+        self.addCleanup(clear_user_attributes_caches)
+
+        with patch("drf_spectacular_auth.providers.cognito.boto3.client"):
+            self.provider = CognitoAuthProvider()
+
+    def test_verify_id_token_without_cognito_call(self):
+        user_info = self.provider.verify_token(make_token())
+
+        self.assertEqual(user_info["email"], "test@example.com")
+        self.assertTrue(user_info["email_verified"])
+        self.provider.client.get_user.assert_not_called()
+
+    def test_access_token_falls_back_to_get_user(self):
+        claims = make_claims(token_use="access", client_id=CLIENT_ID)
+        del claims["email"]
+        self.provider.client.get_user.return_value = {
+            "UserAttributes": [{"Name": "email", "Value": "test@example.com"}]
+        }
+
+        user_info = self.provider.verify_token(make_token(claims))
+
+        self.assertEqual(user_info["email"], "test@example.com")
+        self.provider.client.get_user.assert_called_once()
+
+    def test_access_token_user_attributes_cached_per_sub(self):
+        self.provider.client.get_user.return_value = {
+            "UserAttributes": [
+                {"Name": "sub", "Value": "test-sub"},
+                {"Name": "email", "Value": "test@example.com"},
+            ]
+        }
+
+        for jti in ("first", "second"):
+            claims = make_claims(token_use="access", client_id=CLIENT_ID, jti=jti)
+            del claims["email"]
+            user_info = self.provider.verify_token(make_token(claims))
+            self.assertEqual(user_info["email"], "test@example.com")
+
+        self.provider.client.get_user.assert_called_once()
+
+        # Another user still needs their own GetUser call
+        claims = make_claims(token_use="access", client_id=CLIENT_ID, sub="other")
+        del claims["email"]
+        self.provider.verify_token(make_token(claims))
+
+        self.assertEqual(self.provider.client.get_user.call_count, 2)
+
+    def test_unknown_key_rejected(self):
+        with self.assertRaises(AuthenticationError):
+            self.provider.verify_token(make_token(kid="unknown-kid"))
+
+        self.provider.client.get_user.assert_not_called()
+
+    def test_unsupported_algorithm_rejected(self):
+        with self.assertRaises(AuthenticationError):
+            self.provider.verify_token(make_token(alg="HS256"))
+
+    def test_concurrent_verifications_share_one_call(self):
+        claims = make_claims(token_use="access", client_id=CLIENT_ID)
+        del claims["email"]
+        token = make_token(claims)
+
+        def slow_get_user(**kwargs):
+            time.sleep(0.2)
+            return {"UserAttributes": [{"Name": "email", "Value": "test@example.com"}]}
+
+        self.provider.client.get_user.side_effect = slow_get_user
+        threads = [
+            threading.Thread(target=self.provider.verify_token, args=(token,))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.provider.client.get_user.assert_called_once()
+
+
+class CognitoIdTokenUserInfoTest(TestCase):
+
+    def setUp(self):
+        settings_patcher = patch("drf_spectacular_auth.providers.cognito.auth_settings")
+        mock_settings = settings_patcher.start()
+        self.addCleanup(settings_patcher.stop)
+
+        mock_settings.COGNITO_REGION = "us-east-1"
+        mock_settings.COGNITO_CLIENT_ID = CLIENT_ID
+        mock_settings.COGNITO_CLIENT_SECRET = None
+        mock_settings.COGNITO_CLIENT_CONFIG = DEFAULTS["COGNITO_CLIENT_CONFIG"]
+        mock_settings.COGNITO_CIRCUIT_BREAKER = DEFAULTS["COGNITO_CIRCUIT_BREAKER"]
+        mock_settings.COGNITO_CONCURRENCY = DEFAULTS["COGNITO_CONCURRENCY"]
+        mock_settings.USER_ATTRIBUTES_CACHE = DEFAULTS["USER_ATTRIBUTES_CACHE"]
+        mock_settings.COGNITO_USER_POOL_ID = USER_POOL_ID
+        mock_settings.TOKEN_VERIFICATION = "remote"
+        mock_settings.LOGIN_USER_INFO_FROM_ID_TOKEN = True
+        mock_settings.ALLOWED_TOKEN_USE = ["access"]
+        mock_settings.TOKEN_LEEWAY = 0
+        mock_settings.JWKS = {"URL": write_jwks_file(self, [public_jwk()])}
+        self.addCleanup(clear_jwks_stores)
+
+        with patch("drf_spectacular_auth.providers.cognito.boto3.client"):
+            self.provider = CognitoAuthProvider()
+        self.provider.client.get_user.return_value = {
+            "UserAttributes": [
+                {"Name": "sub", "Value": "get-user-sub"},
+                {"Name": "email", "Value": "test@example.com"},
+            ]
+        }
+
+    def _login(self, id_token):
+        self.provider.client.initiate_auth.return_value = {
+            "AuthenticationResult": {"AccessToken": "access", "IdToken": id_token}
+        }
+        return self.provider.authenticate(
+            {"email": "test@example.com", "password": "password123"}
+        )
+
+    def test_user_info_from_id_token(self):
+        result = self._login(make_token())
+
+        self.assertEqual(result["user"]["sub"], "test-sub")
+        self.assertEqual(result["user"]["given_name"], "Test")
+        self.provider.client.get_user.assert_not_called()
+
+    def test_missing_email_falls_back_to_get_user(self):
+        claims = make_claims()
+        del claims["email"]
+
+        result = self._login(make_token(claims))
+
+        self.assertEqual(result["user"]["sub"], "get-user-sub")
+        self.provider.client.get_user.assert_called_once_with(AccessToken="access")
+
+    def test_invalid_id_token_falls_back_to_get_user(self):
+        for id_token in (
+            make_token(kid="unknown-kid"),
+            make_token(make_claims(aud="other-client")),
+            make_token(make_claims(token_use="access", client_id=CLIENT_ID)),
+        ):
+            with self.subTest(id_token=id_token):
+                self.provider.client.get_user.reset_mock()
+
+                result = self._login(id_token)
+
+                self.assertEqual(result["user"]["sub"], "get-user-sub")
+                self.provider.client.get_user.assert_called_once()
+
+    def test_user_pool_id_required(self):
+        with patch(
+            "drf_spectacular_auth.providers.cognito.auth_settings"
+        ) as mock_settings, patch("drf_spectacular_auth.providers.cognito.boto3"):
+            mock_settings.COGNITO_CLIENT_ID = CLIENT_ID
+            mock_settings.COGNITO_USER_POOL_ID = None
+            mock_settings.TOKEN_VERIFICATION = "remote"
+            mock_settings.LOGIN_USER_INFO_FROM_ID_TOKEN = True
+
+            with self.assertRaises(ValueError):
+                CognitoAuthProvider()
+
+
+class AsyncCognitoAuthProviderTest(TestCase):
+
+    def setUp(self):
+        with patch("drf_spectacular_auth.providers.cognito.boto3.client"):
+            self.provider = AsyncCognitoAuthProvider()
+        self.requests = []
+
+    def _mock_cognito(self, responses):
+        def handler(request):
+            operation = request.headers["X-Amz-Target"].split(".")[-1]
+            self.requests.append((operation, json.loads(request.content)))
+            status_code, body = responses[operation]
+            return httpx.Response(status_code, json=body)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.provider._get_http_client = MagicMock(return_value=client)
+
+    async def test_aauthenticate_success(self):
+        self._mock_cognito(
+            {
+                "InitiateAuth": (
+                    200,
+                    {"AuthenticationResult": {"AccessToken": "test-access-token"}},
+                ),
+                "GetUser": (
+                    200,
+                    {
+                        "UserAttributes": [
+                            {"Name": "email", "Value": "test@example.com"}
+                        ]
+                    },
+                ),
+            }
+        )
+
+        result = await self.provider.aauthenticate(
+            {"email": "test@example.com", "password": "password123"}
+        )
+
+        self.assertEqual(result["access_token"], "test-access-token")
+        self.assertEqual(result["user"]["email"], "test@example.com")
+        self.assertEqual(self.requests[0][1]["AuthFlow"], "USER_PASSWORD_AUTH")
+        self.assertEqual(self.requests[1][1], {"AccessToken": "test-access-token"})
+
+    async def test_aauthenticate_user_info_from_id_token(self):
+        self.provider.user_info_from_id_token = True
+        self.provider.user_pool_id = USER_POOL_ID
+        self.addCleanup(clear_jwks_stores)
+        self._mock_cognito(
+            {
+                "InitiateAuth": (
+                    200,
+                    {
+                        "AuthenticationResult": {
+                            "AccessToken": "test-access-token",
+                            "IdToken": make_token(),
+                        }
+                    },
+                )
+            }
+        )
+
+        with override_settings(
+            DRF_SPECTACULAR_AUTH={
+                "JWKS": {"URL": write_jwks_file(self, [public_jwk()])}
+            }
+        ):
+            result = await self.provider.aauthenticate(
+                {"email": "test@example.com", "password": "password123"}
+            )
+
+        self.assertEqual(result["user"]["sub"], "test-sub")
+        self.assertEqual(
+            [operation for operation, _ in self.requests], ["InitiateAuth"]
+        )
+
+    async def test_aauthenticate_invalid_credentials(self):
+        self._mock_cognito(
+            {
+                "InitiateAuth": (
+                    400,
+                    {"__type": "NotAuthorizedException", "message": "Bad password"},
+                )
+            }
+        )
+
+        with self.assertRaises(AuthenticationError) as context:
+            await self.provider.aauthenticate(
+                {"email": "test@example.com", "password": "wrongpassword"}
+            )
+
+        self.assertEqual(context.exception.message, "Invalid email or password")
+
+    async def test_averify_token_remote(self):
+        self._mock_cognito(
+            {"GetUser": (400, {"__type": "NotAuthorizedException", "message": "x"})}
+        )
+
+        with self.assertRaises(AuthenticationError):
+            await self.provider.averify_token("expired-token")
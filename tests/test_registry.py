@@ -0,0 +1,58 @@
+"""
+Tests for the provider registry
+"""
+
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from drf_spectacular_auth.conf import auth_settings
+from drf_spectacular_auth.providers.async_cognito import AsyncCognitoAuthProvider
+from drf_spectacular_auth.providers.registry import (
+    clear_auth_providers,
+    get_auth_provider,
+)
+
+
+@patch("drf_spectacular_auth.providers.cognito.boto3.client")
+class ProviderRegistryTest(TestCase):
+
+    def setUp(self):
+        clear_auth_providers()
+        self.addCleanup(clear_auth_providers)
+
+    def test_provider_is_reused(self, mock_boto_client):
+        self.assertIs(get_auth_provider(), get_auth_provider())
+        mock_boto_client.assert_called_once()
+
+    def test_sync_and_async_providers_share_call_guard(self, mock_boto_client):
+        provider = get_auth_provider()
+        async_provider = get_auth_provider(AsyncCognitoAuthProvider)
+
+        self.assertIsNot(provider, async_provider)
+        self.assertIs(provider.call_guard, async_provider.call_guard)
+
+    def test_client_config(self, mock_boto_client):
+        get_auth_provider()
+
+        config = mock_boto_client.call_args[1]["config"]
+        self.assertEqual(config.max_pool_connections, 10)
+        self.assertEqual(config.retries["mode"], "standard")
+
+    def test_settings_change_builds_new_provider(self, mock_boto_client):
+        provider = get_auth_provider()
+
+        with override_settings(
+            DRF_SPECTACULAR_AUTH={
+                "COGNITO_CLIENT_ID": "other-client-id",
+                "COGNITO_CLIENT_CONFIG": {"MAX_POOL_CONNECTIONS": 50},
+            }
+        ):
+            self.assertEqual(auth_settings.COGNITO_CLIENT_ID, "other-client-id")
+            other_provider = get_auth_provider()
+            config = mock_boto_client.call_args[1]["config"]
+
+        self.assertIsNot(provider, other_provider)
+        self.assertEqual(other_provider.client_id, "other-client-id")
+        self.assertEqual(config.max_pool_connections, 50)
+        self.assertEqual(auth_settings.COGNITO_CLIENT_ID, "test-client-id")
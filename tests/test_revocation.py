@@ -0,0 +1,315 @@
+"""
+Tests for token revocation on logout
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from asgiref.sync import sync_to_async
+from botocore.exceptions import ClientError
+from django.contrib.auth import SESSION_KEY, login
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import AsyncRequestFactory, TestCase, override_settings
+
+from drf_spectacular_auth.providers.async_cognito import AsyncCognitoAuthProvider
+from drf_spectacular_auth.providers.base import AuthenticationError
+from drf_spectacular_auth.providers.cognito import CognitoAuthProvider
+from drf_spectacular_auth.revocation import clear_revocation_store, is_revoked, revoke
+from drf_spectacular_auth.verification import (
+    clear_token_caches,
+    revoke_token,
+    verify_token,
+)
+from drf_spectacular_auth.views import async_logout_view
+
+from .jwt_utils import make_claims, make_token
+
+USER_INFO = {"sub": "test-sub", "email": "test@example.com"}
+
+REVOCATION = {"ENABLED": True}
+
+
+@override_settings(DRF_SPECTACULAR_AUTH={"REVOCATION": REVOCATION})
+class RevocationStoreTest(TestCase):
+
+    def setUp(self):
+        clear_revocation_store()
+        self.addCleanup(clear_revocation_store)
+
+    def test_revoked_by_jti(self):
+        token = make_token(make_claims(jti="jti-1"))
+
+        revoke(token)
+
+        self.assertTrue(is_revoked(token))
+        self.assertFalse(is_revoked(make_token(make_claims(jti="jti-2"))))
+
+    def test_origin_jti_revokes_sibling_tokens(self):
+        revoke(make_token(make_claims(jti="jti-1", origin_jti="origin-1")))
+
+        refreshed = make_token(make_claims(jti="jti-2", origin_jti="origin-1"))
+        self.assertTrue(is_revoked(refreshed))
+
+    def test_opaque_token(self):
+        revoke("opaque-token")
+
+        self.assertTrue(is_revoked("opaque-token"))
+        self.assertFalse(is_revoked("other-token"))
+
+    def test_disabled(self):
+        token = make_token(make_claims(jti="jti-1"))
+        revoke(token)
+
+        with override_settings(DRF_SPECTACULAR_AUTH={}):
+            self.assertFalse(is_revoked(token))
+
+
+@override_settings(DRF_SPECTACULAR_AUTH={"REVOCATION": REVOCATION})
+@patch("drf_spectacular_auth.verification.get_auth_provider")
+class RevokedVerificationTest(TestCase):
+
+    def setUp(self):
+        clear_revocation_store()
+        clear_token_caches()
+        self.addCleanup(clear_revocation_store)
+        self.addCleanup(clear_token_caches)
+
+    def test_cached_token_rejected_after_revocation(self, mock_get_provider):
+        mock_get_provider.return_value.verify_token.return_value = USER_INFO
+        token = make_token(make_claims(jti="jti-1"))
+        verify_token(token)
+
+        self.assertEqual(revoke_token(token), USER_INFO)
+
+        with self.assertRaises(AuthenticationError) as context:
+            verify_token(token)
+        self.assertEqual(context.exception.message, "Token revoked")
+
+    def test_invalid_token_not_recorded(self, mock_get_provider):
+        mock_get_provider.return_value.verify_token.side_effect = AuthenticationError(
+            "Token verification failed"
+        )
+        token = make_token(make_claims(jti="jti-1"))
+
+        with self.assertRaises(AuthenticationError):
+            revoke_token(token)
+        self.assertFalse(is_revoked(token))
+
+
+@override_settings(
+    DRF_SPECTACULAR_AUTH={
+        "REVOCATION": {**REVOCATION, "COGNITO_SIGN_OUT": "global_sign_out"}
+    }
+)
+@patch("drf_spectacular_auth.views._get_auth_provider")
+@patch("drf_spectacular_auth.verification.get_auth_provider")
+class LogoutRevocationTest(TestCase):
+
+    def setUp(self):
+        clear_revocation_store()
+        clear_token_caches()
+        self.addCleanup(clear_revocation_store)
+        self.addCleanup(clear_token_caches)
+        self.token = make_token(make_claims(jti="jti-1"))
+
+    def test_logout_revokes_bearer_token(self, mock_verify_provider, mock_provider):
+        mock_verify_provider.return_value.verify_token.return_value = USER_INFO
+
+        response = self.client.post(
+            "/auth/logout/",
+            {"refresh_token": "refresh"},
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(is_revoked(self.token))
+        mock_provider.return_value.sign_out.assert_called_once_with(
+            self.token, "refresh"
+        )
+
+    def test_sign_out_failure_does_not_fail_logout(
+        self, mock_verify_provider, mock_provider
+    ):
+        mock_verify_provider.return_value.verify_token.return_value = USER_INFO
+        mock_provider.return_value.sign_out.side_effect = AuthenticationError(
+            "Sign out failed"
+        )
+
+        response = self.client.post(
+            "/auth/logout/", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(is_revoked(self.token))
+
+    def test_invalid_token_skips_sign_out(self, mock_verify_provider, mock_provider):
+        mock_verify_provider.return_value.verify_token.side_effect = (
+            AuthenticationError("Token verification failed")
+        )
+
+        response = self.client.post(
+            "/auth/logout/", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        mock_provider.return_value.sign_out.assert_not_called()
+
+    def test_expired_token_still_revokes_refresh_token(
+        self, mock_verify_provider, mock_provider
+    ):
+        mock_verify_provider.return_value.verify_token.side_effect = (
+            AuthenticationError("Token verification failed")
+        )
+
+        response = self.client.post(
+            "/auth/logout/",
+            {"refresh_token": "refresh"},
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(is_revoked(self.token))
+        mock_provider.return_value.sign_out.assert_called_once_with(
+            self.token, "refresh"
+        )
+
+    def test_logout_ends_docs_session(self, mock_verify_provider, mock_provider):
+        self.client.force_login(User.objects.create_user("docs-user"))
+
+        response = self.client.post("/auth/logout/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+    def test_logout_without_token(self, mock_verify_provider, mock_provider):
+        response = self.client.post("/auth/logout/")
+
+        self.assertEqual(response.status_code, 200)
+        mock_verify_provider.return_value.verify_token.assert_not_called()
+
+
+@override_settings(DRF_SPECTACULAR_AUTH={"REVOCATION": REVOCATION})
+class AsyncLogoutRevocationTest(TestCase):
+
+    def setUp(self):
+        clear_revocation_store()
+        clear_token_caches()
+        self.addCleanup(clear_revocation_store)
+        self.addCleanup(clear_token_caches)
+
+    @patch("drf_spectacular_auth.views._get_async_auth_provider")
+    @patch("drf_spectacular_auth.verification.averify_token")
+    async def test_logout_revokes_bearer_token(self, mock_averify, mock_provider):
+        mock_averify.return_value = USER_INFO
+        mock_provider.return_value.asign_out = AsyncMock()
+        token = make_token(make_claims(jti="jti-1"))
+
+        response = await async_logout_view(
+            AsyncRequestFactory().post(
+                "/auth/logout/", headers={"Authorization": f"Bearer {token}"}
+            )
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(is_revoked(token))
+        mock_provider.return_value.asign_out.assert_called_once_with(token, None)
+
+    @patch("drf_spectacular_auth.views._get_async_auth_provider")
+    async def test_logout_ends_docs_session(self, mock_provider):
+        user = await sync_to_async(User.objects.create_user)("docs-user")
+        request = AsyncRequestFactory().post("/auth/logout/")
+        request.session = SessionStore()
+        request.user = user
+        await sync_to_async(login)(request, user)
+
+        response = await async_logout_view(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(SESSION_KEY, request.session)
+        self.assertFalse(request.user.is_authenticated)
+
+
+class CognitoSignOutTest(TestCase):
+
+    def setUp(self):
+        with patch("drf_spectacular_auth.providers.cognito.boto3.client"):
+            self.provider = CognitoAuthProvider()
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={"REVOCATION": {"COGNITO_SIGN_OUT": "global_sign_out"}}
+    )
+    def test_global_sign_out(self):
+        self.provider.sign_out("access", "refresh")
+
+        self.provider.client.global_sign_out.assert_called_once_with(
+            AccessToken="access"
+        )
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={"REVOCATION": {"COGNITO_SIGN_OUT": "revoke_token"}}
+    )
+    def test_revoke_token(self):
+        self.provider.client_secret = "secret"
+
+        self.provider.sign_out("access", "refresh")
+        self.provider.sign_out("access")
+
+        self.provider.client.revoke_token.assert_called_once_with(
+            Token="refresh", ClientId=self.provider.client_id, ClientSecret="secret"
+        )
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={"REVOCATION": {"COGNITO_SIGN_OUT": "global_sign_out"}}
+    )
+    def test_global_sign_out_without_access_token(self):
+        self.provider.sign_out(None, "refresh")
+
+        self.provider.client.global_sign_out.assert_not_called()
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={"REVOCATION": {"COGNITO_SIGN_OUT": "global_sign_out"}}
+    )
+    def test_error(self):
+        self.provider.client.global_sign_out.side_effect = ClientError(
+            {"Error": {"Code": "NotAuthorizedException"}}, "GlobalSignOut"
+        )
+
+        with self.assertRaises(AuthenticationError):
+            self.provider.sign_out("access")
+
+    def test_disabled_by_default(self):
+        self.provider.sign_out("access", "refresh")
+
+        self.provider.client.global_sign_out.assert_not_called()
+        self.provider.client.revoke_token.assert_not_called()
+
+
+class AsyncCognitoSignOutTest(TestCase):
+
+    def setUp(self):
+        with patch("drf_spectacular_auth.providers.cognito.boto3.client"):
+            self.provider = AsyncCognitoAuthProvider()
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={"REVOCATION": {"COGNITO_SIGN_OUT": "revoke_token"}}
+    )
+    async def test_revoke_token(self):
+        provider = self.provider
+        requests = []
+
+        def handler(request):
+            operation = request.headers["X-Amz-Target"].split(".")[-1]
+            requests.append((operation, json.loads(request.content)))
+            return httpx.Response(200, json={})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        provider._get_http_client = MagicMock(return_value=client)
+
+        await provider.asign_out("access", "refresh")
+
+        self.assertEqual(
+            requests,
+            [("RevokeToken", {"Token": "refresh", "ClientId": provider.client_id})],
+        )
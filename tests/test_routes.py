@@ -0,0 +1,89 @@
+"""
+Tests for the docs route index
+"""
+
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import include, path, re_path, resolve
+from django.urls.resolvers import RegexPattern
+from drf_spectacular.views import SpectacularAPIView
+
+from drf_spectacular_auth.routes import (
+    _literal_prefix,
+    get_docs_route_index,
+    is_docs_view_name,
+)
+
+
+def dummy_view(request, **kwargs):
+    return HttpResponse()
+
+
+urlpatterns = [
+    path("api/items/", dummy_view, name="item-list"),
+    path("api/schema/", dummy_view, name="schema"),
+    path("api/schema/<str:version>/", dummy_view, name="versioned-schema"),
+    re_path(r"^redoc/$", dummy_view, name="redoc"),
+    path("openapi/", SpectacularAPIView.as_view()),
+    path("v1/", include(([path("docs/", dummy_view, name="api-docs")], "v1"))),
+]
+
+URLCONF = "tests.test_routes"
+
+
+class DocsRouteIndexTest(TestCase):
+
+    def test_exact_and_prefix_routes(self):
+        index = get_docs_route_index(URLCONF)
+
+        self.assertEqual(index.exact_paths, {"api/schema/", "redoc/", "openapi/"})
+        self.assertEqual(index.prefixes, ("api/schema/",))
+        self.assertFalse(index.match_all)
+
+    def test_may_match(self):
+        index = get_docs_route_index(URLCONF)
+
+        self.assertTrue(index.may_match("/api/schema/"))
+        self.assertTrue(index.may_match("/api/schema/v2/"))
+        self.assertTrue(index.may_match("/redoc/"))
+        self.assertFalse(index.may_match("/api/items/"))
+        self.assertFalse(index.may_match("/v1/docs/"))
+
+    def test_unnamed_route_matched_by_view_path(self):
+        view_name = resolve("/openapi/", urlconf=URLCONF).view_name
+
+        self.assertTrue(is_docs_view_name(view_name))
+        self.assertTrue(get_docs_route_index(URLCONF).may_match("/openapi/"))
+
+    def test_index_is_reused(self):
+        self.assertIs(get_docs_route_index(URLCONF), get_docs_route_index(URLCONF))
+
+    @override_settings(DRF_SPECTACULAR_AUTH={"DOCS_URL_NAMES": ["api-docs"]})
+    def test_extra_docs_url_names(self):
+        self.assertTrue(get_docs_route_index(URLCONF).may_match("/v1/docs/"))
+        self.assertTrue(is_docs_view_name("v1:api-docs"))
+        self.assertFalse(is_docs_view_name("item-list"))
+
+
+class LiteralPrefixTest(TestCase):
+
+    def test_literal_regex(self):
+        self.assertEqual(
+            _literal_prefix(RegexPattern(r"^redoc/$")), ("redoc/", True, True)
+        )
+
+    def test_optional_character_not_in_prefix(self):
+        for regex in (r"^api/schemas?/$", r"^api/schemas*/$", r"^api/schemas{0,1}/$"):
+            with self.subTest(regex=regex):
+                literal, _, exact = _literal_prefix(RegexPattern(regex))
+                self.assertEqual(literal, "api/schema")
+                self.assertFalse(exact)
+
+    def test_top_level_alternation_matches_all(self):
+        self.assertEqual(
+            _literal_prefix(RegexPattern(r"^v1|docs/$")), ("", False, False)
+        )
+
+    def test_grouped_alternation_keeps_prefix(self):
+        literal, _, _ = _literal_prefix(RegexPattern(r"^api/(v1|v2)/schema/$"))
+        self.assertEqual(literal, "api/")
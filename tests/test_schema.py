@@ -0,0 +1,488 @@
+"""
+Tests for the cached schema view
+"""
+
+import gzip
+import json
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from rest_framework.renderers import JSONRenderer
+
+from drf_spectacular_auth import views
+from drf_spectacular_auth.schema import (
+    build_schema_entry,
+    bump_schema_generation,
+    get_permission_fingerprint,
+    get_streamed_schemas,
+    render_schema_chunks,
+    split_schema,
+)
+
+
+class SpectacularAuthAPIViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def get_schema(self, **extra):
+        return self.client.get(
+            "/cached-schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json", **extra
+        )
+
+    def test_schema_generated_once(self):
+        with patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value={"openapi": "3"}
+        ) as mock_get_schema:
+            first = self.get_schema()
+            second = self.get_schema()
+
+        self.assertEqual(mock_get_schema.call_count, 1)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first.json(), {"openapi": "3"})
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_generation_bump_invalidates_cache(self):
+        with patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value={"openapi": "3"}
+        ) as mock_get_schema:
+            self.get_schema()
+            bump_schema_generation()
+            self.get_schema()
+            self.get_schema()
+
+        self.assertEqual(mock_get_schema.call_count, 2)
+
+    def test_media_types_cached_separately(self):
+        json_response = self.get_schema()
+        yaml_response = self.client.get(
+            "/cached-schema/", HTTP_ACCEPT="application/vnd.oai.openapi"
+        )
+
+        self.assertTrue(json_response.content.startswith(b"{"))
+        self.assertTrue(yaml_response.content.startswith(b"openapi:"))
+        self.assertIn("charset=utf-8", yaml_response["Content-Type"])
+
+    def test_not_modified(self):
+        etag = self.get_schema()["ETag"]
+
+        response = self.get_schema(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_gzip_variant(self):
+        plain = self.get_schema()
+        compressed = self.get_schema(HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertNotEqual(compressed["ETag"], plain["ETag"])
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+
+    @override_settings(DRF_SPECTACULAR_AUTH={"SCHEMA_CACHE": {"ENABLED": False}})
+    def test_cache_disabled(self):
+        with patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value={"openapi": "3"}
+        ) as mock_get_schema:
+            self.get_schema()
+            self.get_schema()
+
+        self.assertEqual(mock_get_schema.call_count, 2)
+
+    def test_small_schema_not_compressed(self):
+        entry = build_schema_entry(b"{}", "application/json", "schema.json")
+
+        self.assertIsNone(entry["gzip"])
+
+
+@override_settings(DRF_SPECTACULAR_AUTH={"FILTER_SCHEMA_BY_PERMISSIONS": True})
+class PermissionFilteredSchemaTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.editors = Group.objects.create(name="editors")
+        self.editors.permissions.add(Permission.objects.get(codename="change_user"))
+
+    def create_user(self, username, *groups, **extra):
+        user = User.objects.create_user(username, f"{username}@example.com", **extra)
+        user.groups.add(*groups)
+        return user
+
+    def get_schema_as(self, user):
+        if user is None:
+            self.client.logout()
+        else:
+            self.client.force_login(user)
+        return self.client.get(
+            "/cached-schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+        )
+
+    def test_same_permissions_share_variant(self):
+        first = self.create_user("first", self.editors)
+        second = self.create_user("second", self.editors)
+
+        with patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value={"openapi": "3"}
+        ) as mock_get_schema:
+            self.get_schema_as(first)
+            self.get_schema_as(second)
+
+        mock_get_schema.assert_called_once()
+        self.assertFalse(mock_get_schema.call_args.kwargs["public"])
+
+    def test_different_permissions_get_own_variant(self):
+        editor = self.create_user("editor", self.editors)
+        viewer = self.create_user("viewer")
+
+        with patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value={"openapi": "3"}
+        ) as mock_get_schema:
+            self.get_schema_as(editor)
+            self.get_schema_as(viewer)
+            self.get_schema_as(None)
+
+        self.assertEqual(mock_get_schema.call_count, 3)
+        self.assertTrue(mock_get_schema.call_args.kwargs["public"])
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={
+            "FILTER_SCHEMA_BY_PERMISSIONS": True,
+            "SCHEMA_SHARDING": True,
+        }
+    )
+    def test_prebuild_invalidates_permission_variants(self):
+        editor = self.create_user("editor", self.editors)
+        self.client.force_login(editor)
+
+        with patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value=SCHEMA
+        ) as mock_get_schema:
+            self.client.get(
+                "/cached-schema/?tag=items",
+                HTTP_ACCEPT="application/vnd.oai.openapi+json",
+            )
+            call_command(
+                "prebuild_spectacular_auth_schema",
+                url_name="cached-schema",
+                stdout=StringIO(),
+            )
+            calls = mock_get_schema.call_count
+            response = self.client.get(
+                "/cached-schema/?tag=items",
+                HTTP_ACCEPT="application/vnd.oai.openapi+json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        # The editor's shards are regenerated, not served from before the build
+        self.assertEqual(mock_get_schema.call_count, calls + 1)
+        self.assertFalse(mock_get_schema.call_args.kwargs["public"])
+
+    def test_fingerprint(self):
+        editor = self.create_user("editor", self.editors)
+        other_editor = self.create_user("other", self.editors)
+        staff_editor = self.create_user("staff", self.editors, is_staff=True)
+        admin = self.create_user("admin", is_superuser=True)
+
+        self.assertEqual(
+            get_permission_fingerprint(editor), get_permission_fingerprint(other_editor)
+        )
+        self.assertNotEqual(
+            get_permission_fingerprint(editor), get_permission_fingerprint(staff_editor)
+        )
+        self.assertEqual(get_permission_fingerprint(admin), "superuser")
+
+    def test_unsaved_user_fingerprint(self):
+        self.assertIsNotNone(get_permission_fingerprint(User(username="temp")))
+
+    def test_custom_fingerprint_opt_out(self):
+        user = self.create_user("user")
+
+        with override_settings(
+            DRF_SPECTACULAR_AUTH={
+                "FILTER_SCHEMA_BY_PERMISSIONS": True,
+                "SCHEMA_PERMISSION_FINGERPRINT": "tests.test_schema.no_fingerprint",
+            }
+        ), patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value={"openapi": "3"}
+        ) as mock_get_schema:
+            self.get_schema_as(user)
+            self.get_schema_as(user)
+
+        self.assertEqual(mock_get_schema.call_count, 2)
+
+
+def no_fingerprint(user):
+    return None
+
+
+SCHEMA = {
+    "openapi": "3.0.3",
+    "info": {"title": "API", "version": "1.0.0"},
+    "tags": [{"name": "items", "description": "Items"}],
+    "paths": {
+        "/items/": {
+            "parameters": [{"$ref": "#/components/parameters/Page"}],
+            "get": {
+                "tags": ["items"],
+                "responses": {
+                    "200": {
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Item"}
+                            }
+                        }
+                    }
+                },
+            },
+        },
+        "/users/": {
+            "get": {"tags": ["users"], "responses": {}},
+            "post": {"responses": {}},
+        },
+    },
+    "components": {
+        "schemas": {
+            "Item": {"properties": {"owner": {"$ref": "#/components/schemas/User"}}},
+            "User": {"type": "object"},
+            "Unused": {"type": "object"},
+        },
+        "parameters": {"Page": {"name": "page", "in": "query"}},
+        "securitySchemes": {"bearer": {"type": "http", "scheme": "bearer"}},
+    },
+}
+
+
+class SplitSchemaTest(TestCase):
+
+    def test_index(self):
+        index = split_schema(SCHEMA)["index"]
+
+        self.assertEqual(index["paths"], {})
+        self.assertEqual(index["info"], SCHEMA["info"])
+        self.assertEqual(
+            index["tags"],
+            [
+                {"name": "items", "description": "Items"},
+                {"name": "users"},
+                {"name": "default"},
+            ],
+        )
+        self.assertEqual(list(index["components"]), ["securitySchemes"])
+
+    def test_tag_shard_has_referenced_components(self):
+        shard = split_schema(SCHEMA)["tag:items"]
+
+        self.assertEqual(list(shard["paths"]), ["/items/"])
+        self.assertIn("parameters", shard["paths"]["/items/"])
+        self.assertEqual(set(shard["components"]["schemas"]), {"Item", "User"})
+        self.assertEqual(set(shard["components"]["parameters"]), {"Page"})
+
+    def test_operations_split_by_tag(self):
+        shards = split_schema(SCHEMA)
+
+        self.assertEqual(list(shards["tag:users"]["paths"]["/users/"]), ["get"])
+        self.assertEqual(list(shards["tag:default"]["paths"]["/users/"]), ["post"])
+        self.assertEqual(shards["tag:default"]["components"], {})
+
+
+@override_settings(DRF_SPECTACULAR_AUTH={"SCHEMA_SHARDING": True})
+class ShardedSchemaViewTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        patcher = patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value=SCHEMA
+        )
+        self.mock_get_schema = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_schema(self, query):
+        return self.client.get(
+            f"/cached-schema/?{query}", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+        )
+
+    def test_index_and_shards_built_together(self):
+        index = self.get_schema("shard=index")
+        shard = self.get_schema("tag=items")
+
+        self.assertEqual(index.json()["paths"], {})
+        self.assertEqual(list(shard.json()["paths"]), ["/items/"])
+        self.assertTrue(shard.has_header("ETag"))
+        self.mock_get_schema.assert_called_once()
+
+    def test_unknown_tag(self):
+        self.assertEqual(self.get_schema("tag=missing").status_code, 404)
+
+    def test_unknown_tag_not_regenerated(self):
+        self.get_schema("shard=index")
+
+        self.assertEqual(self.get_schema("tag=missing").status_code, 404)
+        self.assertEqual(self.get_schema("tag=other").status_code, 404)
+        self.mock_get_schema.assert_called_once()
+
+    def test_evicted_tag_regenerated(self):
+        self.get_schema("shard=index")
+        cached = [None]  # the "items" shard was evicted, the index was not
+
+        def get_cached_schema(key):
+            return cached.pop() if cached else real_get_cached_schema(key)
+
+        real_get_cached_schema = views.get_cached_schema
+        with patch.object(views, "get_cached_schema", side_effect=get_cached_schema):
+            response = self.get_schema("tag=items")
+
+        self.assertEqual(list(response.json()["paths"]), ["/items/"])
+        self.assertEqual(self.mock_get_schema.call_count, 2)
+
+    def test_full_schema_still_served(self):
+        self.assertEqual(self.get_schema("").json()["paths"], SCHEMA["paths"])
+
+    def test_swagger_ui_loads_index(self):
+        response = self.client.get("/docs/")
+
+        self.assertEqual(response.data["schema_url"], "/schema/?shard=index")
+
+
+class RenderSchemaChunksTest(TestCase):
+
+    schema = {
+        **SCHEMA,
+        "info": {"title": "API", "description": "Line one\nLine two\n\nLine four"},
+        "paths": {**SCHEMA["paths"], "/empty/": {}, "/ünïcode/": {"get": {}}},
+    }
+
+    def assertRendersSame(self, renderer, renderer_context=None):
+        renderer_context = renderer_context or {}
+        chunks = render_schema_chunks(
+            renderer, self.schema, renderer.media_type, renderer_context
+        )
+
+        self.assertEqual(
+            b"".join(chunks),
+            renderer.render(self.schema, renderer.media_type, renderer_context),
+        )
+
+    def test_json(self):
+        self.assertRendersSame(OpenApiJsonRenderer())
+
+    def test_compact_json(self):
+        self.assertRendersSame(JSONRenderer())
+
+    def test_yaml(self):
+        self.assertRendersSame(OpenApiYamlRenderer())
+
+    def test_chunks_coalesced(self):
+        with patch("drf_spectacular_auth.schema.STREAM_CHUNK_SIZE", 100):
+            chunks = render_schema_chunks(OpenApiJsonRenderer(), self.schema, None, {})
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) >= 100 for chunk in chunks[:-1]))
+
+
+@override_settings(DRF_SPECTACULAR_AUTH={"SCHEMA_CACHE": {"STREAMING": True}})
+class StreamedSchemaViewTest(TestCase):
+
+    def setUp(self):
+        get_streamed_schemas().clear()
+        self.addCleanup(get_streamed_schemas().clear)
+
+    def get_schema(self, **extra):
+        return self.client.get(
+            "/cached-schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json", **extra
+        )
+
+    def test_streamed_from_shared_chunks(self):
+        with patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value=SCHEMA
+        ) as mock_get_schema:
+            first = self.get_schema()
+            first_content = first.getvalue()
+            second = self.get_schema()
+
+        self.assertTrue(first.streaming)
+        self.assertEqual(json.loads(first_content), SCHEMA)
+        self.assertEqual(first_content, second.getvalue())
+        self.assertEqual(first["ETag"], second["ETag"])
+        mock_get_schema.assert_called_once()
+
+    def test_not_modified(self):
+        etag = self.get_schema()["ETag"]
+
+        response = self.get_schema(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+
+class PrebuildSchemaCommandTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_prebuild_fills_cache(self):
+        out = StringIO()
+        call_command(
+            "prebuild_spectacular_auth_schema", url_name="cached-schema", stdout=out
+        )
+
+        self.assertIn("application/vnd.oai.openapi+json", out.getvalue())
+        with patch.object(SchemaGenerator, "get_schema") as mock_get_schema:
+            response = self.client.get(
+                "/cached-schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+            )
+
+        self.assertEqual(response.status_code, 200)
+        mock_get_schema.assert_not_called()
+
+    def test_prebuild_replaces_cached_schema(self):
+        with patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value={"old": True}
+        ):
+            self.client.get(
+                "/cached-schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+            )
+
+        call_command(
+            "prebuild_spectacular_auth_schema",
+            url_name="cached-schema",
+            stdout=StringIO(),
+        )
+        response = self.client.get(
+            "/cached-schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+        )
+
+        self.assertIn("openapi", response.json())
+
+    def test_keep_generation(self):
+        with patch.object(
+            SchemaGenerator, "get_schema", autospec=True, return_value={"old": True}
+        ):
+            self.client.get(
+                "/cached-schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+            )
+
+        call_command(
+            "prebuild_spectacular_auth_schema",
+            url_name="cached-schema",
+            lang=["en"],
+            keep_generation=True,
+            stdout=StringIO(),
+        )
+        response = self.client.get(
+            "/cached-schema/", HTTP_ACCEPT="application/vnd.oai.openapi+json"
+        )
+
+        self.assertEqual(response.json(), {"old": True})
+
+    def test_rejects_other_views(self):
+        with self.assertRaises(CommandError):
+            call_command("prebuild_spectacular_auth_schema", url_name="schema")
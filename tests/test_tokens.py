@@ -0,0 +1,78 @@
+"""
+Tests for local JWT verification helpers
+"""
+
+import time
+
+from django.test import TestCase
+
+from drf_spectacular_auth.providers.base import AuthenticationError
+from drf_spectacular_auth.tokens import (
+    decode_token,
+    get_unverified_claims,
+    validate_claims,
+    verify_rs256_signature,
+)
+
+from .jwt_utils import CLIENT_ID, ISSUER, make_claims, make_token, public_jwk
+
+
+class TokenSignatureTest(TestCase):
+
+    def test_valid_signature(self):
+        decoded = decode_token(make_token())
+
+        self.assertTrue(
+            verify_rs256_signature(
+                public_jwk(), decoded.signing_input, decoded.signature
+            )
+        )
+
+    def test_tampered_claims_rejected(self):
+        header, _, signature = make_token().split(".")
+        forged = make_token(make_claims(email="attacker@example.com"))
+        forged_payload = forged.split(".")[1]
+
+        decoded = decode_token(f"{header}.{forged_payload}.{signature}")
+
+        self.assertFalse(
+            verify_rs256_signature(
+                public_jwk(), decoded.signing_input, decoded.signature
+            )
+        )
+
+    def test_malformed_token(self):
+        with self.assertRaises(AuthenticationError):
+            decode_token("not-a-jwt")
+
+    def test_get_unverified_claims(self):
+        claims = get_unverified_claims(make_token(make_claims(sub="abc")))
+        self.assertEqual(claims["sub"], "abc")
+
+
+class ValidateClaimsTest(TestCase):
+
+    def _validate(self, claims):
+        validate_claims(
+            claims, issuer=ISSUER, client_id=CLIENT_ID, allowed_token_use=["id"]
+        )
+
+    def test_valid_claims(self):
+        self._validate(make_claims())
+
+    def test_expired_token(self):
+        with self.assertRaises(AuthenticationError) as context:
+            self._validate(make_claims(exp=int(time.time()) - 10))
+        self.assertEqual(context.exception.detail, "Token has expired")
+
+    def test_wrong_issuer(self):
+        with self.assertRaises(AuthenticationError):
+            self._validate(make_claims(iss="https://example.com"))
+
+    def test_wrong_audience(self):
+        with self.assertRaises(AuthenticationError):
+            self._validate(make_claims(aud="other-client"))
+
+    def test_disallowed_token_use(self):
+        with self.assertRaises(AuthenticationError):
+            self._validate(make_claims(token_use="access", client_id=CLIENT_ID))
@@ -0,0 +1,188 @@
+"""
+Tests for cached token verification
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+from django.test import TestCase, override_settings
+
+from drf_spectacular_auth.cache import TokenCache
+from drf_spectacular_auth.providers.base import (
+    AuthenticationError,
+    ServiceUnavailableError,
+)
+from drf_spectacular_auth.providers.cognito import CognitoAuthProvider
+from drf_spectacular_auth.verification import (
+    clear_token_caches,
+    get_rejected_token_cache,
+    get_verified_token_cache,
+    verify_token,
+)
+
+from .jwt_utils import make_claims, make_token
+
+USER_INFO = {"sub": "test-sub", "email": "test@example.com"}
+
+
+class TokenCacheTest(TestCase):
+
+    def test_hit_and_miss_counters(self):
+        cache = TokenCache(max_size=10)
+        cache.set("token", USER_INFO, time.time() + 60)
+
+        self.assertEqual(cache.get("token"), USER_INFO)
+        self.assertIsNone(cache.get("other-token"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_expired_entry(self):
+        cache = TokenCache(max_size=10)
+        cache.set("token", USER_INFO, time.time() + 60)
+
+        with patch(
+            "drf_spectacular_auth.cache.time.time", return_value=time.time() + 120
+        ):
+            self.assertIsNone(cache.get("token"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_lru_eviction(self):
+        cache = TokenCache(max_size=2)
+        expires_at = time.time() + 60
+        cache.set("token-1", 1, expires_at)
+        cache.set("token-2", 2, expires_at)
+        cache.get("token-1")
+        cache.set("token-3", 3, expires_at)
+
+        self.assertIsNone(cache.get("token-2"))
+        self.assertEqual(cache.get("token-1"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+
+@patch("drf_spectacular_auth.verification.get_auth_provider")
+class VerifyTokenTest(TestCase):
+
+    def setUp(self):
+        clear_token_caches()
+        self.addCleanup(clear_token_caches)
+
+    def test_second_verification_is_cached(self, mock_get_provider):
+        mock_get_provider.return_value.verify_token.return_value = USER_INFO
+        token = make_token()
+
+        self.assertEqual(verify_token(token), USER_INFO)
+        self.assertEqual(verify_token(token), USER_INFO)
+
+        mock_get_provider.return_value.verify_token.assert_called_once_with(token)
+        self.assertEqual(get_verified_token_cache().stats()["hits"], 1)
+
+    def test_entry_expires_with_token(self, mock_get_provider):
+        mock_get_provider.return_value.verify_token.return_value = USER_INFO
+        token = make_token(make_claims(exp=int(time.time()) + 5))
+
+        verify_token(token)
+        with patch(
+            "drf_spectacular_auth.cache.time.time", return_value=time.time() + 10
+        ):
+            verify_token(token)
+
+        self.assertEqual(mock_get_provider.return_value.verify_token.call_count, 2)
+
+    def test_rejected_token_is_cached(self, mock_get_provider):
+        mock_get_provider.return_value.verify_token.side_effect = AuthenticationError(
+            "Token verification failed", "Invalid or expired access token"
+        )
+
+        for _ in range(3):
+            with self.assertRaises(AuthenticationError) as context:
+                verify_token("opaque-token")
+
+        self.assertEqual(context.exception.detail, "Invalid or expired access token")
+        mock_get_provider.return_value.verify_token.assert_called_once()
+        self.assertEqual(get_rejected_token_cache().stats()["hits"], 2)
+
+    def test_rejection_expires(self, mock_get_provider):
+        mock_get_provider.return_value.verify_token.side_effect = [
+            AuthenticationError("Token verification failed"),
+            USER_INFO,
+        ]
+
+        with self.assertRaises(AuthenticationError):
+            verify_token("opaque-token")
+        with patch(
+            "drf_spectacular_auth.cache.time.time", return_value=time.time() + 60
+        ):
+            self.assertEqual(verify_token("opaque-token"), USER_INFO)
+
+    def test_service_unavailable_is_not_cached(self, mock_get_provider):
+        mock_get_provider.return_value.verify_token.side_effect = [
+            ServiceUnavailableError("Authentication service unavailable"),
+            USER_INFO,
+        ]
+
+        with self.assertRaises(ServiceUnavailableError):
+            verify_token("opaque-token")
+        self.assertEqual(verify_token("opaque-token"), USER_INFO)
+
+    def test_cognito_throttling_is_not_cached(self, mock_get_provider):
+        with patch("drf_spectacular_auth.providers.cognito.boto3.client"):
+            provider = CognitoAuthProvider()
+        provider.client.get_user.side_effect = [
+            ClientError(
+                {
+                    "Error": {"Code": "TooManyRequestsException", "Message": ""},
+                    "ResponseMetadata": {"HTTPStatusCode": 400},
+                },
+                "GetUser",
+            ),
+            {"UserAttributes": [{"Name": "email", "Value": "test@example.com"}]},
+        ]
+        mock_get_provider.return_value = provider
+
+        with self.assertRaises(ServiceUnavailableError):
+            verify_token("opaque-token")
+        self.assertEqual(verify_token("opaque-token")["email"], "test@example.com")
+        self.assertEqual(provider.client.get_user.call_count, 2)
+
+    def test_cognito_rejection_is_cached(self, mock_get_provider):
+        with patch("drf_spectacular_auth.providers.cognito.boto3.client"):
+            provider = CognitoAuthProvider()
+        provider.client.get_user.side_effect = ClientError(
+            {
+                "Error": {"Code": "NotAuthorizedException", "Message": ""},
+                "ResponseMetadata": {"HTTPStatusCode": 400},
+            },
+            "GetUser",
+        )
+        mock_get_provider.return_value = provider
+
+        for _ in range(2):
+            with self.assertRaises(AuthenticationError) as context:
+                verify_token("opaque-token")
+            self.assertNotIsInstance(context.exception, ServiceUnavailableError)
+        provider.client.get_user.assert_called_once()
+
+    @override_settings(
+        DRF_SPECTACULAR_AUTH={"REJECTED_TOKEN_CACHE": {"ENABLED": False}}
+    )
+    def test_rejected_token_cache_disabled(self, mock_get_provider):
+        mock_get_provider.return_value = MagicMock()
+        mock_get_provider.return_value.verify_token.side_effect = [
+            AuthenticationError("Token verification failed"),
+            USER_INFO,
+        ]
+
+        with self.assertRaises(AuthenticationError):
+            verify_token("opaque-token")
+        self.assertEqual(verify_token("opaque-token"), USER_INFO)
+
+    @override_settings(DRF_SPECTACULAR_AUTH={"TOKEN_CACHE": {"ENABLED": False}})
+    def test_cache_disabled(self, mock_get_provider):
+        mock_get_provider.return_value = MagicMock()
+        mock_get_provider.return_value.verify_token.return_value = USER_INFO
+
+        verify_token("opaque-token")
+        verify_token("opaque-token")
+
+        self.assertEqual(mock_get_provider.return_value.verify_token.call_count, 2)
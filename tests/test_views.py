@@ -2,15 +2,26 @@
 Tests for DRF Spectacular Auth views
 """
 
-from unittest.mock import MagicMock, patch
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from django.contrib.auth.models import AnonymousUser
-from django.test import RequestFactory, TestCase
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from drf_spectacular_auth.providers.base import AuthenticationError
-from drf_spectacular_auth.views import SpectacularAuthSwaggerView
+from drf_spectacular_auth.providers.base import (
+    AuthenticationError,
+    ServiceUnavailableError,
+)
+from drf_spectacular_auth.views import (
+    SpectacularAuthSwaggerView,
+    async_login_view,
+    async_logout_view,
+    async_refresh_view,
+)
+
+from .jwt_utils import make_claims, make_token
 
 
 class SpectacularAuthSwaggerViewTest(TestCase):
@@ -33,6 +44,42 @@ class SpectacularAuthSwaggerViewTest(TestCase):
         self.assertIn("csrf_token", auth_context)
 
 
+class SwaggerViewConditionalGetTest(TestCase):
+
+    def test_revalidation_not_modified(self):
+        response = self.client.get("/docs/")
+        etag = response["ETag"]
+
+        with patch(
+            "drf_spectacular.views.SpectacularSwaggerView.get"
+        ) as mock_parent_get:
+            revalidated = self.client.get("/docs/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated["ETag"], etag)
+        self.assertEqual(revalidated.content, b"")
+        mock_parent_get.assert_not_called()
+
+    def test_etag_changes_with_settings(self):
+        etag = self.client.get("/docs/")["ETag"]
+
+        with override_settings(DRF_SPECTACULAR_AUTH={"DEFAULT_LANGUAGE": "ko"}):
+            response = self.client.get("/docs/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_changes_with_csrf_secret(self):
+        etag = self.client.get("/docs/")["ETag"]
+        self.client.cookies.clear()
+
+        response = self.client.get("/docs/", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+
 class LoginViewTest(APITestCase):
 
     def test_login_invalid_data(self):
@@ -62,6 +109,26 @@ class LoginViewTest(APITestCase):
         self.assertIn("access_token", response.data)
         self.assertEqual(response.data["access_token"], "test-token")
 
+    @patch("drf_spectacular_auth.views._get_auth_provider")
+    def test_login_refresh_token_opt_in(self, mock_get_provider):
+        mock_provider = MagicMock()
+        mock_provider.validate_credentials.return_value = True
+        mock_provider.authenticate.return_value = {
+            "access_token": "test-token",
+            "refresh_token": "test-refresh-token",
+            "user": {"email": "test@example.com", "sub": "test-sub"},
+            "message": "Login successful",
+        }
+        mock_get_provider.return_value = mock_provider
+        credentials = {"email": "test@example.com", "password": "password123"}
+
+        response = self.client.post("/auth/login/", credentials)
+        self.assertNotIn("refresh_token", response.data)
+
+        with override_settings(DRF_SPECTACULAR_AUTH={"AUTO_REFRESH_TOKEN": True}):
+            response = self.client.post("/auth/login/", credentials)
+        self.assertEqual(response.data["refresh_token"], "test-refresh-token")
+
     @patch("drf_spectacular_auth.views._get_auth_provider")
     def test_login_authentication_error(self, mock_get_provider):
         mock_provider = MagicMock()
@@ -79,6 +146,23 @@ class LoginViewTest(APITestCase):
         self.assertIn("error", response.data)
         self.assertEqual(response.data["error"], "Invalid credentials")
 
+    @patch("drf_spectacular_auth.views._get_auth_provider")
+    def test_login_service_unavailable(self, mock_get_provider):
+        mock_provider = MagicMock()
+        mock_provider.validate_credentials.return_value = True
+        mock_provider.authenticate.side_effect = ServiceUnavailableError(
+            "Authentication service unavailable", "Circuit open", retry_after=12
+        )
+        mock_get_provider.return_value = mock_provider
+
+        response = self.client.post(
+            "/auth/login/", {"email": "test@example.com", "password": "password123"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "12")
+        self.assertEqual(response.data["error"], "Authentication service unavailable")
+
     @patch("drf_spectacular_auth.views._get_auth_provider")
     def test_login_invalid_credentials_format(self, mock_get_provider):
         mock_provider = MagicMock()
@@ -96,3 +180,181 @@ class LoginViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("error", response.data)
         self.assertEqual(response.data["error"], "Invalid credentials format")
+
+
+@patch("drf_spectacular_auth.views._get_auth_provider")
+class RefreshViewTest(APITestCase):
+
+    def test_refresh_success(self, mock_get_provider):
+        mock_get_provider.return_value.refresh_token.return_value = {
+            "access_token": "new-token",
+            "id_token": "new-id-token",
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        }
+
+        response = self.client.post(
+            "/auth/refresh/", {"refresh_token": "refresh", "username": "test-user"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {"access_token": "new-token", "token_type": "Bearer", "expires_in": 3600},
+        )
+        mock_get_provider.return_value.refresh_token.assert_called_once_with(
+            "refresh", username="test-user"
+        )
+
+    def test_username_from_access_token(self, mock_get_provider):
+        mock_get_provider.return_value.refresh_token.return_value = {
+            "access_token": "new-token"
+        }
+        # An expired access token still names the user
+        token = make_token(make_claims(token_use="access", username="test-user"))
+
+        self.client.post(
+            "/auth/refresh/",
+            {"refresh_token": "refresh"},
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+        mock_get_provider.return_value.refresh_token.assert_called_once_with(
+            "refresh", username="test-user"
+        )
+
+    def test_invalid_refresh_token(self, mock_get_provider):
+        mock_get_provider.return_value.refresh_token.side_effect = AuthenticationError(
+            "Token refresh failed", "Invalid refresh token"
+        )
+
+        response = self.client.post("/auth/refresh/", {"refresh_token": "refresh"})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data["error"], "Token refresh failed")
+
+    def test_username_required(self, mock_get_provider):
+        mock_get_provider.return_value.refresh_token.side_effect = ValueError(
+            "Username is required for refresh token with client secret"
+        )
+
+        response = self.client.post("/auth/refresh/", {"refresh_token": "refresh"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "Username required")
+
+    def test_missing_refresh_token(self, mock_get_provider):
+        response = self.client.post("/auth/refresh/", {})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_get_provider.assert_not_called()
+
+
+@patch("drf_spectacular_auth.views._get_async_auth_provider")
+class AsyncLoginViewTest(TestCase):
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+    async def test_login_success(self, mock_get_provider):
+        mock_provider = MagicMock()
+        mock_provider.validate_credentials.return_value = True
+        mock_provider.aauthenticate = AsyncMock(
+            return_value={
+                "access_token": "test-token",
+                "user": {"email": "test@example.com", "sub": "test-sub"},
+                "message": "Login successful",
+            }
+        )
+        mock_get_provider.return_value = mock_provider
+
+        response = await async_login_view(
+            self.factory.post(
+                "/auth/login/",
+                {"email": "test@example.com", "password": "password123"},
+                content_type="application/json",
+            )
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["access_token"], "test-token")
+
+    async def test_login_authentication_error(self, mock_get_provider):
+        mock_provider = MagicMock()
+        mock_provider.validate_credentials.return_value = True
+        mock_provider.aauthenticate = AsyncMock(
+            side_effect=AuthenticationError("Invalid credentials", "Wrong password")
+        )
+        mock_get_provider.return_value = mock_provider
+
+        response = await async_login_view(
+            self.factory.post(
+                "/auth/login/",
+                {"email": "test@example.com", "password": "wrongpassword"},
+            )
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(json.loads(response.content)["error"], "Invalid credentials")
+
+    async def test_login_service_unavailable(self, mock_get_provider):
+        mock_provider = MagicMock()
+        mock_provider.validate_credentials.return_value = True
+        mock_provider.aauthenticate = AsyncMock(
+            side_effect=ServiceUnavailableError(
+                "Authentication service busy", "Queue full", retry_after=1
+            )
+        )
+        mock_get_provider.return_value = mock_provider
+
+        response = await async_login_view(
+            self.factory.post(
+                "/auth/login/",
+                {"email": "test@example.com", "password": "password123"},
+                content_type="application/json",
+            )
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "1")
+
+    async def test_login_invalid_data(self, mock_get_provider):
+        response = await async_login_view(
+            self.factory.post("/auth/login/", {"email": "invalid-email"})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_get_provider.assert_not_called()
+
+    async def test_logout_runs_async_hook(self, mock_get_provider):
+        hook = AsyncMock()
+
+        with patch("drf_spectacular_auth.hooks.import_string", return_value=hook):
+            with override_settings(
+                DRF_SPECTACULAR_AUTH={"HOOKS": {"POST_LOGOUT": "hooks.post_logout"}}
+            ):
+                response = await async_logout_view(self.factory.post("/auth/logout/"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        hook.assert_awaited_once()
+
+    async def test_refresh(self, mock_get_provider):
+        mock_provider = MagicMock()
+        mock_provider.arefresh_token = AsyncMock(
+            return_value={"access_token": "new-token", "expires_in": 3600}
+        )
+        mock_get_provider.return_value = mock_provider
+
+        response = await async_refresh_view(
+            self.factory.post(
+                "/auth/refresh/",
+                {"refresh_token": "refresh", "username": "test-user"},
+                content_type="application/json",
+            )
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["access_token"], "new-token")
+        mock_provider.arefresh_token.assert_awaited_once_with(
+            "refresh", username="test-user"
+        )
@@ -5,10 +5,14 @@ URLs for testing
 from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView
 
-from drf_spectacular_auth.views import SpectacularAuthSwaggerView
+from drf_spectacular_auth.views import (
+    SpectacularAuthAPIView,
+    SpectacularAuthSwaggerView,
+)
 
 urlpatterns = [
     path("schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("cached-schema/", SpectacularAuthAPIView.as_view(), name="cached-schema"),
     path(
         "docs/",
         SpectacularAuthSwaggerView.as_view(url_name="schema"),